@@ -0,0 +1,78 @@
+import sys
+import time
+
+import numpy as np
+
+from md import HAVE_NUMBA, FusedVerlet, HarmonicBonds, State
+
+# ==============================================
+# PARÁMETROS
+# ==============================================
+k_bond = 450.0
+r_eq = 1.09
+dt = 0.001
+sizes = [3, 5, 30, 300, 3000, 30000, 300000]
+min_time = 0.2  # segundos mínimos por medición
+
+# Uso: python benchmark-backends.py [N1 N2 ...]
+if len(sys.argv) > 1:
+    sizes = [int(float(a)) for a in sys.argv[1:]]
+
+
+def chain(n_atoms, rng):
+    """Cadena lineal 3D de n_atoms con enlaces ligeramente estirados."""
+    pos = np.zeros((n_atoms, 3))
+    pos[:, 0] = np.arange(n_atoms) * r_eq
+    pos += rng.normal(0, 0.05, pos.shape)
+    masses = np.where(np.arange(n_atoms) % 2, 1.008, 12.011)
+    bonds = HarmonicBonds(np.arange(n_atoms - 1), np.arange(1, n_atoms), k_bond, r_eq, r_min=0.01)
+    return pos, masses, bonds
+
+
+def script_style(pos, vel, masses, bonds, n_steps):
+    """Paso como el verlet-CH4.v2.py original: dos evaluaciones y temporales nuevos."""
+    for _ in range(n_steps):
+        forces, _ = bonds.compute(pos)
+        pos += vel * dt + 0.5 * forces / masses[:, None] * dt**2
+        new_forces, _ = bonds.compute(pos)
+        vel += 0.5 * (forces + new_forces) / masses[:, None] * dt
+
+
+def fused(backend):
+    def run(pos, vel, masses, bonds, n_steps):
+        state = State(pos, vel, masses)
+        FusedVerlet(bonds, dt, backend=backend).run(state, n_steps, stride=n_steps)
+    return run
+
+
+def steps_per_second(runner, n_atoms, rng):
+    """Duplica el número de pasos hasta superar min_time."""
+    n_steps = 1
+    while True:
+        pos, masses, bonds = chain(n_atoms, rng)
+        vel = np.zeros_like(pos)
+        t0 = time.perf_counter()
+        runner(pos, vel, masses, bonds, n_steps)
+        elapsed = time.perf_counter() - t0
+        if elapsed > min_time:
+            return n_steps / elapsed
+        n_steps *= 2
+
+
+if __name__ == "__main__":
+    rng = np.random.default_rng(0)
+    runners = {'script': script_style, 'numpy': fused('numpy')}
+    if HAVE_NUMBA:
+        pos, masses, bonds = chain(3, rng)
+        fused('numba')(pos, np.zeros_like(pos), masses, bonds, 1)  # compilación JIT
+        runners['numba'] = fused('numba')
+    else:
+        print("numba no está instalado: solo se comparan los caminos NumPy\n")
+
+    print(f"{'N':>8} " + " ".join(f"{name + ' [pasos/s]':>20}" for name in runners)
+          + f" {'aceleración':>12}")
+    for n in sizes:
+        rates = {name: steps_per_second(run, n, rng) for name, run in runners.items()}
+        best = max(rates, key=rates.get)
+        print(f"{n:>8} " + " ".join(f"{rates[name]:>20.1f}" for name in runners)
+              + f" {rates[best] / rates['script']:>10.1f}x ({best})")
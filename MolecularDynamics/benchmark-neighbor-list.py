@@ -0,0 +1,62 @@
+import sys
+import time
+
+import numpy as np
+
+from md import NonBondedForce
+
+# ==============================================
+# PARÁMETROS (UNIDADES REDUCIDAS DE LENNARD-JONES)
+# ==============================================
+density = 0.8      # átomos por σ³
+cutoff = 2.5       # radio de corte [σ]
+skin = 0.3         # piel de la lista de vecinos [σ]
+sizes = [10**3, 10**4, 10**5, 10**6]
+repeats = 3
+
+# Uso: python benchmark-neighbor-list.py [N1 N2 ...]
+if len(sys.argv) > 1:
+    sizes = [int(float(a)) for a in sys.argv[1:]]
+
+
+def lattice_positions(n_atoms, rng):
+    """Red cúbica con la densidad pedida y una pequeña perturbación."""
+    side = int(np.ceil(n_atoms ** (1 / 3)))
+    spacing = (1.0 / density) ** (1 / 3)
+    grid = np.indices((side, side, side)).reshape(3, -1).T[:n_atoms]
+    return grid * spacing + rng.normal(0, 0.05, (n_atoms, 3))
+
+
+def brute_force_pairs(pos, r_list):
+    """Referencia O(N²) para comparar la escala."""
+    d = pos[:, None, :] - pos[None, :, :]
+    r2 = np.einsum('ijd,ijd->ij', d, d)
+    return np.count_nonzero(np.triu(r2 < r_list ** 2, 1))
+
+
+def best_time(fn):
+    best = np.inf
+    for _ in range(repeats):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+if __name__ == "__main__":
+    rng = np.random.default_rng(0)
+    print(f"{'N':>9} {'pares':>11} {'lista [s]':>10} {'fuerzas [s]':>12} "
+          f"{'ns/átomo':>9} {'O(N²) [s]':>10}")
+    for n in sizes:
+        pos = lattice_positions(n, rng)
+        nb = NonBondedForce(epsilon=1.0, sigma=1.0, cutoff=cutoff, skin=skin)
+
+        t_build = best_time(lambda: nb.neighbors.build(pos))
+        t_force = best_time(lambda: nb.compute(pos))
+
+        # La referencia cuadrática solo es viable para sistemas pequeños
+        t_brute = best_time(lambda: brute_force_pairs(pos, cutoff + skin)) if n <= 5000 else np.nan
+
+        per_atom = 1e9 * (t_build + t_force) / n
+        print(f"{n:>9} {len(nb.neighbors):>11} {t_build:>10.4f} {t_force:>12.4f} "
+              f"{per_atom:>9.1f} {t_brute:>10.4f}")
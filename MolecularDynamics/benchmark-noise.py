@@ -0,0 +1,85 @@
+import sys
+import time
+
+import numpy as np
+
+from md import Brownian, EnsembleBonds, HarmonicBonds, NoiseStream, State
+from md import ensemble
+
+# ==============================================
+# PARÁMETROS: H2O BROWNIANO (browniam-dynamics-H20.py)
+# ==============================================
+k = 100.0
+r_eq = 0.96
+dt = 0.001
+gamma = 1.0
+kT = 0.05
+steps = 20000
+n_replicas = 10000    # lote de ensemble-sweep.py
+ensemble_steps = 200
+block_steps = [16, 64, 256, 1024]
+
+# Uso: python benchmark-noise.py [réplicas]
+if len(sys.argv) > 1:
+    n_replicas = int(sys.argv[1])
+
+start = np.array([[0.0, 0.0], [1.5, 0.0], [-1.0, 1.0]])
+
+
+def best_of(fn, repeats=3):
+    """Mejor tiempo de ``repeats`` llamadas a ``fn()`` [s]."""
+    best = np.inf
+    for _ in range(repeats):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def draw_cost(rng, shape, n_steps):
+    """µs por paso solo en generar el ruido."""
+    out = np.empty(shape)
+
+    def draw():
+        for _ in range(n_steps):
+            rng.standard_normal(out=out)
+    return 1e6 * best_of(draw) / n_steps
+
+
+def single_run(rng):
+    bonds = HarmonicBonds.star(0, [1, 2], k, r_eq)
+    Brownian(bonds, dt, gamma, kT, rng=rng).run(State(start), steps)
+
+
+def ensemble_run(noise):
+    bonds = EnsembleBonds([0, 0], [1, 2], k, r_eq, n_replicas)
+    positions = np.tile(start, (n_replicas, 1, 1))
+    ensemble.brownian(positions, bonds, dt, gamma, kT, ensemble_steps, noise=noise)
+
+
+if __name__ == "__main__":
+    print("=== RUIDO POR PASO (µs), H2O 2D: 6 números por paso ===")
+    print(f"{'generador':<34} {'µs/paso':>9}")
+    print(f"{'Generator (PCG64), una llamada/paso':<34} "
+          f"{draw_cost(np.random.default_rng(0), start.shape, steps):>9.2f}")
+    for k_block in block_steps:
+        cost = draw_cost(NoiseStream(0, block_steps=k_block), start.shape, steps)
+        print(f"{f'NoiseStream, bloques de {k_block}':<34} {cost:>9.2f}")
+
+    print(f"\n=== INTEGRACIÓN BROWNIANA COMPLETA ({steps} pasos) ===")
+    t_generator = best_of(lambda: single_run(np.random.default_rng(0)))
+    t_stream = best_of(lambda: single_run(NoiseStream(0)))
+    print(f"Generator por paso: {1e6 * t_generator / steps:.2f} µs/paso")
+    print(f"NoiseStream:        {1e6 * t_stream / steps:.2f} µs/paso "
+          f"({t_generator / t_stream:.2f}x)")
+
+    print(f"\n=== LOTE DE {n_replicas} RÉPLICAS ({ensemble_steps} pasos) ===")
+    cases = [
+        ("Generator, un flujo por paso", lambda: np.random.default_rng(0)),
+        ("NoiseStream, un flujo", lambda: NoiseStream(0, block_steps=64)),
+        ("NoiseStream, flujo por réplica", lambda: NoiseStream(0, np.arange(n_replicas),
+                                                               block_steps=64)),
+    ]
+    for name, make in cases:
+        elapsed = best_of(lambda: ensemble_run(make()))
+        print(f"{name:<32} {1e9 * elapsed / (n_replicas * ensemble_steps):>7.0f} ns por réplica-paso")
@@ -0,0 +1,81 @@
+import os
+import sys
+import time
+
+import numpy as np
+
+from md import ForceField, HarmonicBonds, NonBondedForce, ParallelForceField
+
+# ==============================================
+# PARÁMETROS (UNIDADES REDUCIDAS DE LENNARD-JONES)
+# ==============================================
+density = 0.8      # átomos por σ³
+cutoff = 2.5       # radio de corte [σ]
+skin = 0.3         # piel de la lista de vecinos [σ]
+n_atoms = 50000
+repeats = 5
+n_cpus = os.cpu_count() or 1
+# Potencias de 2 hasta el número de núcleos: más procesos que núcleos solo
+# compiten entre sí y la barrera del grupo puede agotar su tiempo de espera
+workers = sorted({n for n in (1, 2, 4, 8, 16, 32) if n <= n_cpus} | {n_cpus})
+
+# Uso: python benchmark-parallel.py [N [P1 P2 ...]]
+if len(sys.argv) > 1:
+    n_atoms = int(float(sys.argv[1]))
+if len(sys.argv) > 2:
+    workers = [int(a) for a in sys.argv[2:]]
+
+
+def lattice_positions(n_atoms, rng):
+    """Red cúbica con la densidad pedida y una pequeña perturbación."""
+    side = int(np.ceil(n_atoms ** (1 / 3)))
+    spacing = (1.0 / density) ** (1 / 3)
+    grid = np.indices((side, side, side)).reshape(3, -1).T[:n_atoms]
+    return grid * spacing + rng.normal(0, 0.05, (n_atoms, 3))
+
+
+def build_terms(n_atoms):
+    """Fluido de Lennard-Jones con cadenas de 10 átomos enlazados."""
+    first = np.arange(n_atoms - 1)
+    first = first[first % 10 != 9]
+    bonds = HarmonicBonds(first, first + 1, 100.0, 1.0)
+    exclusions = np.column_stack((bonds.i, bonds.j))
+    nonbonded = NonBondedForce(epsilon=1.0, sigma=1.0, cutoff=cutoff, skin=skin,
+                               exclusions=exclusions)
+    return [bonds, nonbonded]
+
+
+def time_per_call(compute, pos, rng):
+    """Mejor tiempo por evaluación con desplazamientos pequeños (sin reconstruir la lista)."""
+    compute(pos)  # construye listas de vecinos / arranca procesos
+    best = np.inf
+    for _ in range(repeats):
+        moved = pos + rng.normal(0, 0.01, pos.shape)
+        t0 = time.perf_counter()
+        compute(moved)
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+if __name__ == "__main__":
+    rng = np.random.default_rng(0)
+    pos = lattice_positions(n_atoms, rng)
+
+    serial = ForceField(*build_terms(n_atoms))
+    ref_forces, ref_pe = serial.compute(pos)
+    t_serial = time_per_call(serial.compute, pos, rng)
+
+    print(f"N = {n_atoms} átomos, {n_cpus} núcleos disponibles")
+    print(f"serie: {1e3 * t_serial:.1f} ms por evaluación\n")
+    print(f"{'procesos':>8} {'ms/eval':>9} {'aceleración':>12} {'eficiencia':>11} {'error máx.':>11}")
+    for n_workers in workers:
+        if n_workers > n_cpus:
+            print(f"{n_workers:>8} omitido: más procesos que núcleos ({n_cpus})")
+            continue
+        with ParallelForceField(build_terms(n_atoms), n_workers=n_workers) as field:
+            forces, pe = field(pos)
+            error = max(np.max(np.abs(forces - ref_forces)), abs(pe - ref_pe) / abs(ref_pe))
+            t = time_per_call(field, pos, rng)
+        speedup = t_serial / t
+        print(f"{n_workers:>8} {1e3 * t:>9.1f} {speedup:>11.2f}x "
+              f"{100 * speedup / n_workers:>10.0f}% {error:>11.1e}")
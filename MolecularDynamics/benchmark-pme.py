@@ -0,0 +1,95 @@
+import os
+import sys
+import time
+
+import numpy as np
+
+from md import Topology, VelocityVerlet, ewald_sum, read_parameters
+from md.pme import ewald_kmax
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+# ==============================================
+# PARÁMETROS: CAJAS DE AGUA PERIÓDICAS CON PME
+# ==============================================
+sizes = [216, 512, 1000, 2744, 8000]   # moléculas de agua
+spacing = 3.1                          # [Å] entre moléculas
+cutoff = 8.0
+skin = 1.0
+ewald_tol = 1e-5
+steps = 3                              # pasos de Verlet cronometrados por tamaño
+max_ewald_atoms = 3000                 # la suma de Ewald directa solo en cajas pequeñas
+
+# Uso: python benchmark-pme.py [moléculas de agua ...]
+if len(sys.argv) > 1:
+    sizes = [int(a) for a in sys.argv[1:]]
+
+water = Topology.from_xyz(os.path.join(HERE, 'data', 'h2o.xyz'),
+                          read_parameters(os.path.join(HERE, 'data', 'parameters.dat')))
+
+
+def box_side(n_water):
+    """Lado [Å] de la caja de ``water.replicate(n_water, spacing)``."""
+    return np.ceil(n_water ** (1 / 3) - 1e-9) * spacing
+
+
+def best_of(fn, repeats=3):
+    """Mejor tiempo de ``repeats`` llamadas a ``fn()`` [s]."""
+    best = np.inf
+    for _ in range(repeats):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def measure(n_water):
+    """Tiempos [s] de la parte recíproca, de NonBondedForce y de un paso completo."""
+    top = water.replicate(n_water, spacing, random_orientation=True, seed=0)
+    nb = top.nonbonded(cutoff=cutoff, skin=skin, periodic=True, electrostatics='pme',
+                       ewald_tol=ewald_tol)
+    pos = top.positions
+    nb.compute(pos)
+    row = {'atoms': top.n_atoms, 'grid': nb.pme.grid[0],
+           'recip': best_of(lambda: nb.pme.compute(pos)),
+           'nonbonded': best_of(lambda: nb.compute(pos))}
+    state = top.state(kT=0.596, seed=1)
+    integrator = VelocityVerlet(top.terms(cutoff=cutoff, skin=skin, periodic=True,
+                                          electrostatics='pme', ewald_tol=ewald_tol), 0.005)
+    integrator.evaluate(state)
+    row['step'] = best_of(lambda: integrator.run(state, steps), repeats=1) / steps
+    if top.n_atoms <= max_ewald_atoms:
+        k_max = ewald_kmax(top.box, nb.ewald_alpha, ewald_tol)
+        row['ewald'] = best_of(lambda: ewald_sum(pos, top.charges, top.box, nb.ewald_alpha,
+                                                 cutoff, k_max, top.exclusions()), repeats=1)
+    return row
+
+
+if __name__ == "__main__":
+    print(f"=== PME: agua periódica, cutoff {cutoff} Å, tolerancia de Ewald {ewald_tol} ===")
+    print(f"{'átomos':>7} {'malla':>6} {'recíproca':>10} {'real':>9} {'paso':>9} "
+          f"{'Ewald directa':>14}   [ms]")
+    rows = []
+    for n in sizes:
+        if box_side(n) <= 2 * (cutoff + skin):
+            # Imagen mínima: la lista de vecinos (cutoff + skin) debe ser menor que L/2
+            print(f"{3 * n:>7} omitido: caja de {box_side(n):.1f} Å, se necesita más de "
+                  f"2 (cutoff + skin) = {2 * (cutoff + skin):.1f} Å")
+            continue
+        row = measure(n)
+        rows.append(row)
+        ewald = f"{1e3 * row['ewald']:14.1f}" if 'ewald' in row else f"{'-':>14}"
+        print(f"{row['atoms']:>7} {row['grid']:>5}³ {1e3 * row['recip']:>10.1f} "
+              f"{1e3 * (row['nonbonded'] - row['recip']):>9.1f} {1e3 * row['step']:>9.1f} {ewald}")
+
+    if len(rows) > 1:
+        n_atoms = np.log([r['atoms'] for r in rows])
+        print("\nExponente de escala (tiempo ∝ N^p):")
+        for key, name in (('recip', 'parte recíproca'), ('step', 'paso completo')):
+            p = np.polyfit(n_atoms, np.log([r[key] for r in rows]), 1)[0]
+            print(f"  {name:<16} p = {p:.2f}")
+        timed = [r for r in rows if 'ewald' in r]
+        if len(timed) > 1:
+            p = np.polyfit(np.log([r['atoms'] for r in timed]),
+                           np.log([r['ewald'] for r in timed]), 1)[0]
+            print(f"  {'Ewald directa':<16} p = {p:.2f}")
@@ -0,0 +1,93 @@
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+
+from md import Topology, TrajectoryWriter, VelocityVerlet, open_trajectory, read_parameters
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+# ==============================================
+# PARÁMETROS: CAJAS DE AGUA EN FLOAT64 Y EN PRECISIÓN MIXTA
+# ==============================================
+sizes = [1000, 4000, 8000]   # moléculas de agua
+spacing = 3.1                # [Å] entre moléculas
+cutoff = 9.0
+skin = 1.0
+steps = 5                    # pasos de Verlet cronometrados por tamaño y precisión
+traj_frames = 20             # cuadros para comparar los formatos de trayectoria
+
+# Uso: python benchmark-precision.py [moléculas de agua ...]
+if len(sys.argv) > 1:
+    sizes = [int(a) for a in sys.argv[1:]]
+
+water = Topology.from_xyz(os.path.join(HERE, 'data', 'h2o.xyz'),
+                          read_parameters(os.path.join(HERE, 'data', 'parameters.dat')))
+
+TRAJECTORY_FORMATS = [
+    ('float64', {}),
+    ('float32', {'dtype': np.float32}),
+    ('float16', {'dtype': np.float16}),
+    ('cuantizada', {'quantize': True}),
+]
+
+
+def measure(top, precision):
+    """Tiempo por paso [s], bytes del estado, pico de memoria de un paso y el estado."""
+    state = top.state(kT=0.596, seed=1, precision=precision)
+    integrator = VelocityVerlet(top.terms(cutoff=cutoff, skin=skin), 0.005)
+    integrator.evaluate(state)
+    integrator.advance(state, 2)                       # buffers y lista de vecinos ya creados
+    t0 = time.perf_counter()
+    integrator.advance(state, steps)
+    elapsed = (time.perf_counter() - t0) / steps
+    tracemalloc.start()
+    integrator.step(state)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    state_bytes = state.positions.nbytes + state.velocities.nbytes + state.forces.nbytes
+    return elapsed, state_bytes, peak, state
+
+
+def trajectory_formats(top, state):
+    """Bytes por cuadro y error máximo [Å] de cada formato de trayectoria."""
+    integrator = VelocityVerlet(top.terms(cutoff=cutoff, skin=skin), 0.005)
+    integrator.evaluate(state)
+    frames = np.empty((traj_frames,) + state.positions.shape)
+    for frame in frames:
+        integrator.step(state)
+        frame[:] = state.positions
+    rows = []
+    with tempfile.TemporaryDirectory(prefix='md-precision-') as tmp:
+        for label, options in TRAJECTORY_FORMATS:
+            path = os.path.join(tmp, f'{label}.mdtraj')
+            with TrajectoryWriter(path, frames.shape[1:], **options) as writer:
+                writer.write_block(frames)
+            traj = open_trajectory(path)
+            rows.append((label, traj.frame_bytes, np.max(np.abs(np.asarray(traj.frames) - frames))))
+    return rows
+
+
+if __name__ == "__main__":
+    print(f"=== Precisión mixta: agua, cutoff {cutoff} Å, Velocity Verlet ===")
+    print(f"{'átomos':>7} {'double':>9} {'mixta':>9} {'aceleración':>12} "
+          f"{'estado double':>14} {'estado mixta':>13} {'pico double':>12} {'pico mixta':>11}")
+    print(f"{'':>7} {'[ms/paso]':>9} {'[ms/paso]':>9} {'':>12} {'[MiB]':>14} {'[MiB]':>13} "
+          f"{'[MiB]':>12} {'[MiB]':>11}")
+    for n in sizes:
+        top = water.replicate(n, spacing, random_orientation=True, seed=0)
+        t_d, bytes_d, peak_d, _ = measure(top, 'double')
+        t_m, bytes_m, peak_m, state = measure(top, 'mixed')
+        print(f"{top.n_atoms:>7} {1e3 * t_d:>9.1f} {1e3 * t_m:>9.1f} {t_d / t_m:>11.2f}x "
+              f"{bytes_d / 2**20:>14.2f} {bytes_m / 2**20:>13.2f} {peak_d / 2**20:>12.1f} "
+              f"{peak_m / 2**20:>11.1f}")
+
+    print(f"\n=== Trayectorias de {top.n_atoms} átomos ({traj_frames} cuadros) ===")
+    print(f"{'formato':>11} {'bytes/cuadro':>13} {'relativo':>9} {'error máx [Å]':>14}")
+    rows = trajectory_formats(top, state)
+    full = rows[0][1]
+    for label, frame_bytes, error in rows:
+        print(f"{label:>11} {frame_bytes:>13} {frame_bytes / full:>9.2f} {error:>14.1e}")
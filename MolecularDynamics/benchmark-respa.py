@@ -0,0 +1,108 @@
+import sys
+import time
+
+import numpy as np
+
+from md import RESPA, HarmonicBonds, NonBondedForce, State, VelocityVerlet
+
+# ==============================================
+# PARÁMETROS: CAJA DE METANO (kcal/mol, Å, uma)
+# ==============================================
+# Unidad de tiempo: sqrt(uma Å² / (kcal/mol)) ≈ 48.9 fs
+m_C = 12.011
+m_H = 1.008
+k_bond = 450.0    # constante de enlace C-H [kcal/mol/Å²] (rígida)
+r_eq = 1.09
+eps = {'C': 0.066, 'H': 0.030}   # OPLS-AA [kcal/mol]
+sig = {'C': 3.50, 'H': 2.50}     # [Å]
+charge = {'C': -0.24, 'H': 0.06} # [e]
+n_side = 3          # n_side³ moléculas
+spacing = 4.2       # [Å]
+cutoff = 9.0
+kT = 0.596          # 300 K [kcal/mol]
+t_total = 2.0       # tiempo simulado [unidades de 48.9 fs]
+n_inner = 4
+dt_outer = 0.02
+fixed_dts = [0.02, 0.01, 0.005, 0.0025, 0.00125]
+
+# Uso: python benchmark-respa.py [n_inner [dt_externo]]
+if len(sys.argv) > 1:
+    n_inner = int(sys.argv[1])
+if len(sys.argv) > 2:
+    dt_outer = float(sys.argv[2])
+
+
+def methane_box(rng):
+    """n_side³ moléculas de CH4 en red cúbica con velocidades de Maxwell a kT."""
+    tetra = np.array([[1, 1, 1], [-1, -1, 1], [-1, 1, -1], [1, -1, -1]]) / np.sqrt(3) * r_eq
+    centers = np.indices((n_side,) * 3).reshape(3, -1).T * spacing
+    n_mol = len(centers)
+    pos = np.concatenate([np.vstack([c, c + tetra]) for c in centers])
+    kinds = ['C', 'H', 'H', 'H', 'H'] * n_mol
+    masses = np.array([m_C if k == 'C' else m_H for k in kinds])
+    vel = rng.normal(size=pos.shape) * np.sqrt(kT / masses)[:, None]
+    vel -= masses @ vel / masses.sum()
+
+    first = 5 * np.arange(n_mol)
+    bonds = HarmonicBonds(np.repeat(first, 4), (first[:, None] + np.arange(1, 5)).ravel(),
+                          k_bond, r_eq)
+    # Excluye todos los pares de una misma molécula
+    pairs = np.array([(a, b) for a in range(5) for b in range(a + 1, 5)])
+    exclusions = (first[:, None, None] + pairs[None]).reshape(-1, 2)
+    nonbonded = NonBondedForce([eps[k] for k in kinds], [sig[k] for k in kinds],
+                               charges=[charge[k] for k in kinds], cutoff=cutoff,
+                               skin=1.0, exclusions=exclusions)
+    return pos, vel, masses, bonds, nonbonded
+
+
+def measure(make_integrator, dt, rng_seed=0):
+    """Integra t_total; devuelve (error de energía, segundos, integrador, pasos)."""
+    pos, vel, masses, bonds, nonbonded = methane_box(np.random.default_rng(rng_seed))
+    state = State(pos, vel, masses)
+    integrator = make_integrator(bonds, nonbonded, dt)
+    integrator.evaluate(state)
+    e0 = state.total_energy()
+    n_steps = int(round(t_total / dt))
+    deviation = np.empty(n_steps)
+
+    def track(s):
+        deviation[s.step - 1] = s.total_energy() - e0
+
+    t0 = time.perf_counter()
+    integrator.run(state, n_steps, callbacks=[track])
+    elapsed = time.perf_counter() - t0
+    # Error: desviación máxima de la energía total relativa a la energía cinética media
+    return np.max(np.abs(deviation)) / (1.5 * len(masses) * kT), elapsed, integrator, n_steps
+
+
+if __name__ == "__main__":
+    def make_respa(bonds, nonbonded, dt):
+        return RESPA(bonds, nonbonded, dt, n_inner)
+
+    def make_verlet(bonds, nonbonded, dt):
+        return VelocityVerlet([bonds, nonbonded], dt)
+
+    print(f"{n_side**3} moléculas de CH4, t = {t_total} ({t_total * 48.9:.0f} fs)\n")
+    err_r, t_r, respa, n_outer = measure(make_respa, dt_outer)
+    slow_r = respa.n_force_calls
+    print("RESPA: histograma de pasos (dt -> pasos)")
+    for dt, count in respa.step_histogram(n_outer).items():
+        kind = 'enlaces (interno)' if dt < dt_outer else 'no enlazantes (externo)'
+        print(f"  {dt:>9.5f}: {count:>7}  {kind}")
+    print(f"  error de energía {err_r:.2e}, {t_r:.2f} s, {slow_r} evaluaciones no enlazantes\n")
+
+    print(f"{'dt fijo':>9} {'error':>10} {'tiempo [s]':>11} {'eval. lentas':>13}")
+    fixed = []
+    for dt in fixed_dts:
+        err, t, verlet, _ = measure(make_verlet, dt)
+        fixed.append((dt, err, t, verlet.n_force_calls))
+        print(f"{dt:>9.5f} {err:>10.2e} {t:>11.2f} {verlet.n_force_calls:>13}")
+
+    # dt fijo con el mismo error que RESPA: el error de Verlet escala como dt²,
+    # así que se extrapola desde la medición de error más cercano
+    dt, err, t, slow = min(fixed, key=lambda f: abs(np.log(f[1] / err_r)))
+    dt_match = dt * np.sqrt(err_r / err)
+    scale = dt / dt_match
+    print(f"\nA igual error de energía ({err_r:.2e}, dt fijo ≈ {dt_match:.5f}): "
+          f"aceleración {t * scale / t_r:.1f}x en tiempo, "
+          f"{slow * scale / slow_r:.1f}x menos evaluaciones no enlazantes")
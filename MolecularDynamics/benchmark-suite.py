@@ -0,0 +1,161 @@
+import argparse
+import os
+import sys
+from functools import partial
+
+import numpy as np
+
+from md import HarmonicBonds, NonBondedForce, State, VelocityVerlet
+from md.benchmark import (HEADER, BenchmarkCase, compare, format_row, load_results, run_cases,
+                          save_results, script_system)
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+VPYTHON = os.path.join(HERE, '..', 'vpython')
+
+# ==============================================
+# PARÁMETROS
+# ==============================================
+baseline_path = os.path.join(HERE, 'benchmark-baseline.json')
+threshold = 0.2       # caída de pasos/s que cuenta como regresión (20 %)
+min_time = 0.5        # segundos mínimos por medición
+# Tamaños de los sistemas sintéticos (se multiplican con --scale)
+methane_side = 6      # 6³ moléculas = 1080 átomos
+lj_atoms = 8000
+plummer_bodies = 4000
+water_molecules = 216
+# Caja de agua con PME (molecular-box.py --pme): red de 3.1 Å y lista de
+# vecinos de pme_cutoff + skin = 9 Å, que debe ser menor que L/2
+water_spacing = 3.1
+pme_list_radius = 8.0 + 1.0
+
+
+# ==============================================
+# SISTEMAS SINTÉTICOS ESCALABLES
+# ==============================================
+def methane_box(n_side, seed=0):
+    """Caja de CH4 con enlaces, LJ y Coulomb (como benchmark-respa.py), velocity Verlet."""
+    rng = np.random.default_rng(seed)
+    r_eq, kT = 1.09, 0.596
+    tetra = np.array([[1, 1, 1], [-1, -1, 1], [-1, 1, -1], [1, -1, -1]]) / np.sqrt(3) * r_eq
+    centers = np.indices((n_side,) * 3).reshape(3, -1).T * 4.2
+    n_mol = len(centers)
+    pos = (centers[:, None, :] + np.vstack([np.zeros(3), tetra])[None]).reshape(-1, 3)
+    is_c = np.tile([True, False, False, False, False], n_mol)
+    masses = np.where(is_c, 12.011, 1.008)
+    vel = rng.normal(size=pos.shape) * np.sqrt(kT / masses)[:, None]
+    first = 5 * np.arange(n_mol)
+    bonds = HarmonicBonds(np.repeat(first, 4), (first[:, None] + np.arange(1, 5)).ravel(),
+                          450.0, r_eq)
+    pairs = np.array([(a, b) for a in range(5) for b in range(a + 1, 5)])
+    exclusions = (first[:, None, None] + pairs[None]).reshape(-1, 2)
+    nonbonded = NonBondedForce(np.where(is_c, 0.066, 0.030), np.where(is_c, 3.5, 2.5),
+                               charges=np.where(is_c, -0.24, 0.06), cutoff=9.0, skin=1.0,
+                               exclusions=exclusions)
+    return State(pos, vel, masses), VelocityVerlet([bonds, nonbonded], 0.02)
+
+
+def lj_chains(n_atoms, seed=0):
+    """Fluido de Lennard-Jones con cadenas de 10 átomos (como benchmark-parallel.py)."""
+    rng = np.random.default_rng(seed)
+    side = int(np.ceil(n_atoms ** (1 / 3)))
+    grid = np.indices((side,) * 3).reshape(3, -1).T[:n_atoms] * 0.8 ** (-1 / 3)
+    pos = grid + rng.normal(0, 0.05, grid.shape)
+    first = np.arange(n_atoms - 1)
+    first = first[first % 10 != 9]
+    bonds = HarmonicBonds(first, first + 1, 100.0, 1.0)
+    nonbonded = NonBondedForce(epsilon=1.0, sigma=1.0, cutoff=2.5, skin=0.3,
+                               exclusions=np.column_stack((bonds.i, bonds.j)))
+    vel = rng.normal(0, 1.0, pos.shape)
+    return State(pos, vel), VelocityVerlet([bonds, nonbonded], 0.002)
+
+
+def plummer_cluster(n_bodies, seed=0):
+    """Cúmulo de Plummer con Barnes-Hut y leapfrog (como plummer-cluster.py)."""
+    if VPYTHON not in sys.path:
+        sys.path.insert(0, VPYTHON)
+    from nbody import Bodies, Gravity, Leapfrog, plummer
+    return Bodies(*plummer(n_bodies, rng=seed)), Leapfrog(Gravity(theta=0.5, softening=0.01), 1e-3)
+
+
+def min_periodic_waters():
+    """Menor número de aguas cuya caja (lado ceil(n^(1/3)) · spacing) supera 2 (cutoff + skin)."""
+    side = int(np.floor(2 * pme_list_radius / water_spacing)) + 1
+    return (side - 1) ** 3 + 1
+
+
+def make_cases(scale=1.0):
+    """Modelos de los scripts (tal como los integran) y sistemas sintéticos."""
+    script = lambda name: os.path.join(HERE, name)
+    cases = [
+        BenchmarkCase('CO verlet', partial(script_system, script('verlet-CO.py'))),
+        BenchmarkCase('CO2 leapfrog', partial(script_system, script('leapfrog-CO2.py'))),
+        BenchmarkCase('H2O verlet', partial(script_system, script('verlet-H20.py'))),
+        BenchmarkCase('H2O browniano', partial(script_system, script('browniam-dynamics-H20.py'),
+                                               seed=0)),
+        BenchmarkCase('CH4', partial(script_system, script('verlet-CH4.py'))),
+        BenchmarkCase('CH4 v2', partial(script_system, script('verlet-CH4.v2.py'))),
+        BenchmarkCase('binario', partial(script_system, os.path.join(VPYTHON, 'binary-system.py')),
+                      time_unit_fs=None),
+    ]
+    n_side = max(1, round(methane_side * scale ** (1 / 3)))
+    n_lj = int(lj_atoms * scale)
+    n_plummer = int(plummer_bodies * scale)
+    n_water = int(water_molecules * scale)
+    # Con --scale pequeño la caja periódica no admitiría el corte: se acota por debajo
+    n_pme = max(n_water, min_periodic_waters())
+    cases += [
+        BenchmarkCase(f'metano {5 * n_side**3}', partial(methane_box, n_side), group='sintético'),
+        BenchmarkCase(f'LJ cadenas {n_lj}', partial(lj_chains, n_lj), group='sintético'),
+        BenchmarkCase(f'plummer {n_plummer}', partial(plummer_cluster, n_plummer),
+                      time_unit_fs=None, group='sintético'),
+        BenchmarkCase(f'agua {3 * n_water}', partial(script_system, script('molecular-box.py'),
+                                                     n=n_water), group='sintético'),
+        BenchmarkCase(f'agua PME {3 * n_pme}', partial(script_system, script('molecular-box.py'),
+                                                       n=n_pme, periodic=True),
+                      group='sintético'),
+    ]
+    return cases
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmarks de todos los modelos con "
+                                                 "seguimiento de regresiones")
+    parser.add_argument('--output', default=os.path.join(HERE, 'benchmark-results.json'),
+                        help="archivo JSON de resultados")
+    parser.add_argument('--baseline', default=baseline_path, help="línea base JSON")
+    parser.add_argument('--save-baseline', action='store_true',
+                        help="guardar estos resultados como nueva línea base")
+    parser.add_argument('--threshold', type=float, default=threshold,
+                        help="caída relativa de pasos/s que cuenta como regresión")
+    parser.add_argument('--scale', type=float, default=1.0,
+                        help="factor de tamaño de los sistemas sintéticos")
+    parser.add_argument('--only', help="solo los casos cuyo nombre contiene este texto")
+    parser.add_argument('--min-time', type=float, default=min_time,
+                        help="segundos mínimos por medición")
+    parser.add_argument('--in-process', action='store_true',
+                        help="medir en este proceso (el pico de RSS deja de ser por caso)")
+    args = parser.parse_args()
+
+    cases = make_cases(args.scale)
+    if args.only:
+        cases = [c for c in cases if args.only.lower() in c.name.lower()]
+    baseline = {}
+    if not args.save_baseline and os.path.exists(args.baseline):
+        baseline = load_results(args.baseline)
+
+    print(HEADER + (f" {'vs base':>8}" if baseline else ""))
+    results = {}
+    for name, result in run_cases(cases, isolate=not args.in_process, min_time=args.min_time):
+        results[name] = result
+        print(format_row(name, result, compare({name: result}, baseline, args.threshold).get(name)))
+
+    save_results(args.output, results)
+    print(f"\nResultados en {args.output}")
+    if args.save_baseline:
+        save_results(args.baseline, results)
+        print(f"Línea base guardada en {args.baseline}")
+
+    regressions = [n for n, (_, bad) in compare(results, baseline, args.threshold).items() if bad]
+    if regressions:
+        print(f"Regresiones (> {args.threshold:.0%} más lentos): {', '.join(regressions)}")
+        sys.exit(1)
@@ -1,6 +1,13 @@
+import os
+import sys
+
 import numpy as np
 import matplotlib.pyplot as plt
 
+from md import (BondConstraints, Brownian, CheckpointWriter, HarmonicBonds, NoiseStream, State,
+                TrajectoryRecorder, TrajectoryWriter, open_trajectory)
+from md.checkpoint import restore
+
 # Parámetros físicos y de simulación
 k = 100.0              # Constante del resorte (kcal/mol/Å²)
 r_eq = 0.96            # Longitud de enlace O-H (Å)
@@ -8,6 +15,8 @@ dt = 0.001             # Paso de tiempo
 gamma = 1.0            # Coeficiente de fricción
 kT = 0.001             # Energía térmica (kcal/mol)
 steps = 10000
+rigid_bonds = False    # enlaces O-H rígidos (SHAKE) en lugar de resortes
+checkpoint_every = 1000  # pasos entre checkpoints de las corridas a disco
 
 # Posiciones iniciales
 positions = np.array([
@@ -16,44 +25,74 @@ positions = np.array([
     [-1.0, 1.0]         # H2
 ])
 
-trajectory = [positions.copy()]
-
-# Función de fuerza por resorte
-def spring_force(r_vec, r0, k):
-    dist = np.linalg.norm(r_vec)
-    if dist == 0:
-        return np.zeros_like(r_vec)
-    direction = r_vec / dist
-    return -k * (dist - r0) * direction
-
-# Simulación
-for step in range(steps):
-    forces = np.zeros_like(positions)
-
-    # O-H1 y O-H2
-    for i in [1, 2]:
-        r_vec = positions[i] - positions[0]
-        f = spring_force(r_vec, r_eq, k)
-        forces[i] += f
-        forces[0] -= f
-
-    # Movimiento tipo Langevin overdamped
-    noise = np.random.normal(scale=np.sqrt(2 * gamma * kT * dt), size=positions.shape)
-    positions += dt / gamma * forces + noise
-
-    trajectory.append(positions.copy())
-
-# Convertir trayectoria a array
-trajectory = np.array(trajectory)
-
-# Graficar trayectoria en tiempo para cada átomo (coordenada x)
-plt.figure(figsize=(10, 6))
-labels = ['Oxígeno', 'Hidrógeno 1', 'Hidrógeno 2']
-for i in range(3):
-    plt.plot(trajectory[:, i, 0], label=f'{labels[i]} - x')
-plt.xlabel('Tiempo (pasos)')
-plt.ylabel('Posición x (Å)')
-plt.title('Evolución de posición x con el tiempo')
-plt.legend()
-plt.grid()
-plt.show()
\ No newline at end of file
+# Resortes O-H1 y O-H2 (enlaces de longitud cero no aportan fuerza)
+bonds = HarmonicBonds.star(0, [1, 2], k, r_eq)
+
+
+def make_system(dt=dt, seed=None, replica=0):
+    """Estado inicial e integrador (usado también por benchmark-suite.py)."""
+    state = State(positions)
+
+    # Movimiento tipo Langevin overdamped: x += dt/γ F + sqrt(2 kT dt/γ) ξ, con
+    # ξ generado por bloques (Philox) y reproducible a partir de (seed, replica, paso)
+    rng = NoiseStream(seed, replica)
+    if rigid_bonds:
+        integrator = Brownian([], dt, gamma, kT, rng=rng,
+                              constraints=BondConstraints.from_bonds(bonds))
+    else:
+        integrator = Brownian(bonds, dt, gamma, kT, rng=rng)
+    return state, integrator
+
+
+def run_simulation(steps=steps, dt=dt, seed=None):
+    """Devuelve la trayectoria (pasos + 1, átomos, dim)."""
+    state, integrator = make_system(dt, seed)
+
+    trajectory = TrajectoryRecorder.for_run(positions.shape, steps)
+    trajectory.append(state.positions)
+    integrator.run(state, steps, callbacks=[lambda s: trajectory.append(s.positions)])
+    return trajectory.frames()
+
+
+def run_checkpointed(prefix, steps=steps, dt=dt, seed=None, every=checkpoint_every):
+    """Corrida a disco (``prefix.mdtraj``) con checkpoints en ``prefix.ckpt.npz``.
+
+    Si el checkpoint existe continúa desde él hasta completar ``steps``
+    pasos en total, con el mismo resultado bit a bit que sin interrumpir.
+    """
+    state, integrator = make_system(dt, seed)
+    checkpoint, path = f'{prefix}.ckpt.npz', f'{prefix}.mdtraj'
+    if os.path.exists(checkpoint):
+        meta = restore(checkpoint, state, integrator)
+        writer = TrajectoryWriter.resume(path, meta['writers']['trajectory'])
+    else:
+        writer = TrajectoryWriter(path, positions.shape, dt=dt)
+        writer.append(state.positions)
+
+    # El cuadro del paso se escribe antes del checkpoint que lo cuenta
+    with writer, CheckpointWriter(checkpoint, every, integrator,
+                                  writers={'trajectory': writer}) as checkpoints:
+        integrator.run(state, steps - state.step,
+                       callbacks=[lambda s: writer.append(s.positions), checkpoints])
+    return path
+
+
+if __name__ == "__main__":
+    # Argumento opcional: prefijo de salida para la corrida con checkpoints
+    # (volver a ejecutar con el mismo prefijo reanuda una corrida cortada)
+    if len(sys.argv) > 1:
+        trajectory = open_trajectory(run_checkpointed(sys.argv[1], seed=0)).frames
+    else:
+        trajectory = run_simulation()
+
+    # Graficar trayectoria en tiempo para cada átomo (coordenada x)
+    plt.figure(figsize=(10, 6))
+    labels = ['Oxígeno', 'Hidrógeno 1', 'Hidrógeno 2']
+    for i in range(3):
+        plt.plot(trajectory[:, i, 0], label=f'{labels[i]} - x')
+    plt.xlabel('Tiempo (pasos)')
+    plt.ylabel('Posición x (Å)')
+    plt.title('Evolución de posición x con el tiempo')
+    plt.legend()
+    plt.grid()
+    plt.show()
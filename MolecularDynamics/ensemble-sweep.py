@@ -0,0 +1,49 @@
+import time
+
+import numpy as np
+
+from md import EnsembleBonds
+from md import ensemble
+
+# ==============================================
+# BARRIDO DE PARÁMETROS: H2O BROWNIANO
+# ==============================================
+# Cada combinación (k, kT) es una réplica de browniam-dynamics-H20.py; todas
+# se integran a la vez en un arreglo (réplicas, átomos, 2).
+k_values = np.linspace(50.0, 500.0, 10)   # kcal/mol/Å²
+kT_values = np.linspace(0.001, 0.1, 10)   # kcal/mol
+seeds_per_point = 100
+r_eq = 0.96
+dt = 0.001
+gamma = 1.0
+steps = 10000
+burn_in = 2000
+
+k_grid, kT_grid = np.meshgrid(k_values, kT_values, indexing='ij')
+k_rep = np.repeat(k_grid.ravel(), seeds_per_point)
+kT_rep = np.repeat(kT_grid.ravel(), seeds_per_point)
+n_rep = len(k_rep)
+
+# Mismas posiciones iniciales que el script original en todas las réplicas
+start = np.array([[0.0, 0.0], [1.5, 0.0], [-1.0, 1.0]])
+positions = np.tile(start, (n_rep, 1, 1))
+bonds = EnsembleBonds([0, 0], [1, 2], k_rep, r_eq, n_rep)
+
+if __name__ == "__main__":
+    print(f"Integrando {n_rep} réplicas x {steps} pasos...")
+    t0 = time.perf_counter()
+    positions, _ = ensemble.brownian(positions, bonds, dt, gamma, kT_rep, burn_in, seed=1)
+    positions, traj = ensemble.brownian(positions, bonds, dt, gamma, kT_rep,
+                                        steps - burn_in, seed=2, record_every=10)
+    elapsed = time.perf_counter() - t0
+    print(f"Tiempo: {elapsed:.1f} s ({1e9 * elapsed / (n_rep * steps):.0f} ns por réplica-paso)")
+
+    # Fluctuación de la distancia O-H frente a la predicción kT/k
+    oh = np.linalg.norm(traj[:, :, 1:] - traj[:, :, :1], axis=-1)  # (frames, R, 2)
+    var = oh.var(axis=0).mean(axis=1).reshape(len(k_values), len(kT_values), -1).mean(axis=2)
+
+    print("\n=== VARIANZA DE LA DISTANCIA O-H (simulada / kT/k) ===")
+    print("k \\ kT " + " ".join(f"{kT:>7.3f}" for kT in kT_values))
+    for a, k in enumerate(k_values):
+        ratio = var[a] / (kT_values / k)
+        print(f"{k:>7.1f} " + " ".join(f"{x:>7.2f}" for x in ratio))
@@ -1,6 +1,10 @@
 import numpy as np
 import matplotlib.pyplot as plt
 
+from md import HarmonicBonds, Leapfrog, State, TrajectoryRecorder
+from md.analysis import (angular_to_wavenumber, frame_lengths, spectrum_peaks,
+                         vibrational_spectrum)
+
 # Parámetros físicos (unidades arbitrarias)
 m_O = 16.0  # masa del oxígeno
 m_C = 12.0  # masa del carbono
@@ -20,49 +24,75 @@ positions[2] += 0.2  # desplaza O2
 # Parámetros de integración
 dt = 0.001
 steps = 5000
+# Corrida larga para el espectro: la resolución es 1 / (spectrum_steps · dt)
+spectrum_steps = 100000
+
+# Resortes O1-C y C-O2: la fuerza sobre cada O apunta hacia el C cuando el
+# enlace está estirado (el error de signo original ya no puede aparecer)
+bonds = HarmonicBonds([0, 1], [1, 2], k, r_eq)
+
+
+def make_system(dt=dt):
+    """Estado inicial e integrador (usado también por benchmark-suite.py)."""
+    state = State(positions, velocities, masses)
+
+    # Leapfrog: en el primer paso las velocidades se retrasan medio paso;
+    # luego v += F/m dt, x += v dt, F = F(x)
+    return state, Leapfrog(bonds, dt)
+
+
+def run_simulation(steps=steps, dt=dt):
+    """Integra la molécula y devuelve la trayectoria (pasos + 1, átomos)."""
+    state, integrator = make_system(dt)
+
+    # Guardar trayectoria
+    trajectory = TrajectoryRecorder.for_run(positions.shape, steps)
+    trajectory.append(state.positions)
+    integrator.run(state, steps, callbacks=[lambda s: trajectory.append(s.positions)])
+    return trajectory.frames()
+
+
+def stretch_modes():
+    """Números de onda [cm⁻¹] analíticos del estiramiento simétrico y antisimétrico.
+
+    ω_s = sqrt(k / m_O) (el C quieto) y ω_a = sqrt(k (1/m_O + 2/m_C)).
+    """
+    omega = np.sqrt([k / m_O, k * (1 / m_O + 2 / m_C)])
+    return angular_to_wavenumber(omega)
+
+
+def stretch_spectrum(steps=spectrum_steps, dt=dt):
+    """Espectro de las longitudes C=O: (números de onda [cm⁻¹], potencia)."""
+    lengths = frame_lengths(run_simulation(steps, dt), bonds.i, bonds.j)
+    return vibrational_spectrum(lengths, dt)
+
+
+if __name__ == "__main__":
+    trajectory = run_simulation()
+
+    # Graficar resultados
+    plt.figure(figsize=(10, 5))
+    plt.plot(trajectory[:, 0], label='Oxígeno 1 (O1)', color='red')
+    plt.plot(trajectory[:, 1], label='Carbono (C)', color='black')
+    plt.plot(trajectory[:, 2], label='Oxígeno 2 (O2)', color='blue')
+    plt.xlabel("Paso de tiempo")
+    plt.ylabel("Posición (1D)")
+    plt.title("Oscilaciones de la molécula de CO₂ con Leapfrog (CORREGIDO)")
+    plt.legend()
+    plt.grid(True)
 
-# Función para calcular fuerzas (CORRECCIÓN APLICADA)
-def compute_forces(pos):
-    f = np.zeros_like(pos)
-    
-    # Resorte entre O1 y C (CORRECCIÓN: eliminado signo negativo)
-    dx1 = pos[1] - pos[0]
-    f12 = k * (dx1 - r_eq)  # ← Aquí estaba el error principal
-    f[0] += f12
-    f[1] -= f12
-    
-    # Resorte entre C y O2 (CORRECCIÓN: eliminado signo negativo)
-    dx2 = pos[2] - pos[1]
-    f23 = k * (dx2 - r_eq)  # ← Aquí estaba el error principal
-    f[1] += f23
-    f[2] -= f23
-    
-    return f
-
-# Inicialización de Leapfrog (medio paso atrás)
-forces = compute_forces(positions)
-velocities -= 0.5 * dt * forces / masses
-
-# Guardar trayectoria
-trajectory = [positions.copy()]
-
-# Bucle principal de integración
-for _ in range(steps):
-    positions += dt * velocities
-    forces = compute_forces(positions)
-    velocities += dt * forces / masses
-    trajectory.append(positions.copy())
-
-trajectory = np.array(trajectory)
-
-# Graficar resultados
-plt.figure(figsize=(10, 5))
-plt.plot(trajectory[:, 0], label='Oxígeno 1 (O1)', color='red')
-plt.plot(trajectory[:, 1], label='Carbono (C)', color='black')
-plt.plot(trajectory[:, 2], label='Oxígeno 2 (O2)', color='blue')
-plt.xlabel("Paso de tiempo")
-plt.ylabel("Posición (1D)")
-plt.title("Oscilaciones de la molécula de CO₂ con Leapfrog (CORREGIDO)")
-plt.legend()
-plt.grid(True)
-plt.show()
+    # Espectro vibracional: picos en los modos de estiramiento
+    nu, power = stretch_spectrum()
+    peaks = spectrum_peaks(nu, power, n_peaks=2, min_separation=50.0)
+    print(f"Picos del espectro: {peaks.round(1)} cm⁻¹ (analíticos {stretch_modes().round(1)})")
+    plt.figure(figsize=(10, 5))
+    plt.semilogy(nu, power, color='black')
+    for nu_mode, label in zip(stretch_modes(), ['simétrico', 'antisimétrico']):
+        plt.axvline(nu_mode, ls='--', color='gray', label=f'{label} (analítico)')
+    plt.xlim(0, 2 * stretch_modes()[1])
+    plt.xlabel("Número de onda (cm⁻¹)")
+    plt.ylabel("Potencia")
+    plt.title("Espectro de las longitudes C=O")
+    plt.legend()
+    plt.grid(True)
+    plt.show()
@@ -0,0 +1,77 @@
+"""
+Núcleo reutilizable para los ejemplos de dinámica molecular.
+
+Los scripts de esta carpeta importan de aquí los kernels vectorizados en
+lugar de repetir los bucles por enlace.
+"""
+from .bonded import HarmonicAngles, HarmonicBonds, harmonic_angle_forces, harmonic_bond_forces
+from .checkpoint import CheckpointWriter
+from .constraints import BondConstraints
+from .ensemble import EnsembleBonds
+from .integrators import (BAOAB, RESPA, Brownian, ForceField, Integrator, Leapfrog, State,
+                          VelocityVerlet)
+from .kernels import HAVE_NUMBA, FusedVerlet, select_backend
+from .minimize import MinimizeResult, fire, lbfgs, minimize
+from .noise import NoiseStream
+from .nonbonded import NeighborList, NonBondedForce, cell_list_pairs, minimum_image, wrap_positions
+from .observables import Observables, RunningStats
+from .parallel import ParallelForceField
+from .pme import ParticleMeshEwald, ewald_sum
+from .precision import PRECISIONS, select_precision
+from .profiling import Profiler
+from .topology import ParameterTable, Topology, read_parameters, read_xyz, write_xyz
+from .trajectory import TrajectoryFile, TrajectoryRecorder, TrajectoryWriter, open_trajectory
+from .units import COULOMB_K, TIME_UNIT_FS
+from .viewer import LiveViewer, MoleculeFigure
+
+__all__ = [
+    "BAOAB",
+    "BondConstraints",
+    "Brownian",
+    "COULOMB_K",
+    "CheckpointWriter",
+    "EnsembleBonds",
+    "ForceField",
+    "FusedVerlet",
+    "HAVE_NUMBA",
+    "HarmonicAngles",
+    "HarmonicBonds",
+    "Integrator",
+    "Leapfrog",
+    "LiveViewer",
+    "MinimizeResult",
+    "MoleculeFigure",
+    "NeighborList",
+    "NoiseStream",
+    "NonBondedForce",
+    "Observables",
+    "ParallelForceField",
+    "PRECISIONS",
+    "ParticleMeshEwald",
+    "ParameterTable",
+    "Profiler",
+    "RESPA",
+    "RunningStats",
+    "State",
+    "TIME_UNIT_FS",
+    "Topology",
+    "TrajectoryFile",
+    "TrajectoryRecorder",
+    "TrajectoryWriter",
+    "VelocityVerlet",
+    "cell_list_pairs",
+    "ewald_sum",
+    "fire",
+    "harmonic_angle_forces",
+    "harmonic_bond_forces",
+    "lbfgs",
+    "minimize",
+    "minimum_image",
+    "open_trajectory",
+    "read_parameters",
+    "read_xyz",
+    "select_backend",
+    "select_precision",
+    "wrap_positions",
+    "write_xyz",
+]
@@ -0,0 +1,226 @@
+"""
+Análisis de trayectorias completas, por bloques y con FFT.
+
+Las funciones aceptan un arreglo (cuadros, átomos[, dim]), un ``np.memmap``
+o un ``TrajectoryFile`` (``open_trajectory``) y nunca cargan el archivo
+entero:
+
+- ``trajectory_geometry`` calcula longitudes de enlace y ángulos de todos
+  los cuadros con un ``einsum`` por bloque de ``chunk_frames`` cuadros.
+- ``mean_squared_displacement``, ``velocity_autocorrelation`` y
+  ``vibrational_spectrum`` necesitan el eje temporal completo, así que
+  recorren bloques de ``chunk_atoms`` átomos. Las correlaciones salen de
+  la FFT (teorema de Wiener-Khinchin) en O(T log T) en lugar de O(T²).
+
+La memoria queda acotada por el tamaño del bloque y el costo es lineal en
+el número de átomos (y cuadros, salvo el log T de la FFT).
+"""
+import numpy as np
+
+from .trajectory import QuantizedFrames
+from .units import TIME_UNIT_FS
+
+C_CM_PER_FS = 2.99792458e-5  # velocidad de la luz [cm/fs]
+
+
+def _frames(trajectory):
+    """Arreglo, memmap o ``QuantizedFrames`` de cuadros sin copiarlo a memoria."""
+    frames = getattr(trajectory, 'frames', trajectory)
+    if isinstance(frames, (np.ndarray, QuantizedFrames)):
+        return frames
+    return np.asarray(frames, dtype=float)
+
+
+def _as_3d(block):
+    """(T, N) de sistemas 1D (CO, CO2) -> (T, N, 1)."""
+    block = np.asarray(block, dtype=float)
+    return block[:, :, None] if block.ndim == 2 else block
+
+
+def _atom_blocks(n_atoms, atoms, chunk_atoms):
+    idx = np.arange(n_atoms) if atoms is None else np.asarray(atoms, dtype=np.intp)
+    for start in range(0, len(idx), chunk_atoms):
+        yield idx[start:start + chunk_atoms]
+
+
+# ==============================================
+# GEOMETRÍA POR CUADRO
+# ==============================================
+def frame_lengths(frames, i, j):
+    """Longitudes (T, enlaces) de los enlaces i-j en cada cuadro."""
+    frames = _as_3d(frames)
+    d = frames[:, j] - frames[:, i]
+    return np.sqrt(np.einsum('tbd,tbd->tb', d, d))
+
+
+def frame_angles(frames, a, center, b):
+    """Ángulos a-center-b (T, ángulos) en grados en cada cuadro."""
+    frames = _as_3d(frames)
+    u = frames[:, a] - frames[:, center]
+    v = frames[:, b] - frames[:, center]
+    cos = np.einsum('tad,tad->ta', u, v) / np.sqrt(
+        np.einsum('tad,tad->ta', u, u) * np.einsum('tad,tad->ta', v, v))
+    return np.degrees(np.arccos(np.clip(cos, -1.0, 1.0)))
+
+
+def trajectory_geometry(trajectory, bonds=None, angles=None, chunk_frames=4096):
+    """Longitudes y ángulos de todos los cuadros, recorriendo bloques de cuadros.
+
+    ``bonds`` es un par de índices (i, j) o un término con ``i``/``j``
+    (``HarmonicBonds``); ``angles`` un triplete (a, centro, b), como el de
+    ``star_angles``, o un ``HarmonicAngles``. Devuelve un diccionario con
+    ``'lengths'`` (T, enlaces) y ``'angles'`` (T, ángulos) en grados.
+    """
+    frames = _frames(trajectory)
+    n_frames = len(frames)
+    result = {}
+    if bonds is not None:
+        i, j = (bonds.i, bonds.j) if hasattr(bonds, 'i') else bonds
+        result['lengths'] = np.empty((n_frames, len(i)))
+    if angles is not None:
+        a, center, b = (angles.a, angles.b, angles.c) if hasattr(angles, 'a') else angles
+        result['angles'] = np.empty((n_frames, len(a)))
+    for start in range(0, n_frames, chunk_frames):
+        block = _as_3d(frames[start:start + chunk_frames])
+        stop = start + len(block)
+        if bonds is not None:
+            result['lengths'][start:stop] = frame_lengths(block, i, j)
+        if angles is not None:
+            result['angles'][start:stop] = frame_angles(block, a, center, b)
+    return result
+
+
+# ==============================================
+# CORRELACIONES CON FFT
+# ==============================================
+def autocorrelation(x, normalize=False):
+    """C(m) = <x(t)·x(t+m)> a lo largo del eje 0, promediada sobre los T - m orígenes.
+
+    ``x`` es (T, ...); los demás ejes se conservan. El relleno con ceros a
+    la potencia de 2 siguiente a 2T evita la correlación circular.
+    """
+    x = np.asarray(x, dtype=float)
+    n_frames = len(x)
+    n_fft = 1 << int(2 * n_frames - 1).bit_length()
+    spectrum = np.fft.rfft(x, n=n_fft, axis=0)
+    acf = np.fft.irfft(spectrum * spectrum.conj(), n=n_fft, axis=0)[:n_frames]
+    acf /= (n_frames - np.arange(n_frames)).reshape((-1,) + (1,) * (x.ndim - 1))
+    if normalize:
+        acf /= np.where(acf[0] != 0, acf[0], 1.0)
+    return acf
+
+
+def mean_squared_displacement(trajectory, atoms=None, chunk_atoms=256, per_atom=False):
+    """MSD(m) promediado sobre orígenes de tiempo y átomos, con FFT.
+
+    MSD(m) = S1(m) - 2 S2(m), con S2 la autocorrelación de las posiciones
+    (FFT) y S1 el promedio de |r(t)|² + |r(t+m)|², que sale de sumas
+    acumuladas. Las posiciones no deben estar envueltas en una caja
+    periódica. Con ``per_atom`` devuelve (T, átomos).
+    """
+    frames = _frames(trajectory)
+    n_frames = len(frames)
+    lags = n_frames - np.arange(n_frames)
+    blocks = []
+    total = np.zeros(n_frames)
+    n_atoms = 0
+    for idx in _atom_blocks(frames.shape[1], atoms, chunk_atoms):
+        x = _as_3d(frames[:, idx])
+        d2 = np.einsum('tad,tad->ta', x, x)
+        # Σ_{t < T-m} |r(t)|² + |r(t+m)|² = 2 Σ|r|² - Σ_{k < m} (|r(k)|² + |r(T-1-k)|²)
+        tails = np.cumsum(d2[:-1] + d2[:0:-1], axis=0)
+        s1 = 2 * d2.sum(axis=0) - np.concatenate([np.zeros((1, len(idx))), tails])
+        msd = s1 / lags[:, None] - 2 * autocorrelation(x).sum(axis=2)
+        if per_atom:
+            blocks.append(msd)
+        total += msd.sum(axis=1)
+        n_atoms += len(idx)
+    if per_atom:
+        return np.concatenate(blocks, axis=1)
+    return total / max(n_atoms, 1)
+
+
+def velocity_autocorrelation(trajectory, atoms=None, masses=None, normalize=True,
+                             chunk_atoms=256):
+    """VACF C(m) = <v(t)·v(t+m)> promediada sobre átomos (ponderada por masa si se da).
+
+    ``trajectory`` contiene velocidades (T, átomos[, dim]). Con
+    ``normalize`` devuelve C(m) / C(0).
+    """
+    frames = _frames(trajectory)
+    total = np.zeros(len(frames))
+    weight = 0.0
+    for idx in _atom_blocks(frames.shape[1], atoms, chunk_atoms):
+        w = np.ones(len(idx)) if masses is None else np.asarray(masses, dtype=float)[idx]
+        acf = autocorrelation(_as_3d(frames[:, idx])).sum(axis=2)
+        total += acf @ w
+        weight += w.sum()
+    total /= max(weight, 1.0)
+    if normalize and total[0] != 0:
+        total /= total[0]
+    return total
+
+
+# ==============================================
+# ESPECTROS
+# ==============================================
+def wavenumbers(n_frames, dt, time_unit_fs=TIME_UNIT_FS):
+    """Números de onda [cm⁻¹] de la rfft de ``n_frames`` muestras separadas ``dt``."""
+    return np.fft.rfftfreq(n_frames, d=dt * time_unit_fs) / C_CM_PER_FS
+
+
+def angular_to_wavenumber(omega, time_unit_fs=TIME_UNIT_FS):
+    """Frecuencia angular [rad / unidad de tiempo] -> número de onda [cm⁻¹]."""
+    return np.asarray(omega) / (2 * np.pi * time_unit_fs * C_CM_PER_FS)
+
+
+def vibrational_spectrum(signal, dt, masses=None, atoms=None, window=True, chunk_atoms=256,
+                         time_unit_fs=TIME_UNIT_FS):
+    """Densidad espectral |FFT(x - <x>)|² sumada sobre columnas.
+
+    ``signal`` es (T,), (T, columnas) o una trayectoria (T, átomos[, dim])
+    de velocidades (densidad de estados vibracionales, ponderada por masa
+    si se da ``masses``) o de coordenadas internas (longitudes de enlace,
+    modos de estiramiento). ``dt`` es el tiempo entre cuadros en unidades
+    del programa. Devuelve (números de onda [cm⁻¹], potencia); la potencia
+    es la transformada de la autocorrelación (Wiener-Khinchin).
+    """
+    frames = _frames(signal)
+    n_frames = len(frames)
+    if frames.ndim == 1:
+        frames = frames[:, None]
+    taper = np.hanning(n_frames) if window else np.ones(n_frames)
+    power = np.zeros(n_frames // 2 + 1)
+    for idx in _atom_blocks(frames.shape[1], atoms, chunk_atoms):
+        x = np.asarray(frames[:, idx], dtype=float).reshape(n_frames, len(idx), -1)
+        x = (x - x.mean(axis=0)) * taper[:, None, None]
+        spectrum = np.fft.rfft(x, axis=0)
+        w = np.ones(len(idx)) if masses is None else np.asarray(masses, dtype=float)[idx]
+        power += (spectrum.real ** 2 + spectrum.imag ** 2).sum(axis=2) @ w
+    return wavenumbers(n_frames, dt, time_unit_fs), power
+
+
+def spectrum_peaks(frequencies, power, n_peaks=1, min_separation=None):
+    """Los ``n_peaks`` máximos locales más altos (frecuencias en orden ascendente).
+
+    La posición se refina con una parábola por los tres puntos del máximo.
+    ``min_separation`` (en unidades de ``frequencies``) descarta picos más
+    cercanos que eso a uno más alto.
+    """
+    power = np.asarray(power, dtype=float)
+    local = np.flatnonzero((power[1:-1] > power[:-2]) & (power[1:-1] >= power[2:])) + 1
+    chosen = []
+    for k in local[np.argsort(power[local])[::-1]]:
+        if min_separation is not None and any(
+                abs(frequencies[k] - frequencies[c]) < min_separation for c in chosen):
+            continue
+        chosen.append(k)
+        if len(chosen) == n_peaks:
+            break
+    peaks = []
+    step = frequencies[1] - frequencies[0]
+    for k in sorted(chosen):
+        y0, y1, y2 = power[k - 1], power[k], power[k + 1]
+        denom = y0 - 2 * y1 + y2
+        peaks.append(frequencies[k] + (0.5 * (y0 - y2) / denom * step if denom != 0 else 0.0))
+    return np.array(peaks)
@@ -0,0 +1,231 @@
+"""
+Arnés de benchmarks con seguimiento de regresiones.
+
+Un ``BenchmarkCase`` describe un sistema con ``setup() -> (state,
+integrator)``: cualquier integrador con ``evaluate(state)`` y
+``advance(state, n)`` sirve, tanto los de ``md`` como los de ``nbody``.
+``measure`` reporta por caso:
+
+- pasos/s (mejor de ``repeats`` corridas de al menos ``min_time``
+  segundos, tras un paso de calentamiento que compila los kernels numba),
+- ns/día equivalentes con la unidad de tiempo del caso,
+- átomos·pasos/s,
+- bytes reservados por paso: memoria temporal máxima que exige un paso,
+  según ``tracemalloc`` (Python y NumPy; los kernels numba no reservan),
+- pico de RSS del proceso.
+
+``run_cases`` mide cada caso en un proceso nuevo (spawn), de modo que el
+pico de RSS es el del caso y no el del más grande medido antes. Los
+resultados se guardan en JSON y ``compare`` los contrasta con una línea
+base: un caso cuyo rendimiento cae más de ``threshold`` es una regresión.
+"""
+import ast
+import importlib.util
+import json
+import multiprocessing as mp
+import os
+import platform
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+from .units import TIME_UNIT_FS
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+class BenchmarkCase:
+    """Sistema a medir: ``setup()`` debe ser serializable (función de módulo o
+    ``functools.partial``) para poder correr en otro proceso.
+
+    ``time_unit_fs`` convierte ``integrator.dt`` a femtosegundos para los
+    ns/día; ``None`` en sistemas sin tiempo molecular (gravitación).
+    """
+
+    def __init__(self, name, setup, time_unit_fs=TIME_UNIT_FS, group='modelo'):
+        self.name = name
+        self.setup = setup
+        self.time_unit_fs = time_unit_fs
+        self.group = group
+
+
+def load_script(path, name=None, overrides=None):
+    """Importa un script (p. ej. ``verlet-CO.py``) como módulo sin ejecutar su ``__main__``.
+
+    ``overrides`` ({nombre: valor}) reemplaza el valor de asignaciones de
+    primer nivel (``k = 500.0``) antes de ejecutar el módulo, de modo que
+    lo que se construye con esas constantes (``bonds``, posiciones) ya usa
+    los valores nuevos. Un nombre que el script no asigna es un error.
+    """
+    path = os.path.abspath(path)
+    name = name or os.path.splitext(os.path.basename(path))[0].replace('-', '_').replace('.', '_')
+    directory = os.path.dirname(path)
+    if directory not in sys.path:
+        sys.path.insert(0, directory)
+    spec = importlib.util.spec_from_file_location(name, path)
+    module = importlib.util.module_from_spec(spec)
+    if not overrides:
+        spec.loader.exec_module(module)
+        return module
+    with open(path, encoding='utf-8') as f:
+        tree = ast.parse(f.read(), filename=path)
+    missing = set(overrides) - set(assigned_constants(tree))
+    if missing:
+        raise ValueError(f"{os.path.basename(path)} no define {sorted(missing)} en el primer nivel")
+    for node in tree.body:
+        if isinstance(node, ast.Assign) and _target_name(node) in overrides:
+            node.value = ast.parse(repr(overrides[_target_name(node)]), mode='eval').body
+    exec(compile(ast.fix_missing_locations(tree), path, 'exec'), module.__dict__)
+    return module
+
+
+def _target_name(node):
+    if len(node.targets) == 1 and isinstance(node.targets[0], ast.Name):
+        return node.targets[0].id
+    return None
+
+
+def assigned_constants(tree):
+    """Nombres asignados en el primer nivel de un script (``ast.Module`` o ruta)."""
+    if not isinstance(tree, ast.Module):
+        with open(tree, encoding='utf-8') as f:
+            tree = ast.parse(f.read())
+    return [_target_name(node) for node in tree.body
+            if isinstance(node, ast.Assign) and _target_name(node) is not None]
+
+
+def script_system(path, **kwargs):
+    """``make_system(**kwargs)`` de un script; úsese con ``functools.partial``."""
+    return load_script(path).make_system(**kwargs)
+
+
+def peak_rss_mib():
+    """Pico de memoria residente del proceso en MiB (None si no se puede medir)."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reporta KiB y macOS bytes
+    return peak / 2**20 if sys.platform == 'darwin' else peak / 1024
+
+
+def _timed(integrator, state, n_steps):
+    t0 = time.perf_counter()
+    integrator.advance(state, n_steps)
+    return time.perf_counter() - t0
+
+
+def measure(case, min_time=0.5, repeats=5, alloc_steps=10):
+    """Mide un caso en este proceso; devuelve un diccionario de métricas."""
+    state, integrator = case.setup()
+    integrator.evaluate(state)
+    integrator.advance(state, 1)  # calentamiento: compilación numba, listas de vecinos
+
+    # Número de pasos que tarda al menos min_time (como timeit.autorange)
+    n_steps = 1
+    while _timed(integrator, state, n_steps) < min_time:
+        n_steps *= 2
+    best = min(_timed(integrator, state, n_steps) for _ in range(repeats))
+    steps_per_s = n_steps / best
+
+    # Memoria temporal por paso: pico de tracemalloc sobre la memoria previa
+    tracemalloc.start()
+    alloc = np.empty(alloc_steps)
+    for k in range(alloc_steps):
+        before = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+        integrator.advance(state, 1)
+        alloc[k] = tracemalloc.get_traced_memory()[1] - before
+    tracemalloc.stop()
+
+    n_atoms = len(state.positions)
+    ns_per_day = None
+    if case.time_unit_fs is not None:
+        ns_per_day = steps_per_s * integrator.dt * case.time_unit_fs * 86400 * 1e-6
+    return {
+        'group': case.group,
+        'n_atoms': n_atoms,
+        'dt': integrator.dt,
+        'steps_timed': n_steps,
+        'seconds': best,
+        'steps_per_s': steps_per_s,
+        'atom_steps_per_s': steps_per_s * n_atoms,
+        'ns_per_day': ns_per_day,
+        'alloc_bytes_per_step': float(np.median(alloc)),
+        'peak_rss_mib': peak_rss_mib(),
+    }
+
+
+def run_cases(cases, isolate=True, **kwargs):
+    """Genera (nombre, métricas) por caso; con ``isolate`` cada uno en un proceso nuevo."""
+    context = mp.get_context('spawn')
+    for case in cases:
+        if isolate:
+            with context.Pool(1) as pool:
+                yield case.name, pool.apply(measure, (case,), kwargs)
+        else:
+            yield case.name, measure(case, **kwargs)
+
+
+def environment():
+    """Versiones y máquina, para saber si dos corridas son comparables."""
+    info = {
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'platform': platform.platform(),
+        'machine': platform.machine(),
+        'cpus': os.cpu_count(),
+        'date': time.strftime('%Y-%m-%dT%H:%M:%S'),
+    }
+    try:
+        import numba
+        info['numba'] = numba.__version__
+    except ImportError:
+        info['numba'] = None
+    return info
+
+
+def save_results(path, results):
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump({'environment': environment(), 'results': results}, f, indent=2)
+
+
+def load_results(path):
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)['results']
+
+
+def compare(results, baseline, threshold=0.2):
+    """Contrasta pasos/s con la línea base.
+
+    Devuelve {caso: (cociente actual/base, regresión)}; es regresión si el
+    rendimiento cae más de ``threshold`` (0.2 = 20 %). Los casos que no
+    están en la línea base se omiten.
+    """
+    report = {}
+    for name, result in results.items():
+        if name in baseline:
+            ratio = result['steps_per_s'] / baseline[name]['steps_per_s']
+            report[name] = (ratio, ratio < 1.0 - threshold)
+    return report
+
+
+def format_row(name, result, comparison=None):
+    """Línea de la tabla de resultados."""
+    ns = result['ns_per_day']
+    rss = result['peak_rss_mib']
+    row = (f"{name:<22} {result['n_atoms']:>7} {result['steps_per_s']:>11.4g} "
+           f"{'-' if ns is None else f'{ns:.4g}':>10} {result['atom_steps_per_s']:>11.4g} "
+           f"{result['alloc_bytes_per_step'] / 1024:>10.1f} {'-' if rss is None else f'{rss:.0f}':>8}")
+    if comparison is not None:
+        ratio, regressed = comparison
+        row += f" {ratio:>7.2f}x{'  REGRESIÓN' if regressed else ''}"
+    return row
+
+
+HEADER = (f"{'caso':<22} {'átomos':>7} {'pasos/s':>11} {'ns/día':>10} {'átomo·p/s':>11} "
+          f"{'KiB/paso':>10} {'RSS MiB':>8}")
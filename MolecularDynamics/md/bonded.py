@@ -0,0 +1,236 @@
+"""
+Motor vectorizado de enlaces y ángulos armónicos.
+
+Reemplaza los bucles ``for i in range(1, 5)`` de los scripts por una sola
+pasada de NumPy sobre un arreglo de enlaces (i, j, k, r_eq) o de ángulos
+(a, b, c, k, θ_eq). Las fuerzas se acumulan sobre los átomos con
+``np.bincount`` (scatter-add), de modo que el costo no depende de cuántos
+enlaces comparten un mismo átomo.
+
+Los kernels trabajan en el dtype de las posiciones (float32 con la
+precisión ``'mixed'`` de ``md.precision``); la energía y la suma de
+fuerzas por átomo se acumulan en float64.
+"""
+import numpy as np
+
+from .precision import as_working, energy_sum
+
+
+# ==============================================
+# KERNEL
+# ==============================================
+def harmonic_bond_forces(pos, i, j, k, r_eq, r_min=0.0, clamp=False, out=None, lengths_out=None):
+    """Fuerzas y energía potencial de un conjunto de resortes armónicos.
+
+    U = 1/2 k (r - r_eq)^2 con r = |pos[j] - pos[i]|. La fuerza sobre j es
+    -k (r - r_eq) r_vec/r y la de i es la opuesta.
+
+    Si ``clamp`` es False los enlaces con r <= r_min no aportan fuerza (como
+    ``spring_force`` en verlet-H20.py o ``if r > 0.01`` en verlet-CH4.v2.py);
+    si es True la distancia se acota inferiormente a r_min (como
+    ``max(r, 0.01)`` en verlet-CH4.py).
+
+    Devuelve (forces, pe). Si se da ``out`` las fuerzas se suman sobre él;
+    si se da ``lengths_out`` recibe las longitudes r (subproducto gratuito
+    para los observables).
+    """
+    pos = as_working(pos)
+    flat = pos.ndim == 1
+    if flat:
+        pos = pos[:, None]
+    n_atoms, dim = pos.shape
+    k = np.asarray(k, dtype=pos.dtype)
+    r_eq = np.asarray(r_eq, dtype=pos.dtype)
+
+    r_vec = pos[j] - pos[i]
+    r = np.sqrt(np.einsum('bd,bd->b', r_vec, r_vec))
+    if lengths_out is not None:
+        lengths_out[...] = r
+
+    if clamp:
+        r_safe = np.maximum(r, r_min)
+        active = None
+    else:
+        active = r > r_min
+        r_safe = np.where(active, r, 1.0)
+
+    stretch = r_safe - r_eq
+    f_mag = -k * stretch
+    if active is not None:
+        f_mag = np.where(active, f_mag, 0.0)
+    pe = 0.5 * energy_sum(k * (r - r_eq) ** 2)
+
+    f_bond = (f_mag / r_safe)[:, None] * r_vec
+
+    if out is None:
+        out = np.zeros(n_atoms if flat else (n_atoms, dim), dtype=pos.dtype)
+    scatter_pair_forces(out[:, None] if out.ndim == 1 else out, i, j, f_bond)
+    return out, pe
+
+
+def scatter_pair_forces(forces, i, j, f_pair):
+    """Suma f_pair sobre los átomos j y resta sobre los átomos i (in situ)."""
+    n_atoms = forces.shape[0]
+    for d in range(forces.shape[1]):
+        forces[:, d] += np.bincount(j, weights=f_pair[:, d], minlength=n_atoms)
+        forces[:, d] -= np.bincount(i, weights=f_pair[:, d], minlength=n_atoms)
+
+
+class HarmonicBonds:
+    """Conjunto de enlaces armónicos descrito por arreglos planos.
+
+    ``i`` y ``j`` son los índices de los átomos de cada enlace; ``k`` y
+    ``r_eq`` pueden ser escalares o arreglos con un valor por enlace.
+    ``last_lengths`` guarda las longitudes del último ``compute``, que
+    ``md.observables`` reutiliza en lugar de recalcularlas.
+    """
+
+    def __init__(self, i, j, k, r_eq, r_min=0.0, clamp=False):
+        self.i = np.ascontiguousarray(i, dtype=np.intp)
+        self.j = np.ascontiguousarray(j, dtype=np.intp)
+        if self.i.shape != self.j.shape:
+            raise ValueError("i y j deben tener la misma longitud")
+        n = len(self.i)
+        self.k = np.broadcast_to(np.asarray(k, dtype=float), (n,)).copy()
+        self.r_eq = np.broadcast_to(np.asarray(r_eq, dtype=float), (n,)).copy()
+        self.r_min = r_min
+        self.clamp = clamp
+        self.last_lengths = np.full(n, np.nan)
+
+    @classmethod
+    def from_array(cls, bonds, **kwargs):
+        """Construye desde un arreglo de filas (i, j, k, r_eq)."""
+        bonds = np.asarray(bonds, dtype=float)
+        return cls(bonds[:, 0].astype(np.intp), bonds[:, 1].astype(np.intp),
+                   bonds[:, 2], bonds[:, 3], **kwargs)
+
+    @classmethod
+    def star(cls, center, others, k, r_eq, **kwargs):
+        """Enlaces de un átomo central a varios vecinos (CH4, H2O)."""
+        others = np.asarray(others, dtype=np.intp)
+        return cls(np.full(len(others), center, dtype=np.intp), others,
+                   k, r_eq, **kwargs)
+
+    def __len__(self):
+        return len(self.i)
+
+    def partition(self, rank, n_parts):
+        """Bloque contiguo ``rank`` de ``n_parts`` de los enlaces (md.parallel)."""
+        n = len(self)
+        s = slice(n * rank // n_parts, n * (rank + 1) // n_parts)
+        return HarmonicBonds(self.i[s], self.j[s], self.k[s], self.r_eq[s],
+                             r_min=self.r_min, clamp=self.clamp)
+
+    def subset(self, select):
+        """Enlaces elegidos por ``select`` (máscara o índices), p. ej. los no rígidos."""
+        return HarmonicBonds(self.i[select], self.j[select], self.k[select], self.r_eq[select],
+                             r_min=self.r_min, clamp=self.clamp)
+
+    def compute(self, pos, out=None):
+        """Devuelve (forces, pe) para las posiciones dadas."""
+        return harmonic_bond_forces(pos, self.i, self.j, self.k, self.r_eq,
+                                    r_min=self.r_min, clamp=self.clamp, out=out,
+                                    lengths_out=self.last_lengths)
+
+    def lengths(self, pos):
+        """Longitudes de todos los enlaces."""
+        pos = np.asarray(pos, dtype=float)
+        if pos.ndim == 1:
+            return np.abs(pos[self.j] - pos[self.i])
+        r_vec = pos[self.j] - pos[self.i]
+        return np.sqrt(np.einsum('bd,bd->b', r_vec, r_vec))
+
+
+# ==============================================
+# ÁNGULOS
+# ==============================================
+def harmonic_angle_forces(pos, a, b, c, k, theta_eq, out=None, angles_out=None):
+    """Fuerzas y energía de ángulos armónicos a-b-c (b es el vértice).
+
+    U = 1/2 k (θ - θ_eq)^2 con θ en radianes. θ se calcula con
+    arctan2(|u × v|, u · v), exacto también cerca de 180° (CO2). Solo
+    para posiciones 2D o 3D. Devuelve (forces, pe) como
+    ``harmonic_bond_forces``.
+    """
+    pos = as_working(pos)
+    k = np.asarray(k, dtype=pos.dtype)
+    theta_eq = np.asarray(theta_eq, dtype=pos.dtype)
+    u = pos[a] - pos[b]
+    v = pos[c] - pos[b]
+    uu = np.einsum('nd,nd->n', u, u)
+    vv = np.einsum('nd,nd->n', v, v)
+    theta, sin_uv, uv = _vertex_angles(u, v)
+    if angles_out is not None:
+        angles_out[...] = theta
+    delta = theta - theta_eq
+    pe = 0.5 * energy_sum(k * delta * delta)
+
+    # F_a = k Δθ / sen θ (v/(|u||v|) - cos θ u/|u|²), simétrica para c
+    norm = np.sqrt(uu * vv)
+    sin_theta = np.maximum(sin_uv / norm, 1e-12)
+    cos_theta = uv / norm
+    g = k * delta / sin_theta
+    f_a = (g / norm)[:, None] * v - (g * cos_theta / uu)[:, None] * u
+    f_c = (g / norm)[:, None] * u - (g * cos_theta / vv)[:, None] * v
+
+    if out is None:
+        out = np.zeros_like(pos)
+    n_atoms = out.shape[0]
+    for d in range(out.shape[1]):
+        out[:, d] += np.bincount(a, weights=f_a[:, d], minlength=n_atoms)
+        out[:, d] += np.bincount(c, weights=f_c[:, d], minlength=n_atoms)
+        out[:, d] -= np.bincount(b, weights=f_a[:, d] + f_c[:, d], minlength=n_atoms)
+    return out, pe
+
+
+def _vertex_angles(u, v):
+    """(θ, |u × v|, u · v) de cada par de vectores (2D o 3D); θ = arctan2(|u × v|, u · v)."""
+    uv = np.einsum('nd,nd->n', u, v)
+    if u.shape[1] == 2:
+        sin_uv = np.abs(u[:, 0] * v[:, 1] - u[:, 1] * v[:, 0])
+    else:
+        w = np.cross(u, v)
+        sin_uv = np.sqrt(np.einsum('nd,nd->n', w, w))
+    return np.arctan2(sin_uv, uv), sin_uv, uv
+
+
+class HarmonicAngles:
+    """Conjunto de ángulos armónicos a-b-c descrito por arreglos planos.
+
+    ``k`` [energía/rad²] y ``theta_eq`` [rad] pueden ser escalares o
+    arreglos con un valor por ángulo. ``last_angles`` guarda los ángulos
+    del último ``compute``.
+    """
+
+    def __init__(self, a, b, c, k, theta_eq):
+        self.a = np.ascontiguousarray(a, dtype=np.intp)
+        self.b = np.ascontiguousarray(b, dtype=np.intp)
+        self.c = np.ascontiguousarray(c, dtype=np.intp)
+        if not self.a.shape == self.b.shape == self.c.shape:
+            raise ValueError("a, b y c deben tener la misma longitud")
+        n = len(self.a)
+        self.k = np.broadcast_to(np.asarray(k, dtype=float), (n,)).copy()
+        self.theta_eq = np.broadcast_to(np.asarray(theta_eq, dtype=float), (n,)).copy()
+        self.last_angles = np.full(n, np.nan)
+
+    def __len__(self):
+        return len(self.a)
+
+    def partition(self, rank, n_parts):
+        """Bloque contiguo ``rank`` de ``n_parts`` de los ángulos (md.parallel)."""
+        n = len(self)
+        return self.subset(slice(n * rank // n_parts, n * (rank + 1) // n_parts))
+
+    def subset(self, select):
+        return HarmonicAngles(self.a[select], self.b[select], self.c[select],
+                              self.k[select], self.theta_eq[select])
+
+    def compute(self, pos, out=None):
+        """Devuelve (forces, pe) para las posiciones dadas."""
+        return harmonic_angle_forces(pos, self.a, self.b, self.c, self.k, self.theta_eq,
+                                     out=out, angles_out=self.last_angles)
+
+    def angles(self, pos):
+        """Ángulos de todos los tripletes [rad], con la misma fórmula que las fuerzas."""
+        pos = as_working(pos)
+        return _vertex_angles(pos[self.a] - pos[self.b], pos[self.c] - pos[self.b])[0]
@@ -0,0 +1,193 @@
+"""
+Checkpoints atómicos y reinicio exacto.
+
+Un checkpoint guarda todo lo que determina el resto de la corrida:
+
+- el ``State`` (posiciones, velocidades, fuerzas y energía guardadas,
+  paso, tiempo, desfase de velocidades),
+- el estado interno del integrador y de sus términos de fuerza que lo
+  exponen con ``checkpoint_state()`` / ``restore_state()`` (contadores,
+  lista de vecinos, fuerzas rápidas y lentas de RESPA),
+- la posición de cada ``md.noise.NoiseStream`` o el estado del bit
+  generator de cada ``np.random.Generator`` (el ``rng`` del integrador se
+  incluye solo),
+- el número de cuadros de cada ``TrajectoryWriter``, para truncar el
+  archivo en ese punto al reanudar (la trayectoria no se copia).
+
+Continuar desde un checkpoint reproduce bit a bit la corrida sin
+interrumpir. ``CheckpointWriter`` es un callback de ``Integrator.run``:
+en el hilo principal solo copia los arreglos (microsegundos) y un hilo de
+fondo serializa y escribe. Cada escritura va a un archivo temporal con
+``fsync`` que luego reemplaza al anterior con ``os.replace``, así que un
+corte a mitad de escritura deja intacto el último checkpoint completo.
+"""
+import json
+import os
+import threading
+
+import numpy as np
+
+_STATE_ARRAYS = ('positions', 'velocities', 'forces', 'masses')
+_STATE_SCALARS = ('pe', 'has_forces', 'step', 'time', 'velocity_offset')
+
+
+def _streams(integrator, rngs):
+    streams = dict(rngs or {})
+    rng = getattr(integrator, 'rng', None)
+    if rng is not None and 'integrator' not in streams:
+        streams['integrator'] = rng
+    return streams
+
+
+def _stream_state(generator):
+    if hasattr(generator, 'checkpoint_state'):
+        return generator.checkpoint_state()
+    return generator.bit_generator.state
+
+
+def _restore_stream(generator, saved):
+    if hasattr(generator, 'restore_state'):
+        generator.restore_state(saved)
+    else:
+        generator.bit_generator.state = saved
+
+
+def snapshot(state, integrator=None, rngs=None, writers=None):
+    """Copia en memoria de todo el estado reanudable (``rngs`` y ``writers`` son dicts)."""
+    arrays = {f'state/{name}': getattr(state, name).copy() for name in _STATE_ARRAYS}
+    meta = {'state': {name: getattr(state, name) for name in _STATE_SCALARS}}
+    meta['state']['pe'] = float(meta['state']['pe'])
+    if integrator is not None and hasattr(integrator, 'checkpoint_state'):
+        extra = integrator.checkpoint_state()
+        for key, value in extra.items():
+            if isinstance(value, np.ndarray):
+                arrays[f'integrator/{key}'] = value.copy()
+            else:
+                meta.setdefault('integrator', {})[key] = value
+    meta['rng'] = {name: _stream_state(g) for name, g in _streams(integrator, rngs).items()}
+    meta['writers'] = {}
+    for name, writer in (writers or {}).items():
+        writer.flush()
+        meta['writers'][name] = writer.n_frames
+    return arrays, meta
+
+
+def write_checkpoint(path, arrays, meta):
+    """Escribe ``(arrays, meta)`` de forma atómica (temporal + fsync + os.replace)."""
+    tmp = f'{path}.tmp'
+    with open(tmp, 'wb') as f:
+        np.savez(f, __meta__=np.frombuffer(json.dumps(meta).encode(), dtype=np.uint8), **arrays)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+
+def load_checkpoint(path):
+    """Lee un checkpoint; devuelve ``(arrays, meta)``."""
+    with np.load(path) as data:
+        meta = json.loads(data['__meta__'].tobytes().decode())
+        arrays = {key: data[key] for key in data.files if key != '__meta__'}
+    return arrays, meta
+
+
+def restore(checkpoint, state, integrator=None, rngs=None):
+    """Devuelve ``state``, ``integrator`` y los generadores al punto del checkpoint.
+
+    ``checkpoint`` es una ruta o el par ``(arrays, meta)``. Los archivos de
+    trayectoria se reanudan con ``TrajectoryWriter.resume(ruta,
+    meta['writers'][nombre])``. Devuelve ``meta``.
+    """
+    arrays, meta = load_checkpoint(checkpoint) if isinstance(checkpoint, (str, os.PathLike)) \
+        else checkpoint
+    for name in _STATE_ARRAYS:
+        getattr(state, name)[...] = arrays[f'state/{name}']
+    for name, value in meta['state'].items():
+        setattr(state, name, value)
+    if integrator is not None and hasattr(integrator, 'restore_state'):
+        extra = dict(meta.get('integrator', {}))
+        extra.update({key[len('integrator/'):]: value for key, value in arrays.items()
+                      if key.startswith('integrator/')})
+        integrator.restore_state(extra)
+    for name, generator in _streams(integrator, rngs).items():
+        _restore_stream(generator, meta['rng'][name])
+    return meta
+
+
+class CheckpointWriter:
+    """Callback que guarda un checkpoint cada ``every`` pasos desde un hilo de fondo.
+
+    Si llega un checkpoint nuevo mientras el anterior aún se escribe, el
+    pendiente se reemplaza por el más reciente (nunca se acumulan copias).
+    ``close()`` espera a que termine la última escritura.
+    """
+
+    def __init__(self, path, every, integrator=None, rngs=None, writers=None):
+        self.path = path
+        self.every = int(every)
+        self.integrator = integrator
+        self.rngs = rngs
+        self.writers = writers
+        self.n_written = 0
+        self.last_step = None
+        self.error = None
+        self._pending = None
+        self._busy = False
+        self._closed = False
+        self._cond = threading.Condition()
+        self._thread = threading.Thread(target=self._loop, name='checkpoint', daemon=True)
+        self._thread.start()
+
+    def __call__(self, state):
+        if state.step % self.every == 0:
+            self.submit(state)
+
+    def submit(self, state):
+        """Toma la instantánea ahora y la encola para escribirla en segundo plano."""
+        snap = snapshot(state, self.integrator, self.rngs, self.writers)
+        with self._cond:
+            if self.error is not None:
+                raise self.error
+            self._pending = (state.step, snap)
+            self._cond.notify()
+
+    def _loop(self):
+        while True:
+            with self._cond:
+                while self._pending is None and not self._closed:
+                    self._cond.wait()
+                if self._pending is None:
+                    return
+                step, (arrays, meta) = self._pending
+                self._pending = None
+                self._busy = True
+            try:
+                write_checkpoint(self.path, arrays, meta)
+            except Exception as exc:  # se reporta en el hilo principal
+                with self._cond:
+                    self.error = exc
+            with self._cond:
+                self._busy = False
+                self.n_written += 1
+                self.last_step = step
+                self._cond.notify_all()
+
+    def wait(self):
+        """Bloquea hasta que no quede ninguna escritura pendiente."""
+        with self._cond:
+            while self._pending is not None or self._busy:
+                self._cond.wait()
+            if self.error is not None:
+                raise self.error
+
+    def close(self):
+        self.wait()
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        self._thread.join()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
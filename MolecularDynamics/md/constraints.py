@@ -0,0 +1,234 @@
+"""
+Restricciones de longitud de enlace (SHAKE/RATTLE).
+
+Los enlaces restringidos se mantienen a longitud fija, lo que elimina la
+vibración más rápida del sistema (C-H, O-H) y permite pasos de tiempo
+varias veces mayores. En la deriva x += h v (SHAKE) las posiciones se
+corrigen a lo largo de los vectores de enlace del paso anterior y la
+corrección se transmite a las velocidades; después de cada kick (RATTLE)
+se elimina la componente de la velocidad relativa a lo largo de cada
+enlace.
+
+Dos métodos resuelven los multiplicadores de Lagrange:
+
+- ``'shake'``: Gauss-Seidel clásico, vectorizado por colores. Las
+  restricciones se reparten en grupos sin átomos compartidos (coloreo de
+  aristas) y cada grupo se corrige en una sola operación; los grupos se
+  recorren en orden, como en SHAKE secuencial.
+- ``'matrix'``: Newton sobre el sistema acoplado de cada molécula
+  (M-SHAKE). Las moléculas con el mismo número de restricciones se
+  resuelven juntas con ``np.linalg.solve`` por lotes; converge en 2-4
+  iteraciones y RATTLE es exacto en una sola.
+"""
+import numpy as np
+
+from .bonded import scatter_pair_forces
+
+
+def _edge_colors(i, j):
+    """Coloreo voraz: restricciones del mismo color no comparten átomos."""
+    used = {}
+    colors = np.empty(len(i), dtype=np.intp)
+    for c, (a, b) in enumerate(zip(i.tolist(), j.tolist())):
+        taken = used.setdefault(a, set()) | used.setdefault(b, set())
+        color = 0
+        while color in taken:
+            color += 1
+        colors[c] = color
+        used[a].add(color)
+        used[b].add(color)
+    return colors
+
+
+def _components(i, j, n_atoms):
+    """Etiqueta de molécula (componente conexa) de cada átomo."""
+    label = np.arange(n_atoms)
+    while True:
+        low = np.minimum(label[i], label[j])
+        new = label.copy()
+        np.minimum.at(new, i, low)
+        np.minimum.at(new, j, low)
+        new = new[new]  # salto de punteros
+        if np.array_equal(new, label):
+            return label
+        label = new
+
+
+class BondConstraints:
+    """Conjunto de enlaces rígidos (i, j) con longitud ``length``.
+
+    ``tol`` es la tolerancia relativa sobre la longitud (y sobre la
+    velocidad relativa a lo largo del enlace en RATTLE). ``n_iterations``
+    guarda las iteraciones del último SHAKE y ``n_block_builds`` cuántas
+    veces se armaron los bloques por molécula de ``'matrix'`` (una vez por
+    conjunto de restricciones y masas).
+    """
+
+    def __init__(self, i, j, length, method='shake', tol=1e-10, max_iter=1000):
+        if method not in ('shake', 'matrix'):
+            raise ValueError(f"método desconocido: {method!r} (opciones: 'shake', 'matrix')")
+        self.i = np.ascontiguousarray(i, dtype=np.intp)
+        self.j = np.ascontiguousarray(j, dtype=np.intp)
+        self.length = np.broadcast_to(np.asarray(length, dtype=float), self.i.shape).copy()
+        self.length2 = self.length * self.length
+        self.method = method
+        self.tol = float(tol)
+        self.max_iter = int(max_iter)
+        self.n_iterations = 0
+        colors = _edge_colors(self.i, self.j)
+        self.color_groups = [np.flatnonzero(colors == c) for c in range(colors.max(initial=-1) + 1)]
+        self.n_block_builds = 0
+        self._blocks = None
+        self._work = None
+
+    @classmethod
+    def from_bonds(cls, bonds, select=None, **kwargs):
+        """Restringe los enlaces de un ``HarmonicBonds`` a su r_eq.
+
+        ``select`` (máscara o índices) elige un subconjunto; por defecto todos.
+        """
+        sel = slice(None) if select is None else select
+        return cls(bonds.i[sel], bonds.j[sel], bonds.r_eq[sel], **kwargs)
+
+    def __len__(self):
+        return len(self.i)
+
+    # Diagnóstico
+    def deviation(self, pos):
+        """Máxima desviación relativa |r - L| / L."""
+        pos = np.asarray(pos, dtype=float).reshape(len(pos), -1)
+        r = np.linalg.norm(pos[self.j] - pos[self.i], axis=1)
+        return float(np.max(np.abs(r - self.length) / self.length, initial=0.0))
+
+    def velocity_deviation(self, pos, vel):
+        """Máxima velocidad relativa a lo largo de los enlaces."""
+        pos = np.asarray(pos, dtype=float).reshape(len(pos), -1)
+        vel = np.asarray(vel, dtype=float).reshape(len(vel), -1)
+        r = pos[self.j] - pos[self.i]
+        v = vel[self.j] - vel[self.i]
+        return float(np.max(np.abs(np.einsum('cd,cd->c', r, v)) / self.length, initial=0.0))
+
+    # Integración
+    def drift(self, state, h):
+        """x += h v con SHAKE; la corrección de posición se pasa a las velocidades."""
+        pos = state.positions.reshape(state.n_atoms, -1)
+        vel = state.velocities.reshape(state.n_atoms, -1)
+        if self._work is None or self._work[0].shape != pos.shape:
+            self._work = (np.empty_like(pos), np.empty_like(pos))
+        ref, unconstrained = self._work
+        ref[...] = pos
+        np.multiply(vel, h, out=unconstrained)
+        unconstrained += pos
+        pos[...] = unconstrained
+        self.constrain_positions(pos, ref, state.inv_mass.reshape(-1))
+        unconstrained -= pos
+        unconstrained /= h
+        vel -= unconstrained
+
+    def constrain_positions(self, pos, ref, inv_mass):
+        """Corrige ``pos`` (N, dim) a lo largo de los enlaces de ``ref`` (SHAKE)."""
+        s = ref[self.j] - ref[self.i]
+        inv_i, inv_j = inv_mass[self.i], inv_mass[self.j]
+        if self.method == 'matrix':
+            self._newton_positions(pos, s, inv_mass)
+            return
+        for it in range(1, self.max_iter + 1):
+            converged = True
+            for c in self.color_groups:
+                i, j, sc = self.i[c], self.j[c], s[c]
+                d = pos[j] - pos[i]
+                diff = self.length2[c] - np.einsum('cd,cd->c', d, d)
+                if np.any(np.abs(diff) > 2 * self.tol * self.length2[c]):
+                    converged = False
+                g = diff / (2 * (inv_i[c] + inv_j[c]) * np.einsum('cd,cd->c', d, sc))
+                pos[i] -= (g * inv_i[c])[:, None] * sc
+                pos[j] += (g * inv_j[c])[:, None] * sc
+            if converged:
+                self.n_iterations = it
+                return
+        raise RuntimeError(f"SHAKE no convergió en {self.max_iter} iteraciones")
+
+    def project_velocities(self, state):
+        """RATTLE: anula la velocidad relativa a lo largo de cada enlace."""
+        pos = state.positions.reshape(state.n_atoms, -1)
+        vel = state.velocities.reshape(state.n_atoms, -1)
+        inv_mass = state.inv_mass.reshape(-1)
+        if self.method == 'matrix':
+            self._solve_velocities(pos, vel, inv_mass)
+            return
+        inv_i, inv_j = inv_mass[self.i], inv_mass[self.j]
+        r = pos[self.j] - pos[self.i]
+        r2 = np.einsum('cd,cd->c', r, r)
+        # Tolerancia relativa a la mayor componente de velocidad del sistema
+        v_tol = self.tol * max(float(np.abs(vel).max(initial=0.0)), np.finfo(float).tiny)
+        for _ in range(self.max_iter):
+            converged = True
+            for c in self.color_groups:
+                i, j, rc = self.i[c], self.j[c], r[c]
+                b = np.einsum('cd,cd->c', rc, vel[j] - vel[i])
+                if np.any(np.abs(b) > v_tol * self.length[c]):
+                    converged = False
+                k = b / ((inv_i[c] + inv_j[c]) * r2[c])
+                vel[i] += (k * inv_i[c])[:, None] * rc
+                vel[j] -= (k * inv_j[c])[:, None] * rc
+            if converged:
+                return
+        raise RuntimeError(f"RATTLE no convergió en {self.max_iter} iteraciones")
+
+    # Variante matricial (por moléculas)
+    def _molecule_blocks(self, inv_mass):
+        """Índices (moléculas, k) por tamaño k y matrices de acoplamiento B M⁻¹ Bᵀ.
+
+        Se arman una vez y se reutilizan mientras las masas no cambien (cada
+        paso recibe un arreglo ``inv_mass`` nuevo, así que se comparan valores).
+        """
+        if self._blocks is not None and np.array_equal(self._blocks[0], inv_mass):
+            return self._blocks[1]
+        n_atoms = len(inv_mass)
+        mol = _components(self.i, self.j, n_atoms)[self.i]
+        order = np.argsort(mol, kind='stable')
+        _, first, counts = np.unique(mol[order], return_index=True, return_counts=True)
+        blocks = []
+        for k in np.unique(counts):
+            starts = first[counts == k]
+            idx = order[starts[:, None] + np.arange(k)]            # (moléculas, k)
+            ia, ja = self.i[idx], self.j[idx]
+            same = lambda a, b: (a[:, :, None] == b[:, None, :])
+            # C[c, d] = Σ_atom B[c, atom] m⁻¹ B[d, atom] con B[c] = e_j - e_i
+            coupling = (inv_mass[ja][:, :, None] * (same(ja, ja).astype(float) - same(ja, ia))
+                        - inv_mass[ia][:, :, None] * (same(ia, ja).astype(float) - same(ia, ia)))
+            blocks.append((idx, coupling))
+        self._blocks = (np.array(inv_mass, dtype=float), blocks)
+        self.n_block_builds += 1
+        return blocks
+
+    def _apply(self, target, weights, vectors, inv_mass):
+        """target_j += w m_j⁻¹ v, target_i -= w m_i⁻¹ v para cada restricción."""
+        delta = np.zeros_like(target)
+        scatter_pair_forces(delta, self.i, self.j, weights[:, None] * vectors)
+        delta *= inv_mass[:, None]
+        target += delta
+
+    def _newton_positions(self, pos, s, inv_mass):
+        blocks = self._molecule_blocks(inv_mass)
+        lam = np.empty(len(self))
+        for it in range(1, self.max_iter + 1):
+            d = pos[self.j] - pos[self.i]
+            diff = self.length2 - np.einsum('cd,cd->c', d, d)
+            if np.all(np.abs(diff) <= 2 * self.tol * self.length2):
+                self.n_iterations = it - 1
+                return
+            for idx, coupling in blocks:
+                a = 2 * coupling * np.einsum('mad,mbd->mab', d[idx], s[idx])
+                lam[idx] = np.linalg.solve(a, diff[idx][..., None])[..., 0]
+            self._apply(pos, lam, s, inv_mass)
+        raise RuntimeError(f"SHAKE matricial no convergió en {self.max_iter} iteraciones")
+
+    def _solve_velocities(self, pos, vel, inv_mass):
+        r = pos[self.j] - pos[self.i]
+        b = np.einsum('cd,cd->c', r, vel[self.j] - vel[self.i])
+        mu = np.empty(len(self))
+        for idx, coupling in self._molecule_blocks(inv_mass):
+            k = coupling * np.einsum('mad,mbd->mab', r[idx], r[idx])
+            mu[idx] = np.linalg.solve(k, -b[idx][..., None])[..., 0]
+        self._apply(vel, mu, r, inv_mass)
@@ -0,0 +1,463 @@
+"""
+Biblioteca de integradores con una API común.
+
+Todos los integradores avanzan un ``State`` (posiciones, velocidades,
+fuerzas y masas en arreglos contiguos) con ``step(state)`` y comparten el
+driver ``run(state, n_steps, callbacks, stride)``. Los temporales se
+reservan una sola vez por estado, así que un paso no asigna memoria.
+
+Las fuerzas del final de un paso son las del inicio del siguiente, de modo
+que cada paso evalúa el campo de fuerzas una sola vez. Las fuerzas
+dependientes de la velocidad (fricción) no van en el campo de fuerzas: se
+integran con el esquema de Langevin BAOAB, cuyo paso O es exacto.
+
+Con ``constraints`` (un ``md.constraints.BondConstraints``) los enlaces
+seleccionados son rígidos: cada deriva aplica SHAKE y, al final del paso,
+RATTLE proyecta las velocidades. Esos enlaces deben quitarse del campo de
+fuerzas.
+
+Un término de fuerza es un objeto con ``compute(pos, out=None) -> (forces,
+pe)`` que *suma* sus fuerzas sobre ``out`` (``HarmonicBonds``,
+``NonBondedForce``) o una función ``f(pos) -> (forces, pe)``.
+
+El ruido de ``BAOAB`` y ``Brownian`` viene de ``rng``: por defecto un
+``md.noise.NoiseStream`` (Philox por bloques, reproducible por paso), o
+cualquier ``np.random.Generator``.
+"""
+import numpy as np
+
+from .noise import NoiseStream
+from .precision import PRECISIONS, select_precision
+
+
+# ==============================================
+# ESTADO DEL SISTEMA
+# ==============================================
+class State:
+    """Posiciones, velocidades, fuerzas y masas de un sistema.
+
+    Las posiciones pueden ser (N,) para los modelos 1D (CO, CO2) o
+    (N, dim). ``forces`` y ``pe`` corresponden a las posiciones actuales
+    cuando ``has_forces`` es True; quien modifique las posiciones desde
+    fuera debe llamar a ``invalidate()``.
+
+    ``precision`` (``'double'`` o ``'mixed'``, ver ``md.precision``) fija el
+    dtype de posiciones, velocidades y fuerzas; las masas, ``pe`` y las
+    sumas de ``kinetic_energy``, ``center_of_mass`` y ``momentum`` son
+    siempre float64.
+    """
+
+    def __init__(self, positions, velocities=None, masses=None, precision=None):
+        self.precision = select_precision(precision)
+        dtype = PRECISIONS[self.precision]
+        self.positions = np.array(positions, dtype=dtype, order='C')
+        if velocities is None:
+            self.velocities = np.zeros_like(self.positions)
+        else:
+            self.velocities = np.array(velocities, dtype=dtype, order='C')
+        n_atoms = len(self.positions)
+        self.masses = np.ones(n_atoms) if masses is None else np.array(masses, dtype=float)
+        # 1/m con forma difundible sobre (N,) o (N, dim)
+        self.inv_mass = (1.0 / self.masses).reshape(
+            (n_atoms,) + (1,) * (self.positions.ndim - 1)).astype(dtype)
+        self.forces = np.zeros_like(self.positions)
+        self.scratch = np.empty_like(self.positions)
+        self.pe = 0.0
+        self.has_forces = False
+        self.step = 0
+        self.time = 0.0
+        # Desfase de las velocidades en unidades de dt (-0.5 en leapfrog)
+        self.velocity_offset = 0.0
+
+    @property
+    def n_atoms(self):
+        return len(self.positions)
+
+    @property
+    def dtype(self):
+        return self.positions.dtype
+
+    def astype(self, precision):
+        """Copia del estado (sin fuerzas guardadas) con otra ``precision``."""
+        state = State(self.positions, self.velocities, self.masses, precision)
+        state.step, state.time = self.step, self.time
+        state.velocity_offset = self.velocity_offset
+        return state
+
+    def invalidate(self):
+        """Descarta las fuerzas guardadas."""
+        self.has_forces = False
+
+    def kinetic_energy(self):
+        v2 = (self.velocities * self.velocities).reshape(self.n_atoms, -1)
+        return 0.5 * float(self.masses @ v2.sum(axis=1, dtype=np.float64))
+
+    def total_energy(self):
+        return self.pe + self.kinetic_energy()
+
+    def center_of_mass(self):
+        """Centro de masas (float64)."""
+        pos = self.positions.reshape(self.n_atoms, -1)
+        return self.masses @ pos.astype(np.float64, copy=False) / self.masses.sum()
+
+    def momentum(self):
+        """Momento total Σ m v (float64)."""
+        return self.masses @ self.velocities.reshape(self.n_atoms, -1).astype(np.float64, copy=False)
+
+
+# ==============================================
+# CAMPO DE FUERZAS
+# ==============================================
+class _FunctionTerm:
+    """Adapta una función pos -> (forces, pe) a la interfaz compute(pos, out)."""
+
+    def __init__(self, fn):
+        self.fn = fn
+
+    def compute(self, pos, out=None):
+        forces, pe = self.fn(pos)
+        if out is None:
+            return forces, pe
+        out += forces
+        return out, pe
+
+
+class ForceField:
+    """Suma de términos de fuerza (enlaces, no enlazantes, funciones)."""
+
+    def __init__(self, *terms):
+        self.terms = [t if hasattr(t, 'compute') else _FunctionTerm(t) for t in terms]
+
+    def add(self, term):
+        self.terms.append(term if hasattr(term, 'compute') else _FunctionTerm(term))
+        return self
+
+    def compute(self, pos, out=None):
+        """Devuelve (forces, pe); con ``out`` lo sobrescribe con la fuerza total."""
+        if out is None:
+            out = np.zeros_like(pos, dtype=np.float32 if pos.dtype == np.float32 else float)
+        else:
+            out[...] = 0.0
+        pe = 0.0
+        for term in self.terms:
+            pe += term.compute(pos, out=out)[1]
+        return out, pe
+
+
+def as_force_field(force_field):
+    """Convierte un término, una función o una lista de ellos en ForceField."""
+    if isinstance(force_field, ForceField):
+        return force_field
+    if isinstance(force_field, (list, tuple)):
+        return ForceField(*force_field)
+    return ForceField(force_field)
+
+
+# ==============================================
+# BASE COMÚN
+# ==============================================
+class Integrator:
+    """Base: caché de fuerzas, contador de evaluaciones y driver ``run``."""
+
+    def __init__(self, force_field, dt, constraints=None):
+        self.force_field = as_force_field(force_field)
+        self.dt = float(dt)
+        self.constraints = constraints
+        self.n_force_calls = 0
+
+    def evaluate(self, state):
+        """Evalúa las fuerzas de las posiciones actuales sobre ``state.forces``."""
+        _, state.pe = self.force_field.compute(state.positions, out=state.forces)
+        state.has_forces = True
+        self.n_force_calls += 1
+        return state.forces
+
+    def _kick(self, state, h):
+        """v += h F/m sin temporales (usa ``state.scratch``)."""
+        np.multiply(state.forces, state.inv_mass, out=state.scratch)
+        state.scratch *= h
+        state.velocities += state.scratch
+
+    def _drift(self, state, h):
+        """x += h v sin temporales (con SHAKE si hay restricciones)."""
+        if self.constraints is not None:
+            self.constraints.drift(state, h)
+            return
+        np.multiply(state.velocities, h, out=state.scratch)
+        state.positions += state.scratch
+
+    def _constrain_velocities(self, state):
+        """RATTLE: quita la velocidad relativa a lo largo de los enlaces rígidos."""
+        if self.constraints is not None:
+            self.constraints.project_velocities(state)
+
+    def step(self, state):
+        raise NotImplementedError
+
+    def checkpoint_state(self):
+        """Estado interno para ``md.checkpoint`` (contadores y el de cada término)."""
+        extra = {'n_force_calls': self.n_force_calls}
+        for k, term in enumerate(self.force_field.terms):
+            if hasattr(term, 'checkpoint_state'):
+                for key, value in term.checkpoint_state().items():
+                    extra[f'term{k}/{key}'] = value
+        return extra
+
+    def restore_state(self, extra):
+        """Inverso de ``checkpoint_state``."""
+        self.n_force_calls = extra['n_force_calls']
+        for k, term in enumerate(self.force_field.terms):
+            if hasattr(term, 'restore_state'):
+                prefix = f'term{k}/'
+                term.restore_state({key[len(prefix):]: value for key, value in extra.items()
+                                    if key.startswith(prefix)})
+
+    def advance(self, state, n_steps):
+        """Avanza ``n_steps`` pasos sin callbacks (los backends lo sobrescriben)."""
+        for _ in range(n_steps):
+            self.step(state)
+        state.step += n_steps
+        state.time += n_steps * self.dt
+
+    def run(self, state, n_steps, callbacks=(), stride=1):
+        """Avanza ``n_steps`` y llama ``cb(state)`` cada ``stride`` pasos."""
+        if not state.has_forces:
+            self.evaluate(state)
+        done = 0
+        while done < n_steps:
+            chunk = min(stride - state.step % stride, n_steps - done)
+            self.advance(state, chunk)
+            done += chunk
+            if state.step % stride == 0:
+                for callback in callbacks:
+                    callback(state)
+        return state
+
+
+# ==============================================
+# INTEGRADORES
+# ==============================================
+class VelocityVerlet(Integrator):
+    """Velocity Verlet (kick-drift-kick) con una evaluación de fuerzas por paso.
+
+    Con ``constraints`` es RATTLE: SHAKE en la deriva y proyección de las
+    velocidades tras el segundo medio kick.
+    """
+
+    def step(self, state):
+        if not state.has_forces:
+            self.evaluate(state)
+        self._kick(state, 0.5 * self.dt)
+        self._drift(state, self.dt)
+        self.evaluate(state)
+        self._kick(state, 0.5 * self.dt)
+        self._constrain_velocities(state)
+
+
+class Leapfrog(Integrator):
+    """Leapfrog con velocidades en medios pasos, como leapfrog-CO2.py.
+
+    En la primera llamada las velocidades se retrasan medio paso
+    (``state.velocity_offset = -0.5``). Cada paso hace
+    v(t + dt/2) = v(t - dt/2) + dt F(t)/m y luego x(t + dt) = x(t) +
+    dt v(t + dt/2); el script original derivaba antes de patear y quedaba
+    desfasado medio paso. ``synchronized_velocities`` reconstruye v(t).
+    """
+
+    def step(self, state):
+        if not state.has_forces:
+            self.evaluate(state)
+        if state.velocity_offset == 0.0:
+            self._kick(state, -0.5 * self.dt)
+            state.velocity_offset = -0.5
+        self._kick(state, self.dt)
+        self._drift(state, self.dt)
+        self.evaluate(state)
+
+    def synchronized_velocities(self, state):
+        """v(t) ≈ v(t - dt/2) + dt/2 F(t)/m (asigna un arreglo nuevo)."""
+        if state.velocity_offset == 0.0:
+            return state.velocities.copy()
+        return state.velocities + 0.5 * self.dt * state.forces * state.inv_mass
+
+
+class BAOAB(Integrator):
+    """Dinámica de Langevin con la partición BAOAB (Leimkuhler-Matthews).
+
+    La fricción es F = -friction * v, como ``damping * vel`` en
+    verlet-CH4.v2.py, de modo que el coeficiente de decaimiento por átomo
+    es friction/m. El paso O aplica v <- c v + sqrt((1 - c²) kT/m) ξ con
+    c = exp(-friction dt / m); con ``kT = 0`` es un amortiguamiento exacto
+    y determinista. Sigue siendo una sola evaluación de fuerzas por paso.
+    """
+
+    def __init__(self, force_field, dt, friction, kT=0.0, rng=None, constraints=None):
+        super().__init__(force_field, dt, constraints)
+        self.friction = float(friction)
+        self.kT = float(kT)
+        self.rng = NoiseStream() if rng is None else rng
+        self._coeffs = None
+
+    def _ou_coefficients(self, state):
+        if self._coeffs is None or self._coeffs[0].shape != state.inv_mass.shape:
+            c = np.exp(-self.friction * self.dt * state.inv_mass)
+            sigma = np.sqrt((1.0 - c * c) * self.kT * state.inv_mass)
+            self._coeffs = (c, sigma, np.empty(state.positions.shape))
+        return self._coeffs
+
+    def step(self, state):
+        if not state.has_forces:
+            self.evaluate(state)
+        c, sigma, noise = self._ou_coefficients(state)
+        self._kick(state, 0.5 * self.dt)           # B
+        self._drift(state, 0.5 * self.dt)          # A
+        state.velocities *= c                      # O
+        if self.kT > 0.0:
+            self.rng.standard_normal(out=noise)
+            noise *= sigma
+            state.velocities += noise
+        self._constrain_velocities(state)
+        self._drift(state, 0.5 * self.dt)          # A
+        self.evaluate(state)
+        self._kick(state, 0.5 * self.dt)           # B
+        self._constrain_velocities(state)
+
+
+class Brownian(Integrator):
+    """Langevin sobreamortiguado (Euler-Maruyama), como browniam-dynamics-H20.py.
+
+    x += dt/γ F + sqrt(2 kT dt/γ) ξ. Las velocidades no se usan. Con
+    ``constraints`` el desplazamiento se corrige con SHAKE (misma movilidad
+    para todos los átomos, por eso con pesos unitarios).
+    """
+
+    def __init__(self, force_field, dt, gamma, kT, rng=None, constraints=None):
+        super().__init__(force_field, dt, constraints)
+        self.gamma = float(gamma)
+        self.kT = float(kT)
+        self.rng = NoiseStream() if rng is None else rng
+        self.noise_scale = np.sqrt(2.0 * self.kT * self.dt / self.gamma)
+        self._noise = None
+        self._reference = None     # posiciones antes del paso y pesos unitarios para SHAKE
+
+    def _constraint_buffers(self, state):
+        pos = state.positions
+        if (self._reference is None or self._reference[0].shape != pos.shape
+                or self._reference[0].dtype != pos.dtype):
+            self._reference = (np.empty_like(pos), np.ones(state.n_atoms))
+        return self._reference
+
+    def step(self, state):
+        if not state.has_forces:
+            self.evaluate(state)
+        if self.constraints is not None:
+            reference, weights = self._constraint_buffers(state)
+            reference[:] = state.positions
+        np.multiply(state.forces, self.dt / self.gamma, out=state.scratch)
+        state.positions += state.scratch
+        if self.kT > 0.0:
+            # Búfer float64: np.random.Generator exige el dtype de ``out``
+            if self._noise is None or self._noise.shape != state.positions.shape:
+                self._noise = np.empty(state.positions.shape)
+            self.rng.standard_normal(out=self._noise)
+            self._noise *= self.noise_scale
+            state.positions += self._noise
+        if self.constraints is not None:
+            n = state.n_atoms
+            self.constraints.constrain_positions(state.positions.reshape(n, -1),
+                                                 reference.reshape(n, -1), weights)
+        self.evaluate(state)
+
+
+class RESPA(Integrator):
+    """Velocity Verlet de pasos múltiples (r-RESPA, Tuckerman-Berne-Martyna).
+
+    ``fast`` (típicamente los enlaces rígidos) se integra en un bucle
+    interno de ``n_inner`` pasos de dt/n_inner; ``slow`` (no enlazantes,
+    campos externos) solo se evalúa una vez por paso externo dt y entra
+    como dos medios kicks. ``state.forces`` y ``state.pe`` son la suma de
+    ambos. ``n_force_calls`` cuenta evaluaciones lentas y
+    ``n_fast_calls`` las rápidas.
+    """
+
+    def __init__(self, fast, slow, dt, n_inner, constraints=None):
+        self.fast = as_force_field(fast)
+        self.slow = as_force_field(slow)
+        super().__init__(ForceField(*self.fast.terms, *self.slow.terms), dt, constraints)
+        self.n_inner = int(n_inner)
+        self.n_fast_calls = 0
+        self._split = None
+
+    @property
+    def inner_dt(self):
+        return self.dt / self.n_inner
+
+    def _buffers(self, state):
+        if self._split is None or self._split[0].shape != state.forces.shape:
+            self._split = (np.zeros_like(state.forces), np.zeros_like(state.forces))
+        return self._split
+
+    def _evaluate_fast(self, state):
+        fast = self._buffers(state)[0]
+        _, self._pe_fast = self.fast.compute(state.positions, out=fast)
+        self.n_fast_calls += 1
+
+    def _evaluate_slow(self, state):
+        slow = self._buffers(state)[1]
+        _, self._pe_slow = self.slow.compute(state.positions, out=slow)
+        self.n_force_calls += 1
+
+    def _sync(self, state):
+        fast, slow = self._split
+        np.add(fast, slow, out=state.forces)
+        state.pe = self._pe_fast + self._pe_slow
+        state.has_forces = True
+
+    def evaluate(self, state):
+        self._evaluate_fast(state)
+        self._evaluate_slow(state)
+        self._sync(state)
+        return state.forces
+
+    def _kick_with(self, state, forces, h):
+        np.multiply(forces, state.inv_mass, out=state.scratch)
+        state.scratch *= h
+        state.velocities += state.scratch
+
+    def step(self, state):
+        if not state.has_forces or self._split is None:
+            self.evaluate(state)
+        fast, slow = self._split
+        h = self.inner_dt
+        self._kick_with(state, slow, 0.5 * self.dt)
+        for _ in range(self.n_inner):
+            self._kick_with(state, fast, 0.5 * h)
+            self._drift(state, h)
+            self._evaluate_fast(state)
+            self._kick_with(state, fast, 0.5 * h)
+        self._evaluate_slow(state)
+        self._kick_with(state, slow, 0.5 * self.dt)
+        self._constrain_velocities(state)
+        self._sync(state)
+
+    def step_histogram(self, n_steps):
+        """Pasos dados con cada tamaño en ``n_steps`` pasos externos: {dt: cantidad}."""
+        return {self.inner_dt: n_steps * self.n_inner, self.dt: n_steps}
+
+    def checkpoint_state(self):
+        # Las fuerzas rápida y lenta por separado: state.forces es solo su suma
+        extra = super().checkpoint_state()
+        extra['n_fast_calls'] = self.n_fast_calls
+        if self._split is not None:
+            extra['fast_forces'], extra['slow_forces'] = self._split
+            extra['pe_fast'], extra['pe_slow'] = float(self._pe_fast), float(self._pe_slow)
+        return extra
+
+    def restore_state(self, extra):
+        super().restore_state(extra)
+        self.n_fast_calls = extra['n_fast_calls']
+        if 'fast_forces' in extra:
+            self._split = (np.array(extra['fast_forces']), np.array(extra['slow_forces']))
+            self._pe_fast, self._pe_slow = extra['pe_fast'], extra['pe_slow']
+        else:
+            self._split = None
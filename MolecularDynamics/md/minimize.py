@@ -0,0 +1,251 @@
+"""
+Minimización de energía (optimización de geometría) con FIRE y L-BFGS.
+
+En lugar de llegar al mínimo con miles de pasos de dinámica amortiguada,
+``fire`` y ``lbfgs`` usan directamente la energía y las fuerzas del mismo
+campo de fuerzas (un término, un ``ForceField``, una lista o una función
+``f(pos) -> (forces, pe)``) y se detienen cuando la mayor fuerza por átomo
+baja de ``ftol`` o el cambio relativo de energía en una iteración baja de
+``etol``.
+
+Ambos trabajan por lotes: si el campo de fuerzas devuelve una energía por
+estructura (p. ej. ``EnsembleBonds`` con posiciones (R, N, dim)), cada
+estructura tiene sus propios pasos, historia y criterio de parada, y todas
+se evalúan en una sola llamada por iteración. Las estructuras que ya
+convergieron dejan de moverse.
+
+Las unidades son las del campo de fuerzas; ``max_step`` (Å) acota el
+desplazamiento de cualquier átomo en una iteración y FIRE usa masas
+unitarias.
+"""
+import numpy as np
+
+from .integrators import as_force_field
+
+
+class MinimizeResult:
+    """Resultado de una minimización.
+
+    ``positions``, ``energy``, ``forces`` y ``fmax`` (mayor |F| por átomo)
+    son los del punto final; ``converged``, ``n_iterations`` y
+    ``n_evaluations`` (evaluaciones de fuerza) son escalares para una
+    estructura o arreglos (R,) en un lote. ``n_force_calls`` cuenta las
+    llamadas al campo de fuerzas (una por lote).
+    """
+
+    def __init__(self, method, positions, energy, forces, fmax, converged, n_iterations,
+                 n_evaluations, n_force_calls):
+        self.method = method
+        self.positions = positions
+        self.energy = energy
+        self.forces = forces
+        self.fmax = fmax
+        self.converged = converged
+        self.n_iterations = n_iterations
+        self.n_evaluations = n_evaluations
+        self.n_force_calls = n_force_calls
+
+    def __repr__(self):
+        return (f"MinimizeResult({self.method}, energy={self.energy}, fmax={self.fmax}, "
+                f"converged={self.converged}, n_evaluations={self.n_evaluations})")
+
+
+class _Problem:
+    """Posiciones aplanadas (R, n) y evaluación con contadores por estructura."""
+
+    def __init__(self, force_field, positions):
+        self.term = force_field if hasattr(force_field, 'compute') else as_force_field(force_field)
+        self.shape = np.shape(positions)
+        self.positions = np.array(positions, dtype=float)
+        self.forces = np.zeros_like(self.positions)
+        _, pe = self.term.compute(self.positions, out=self.forces)
+        self.batched = np.ndim(pe) == 1
+        self.n_structures = len(pe) if self.batched else 1
+        self.atom_shape = self.shape[1:] if self.batched else self.shape
+        self.x = self.positions.reshape(self.n_structures, -1)
+        self.f = self.forces.reshape(self.n_structures, -1)
+        self.e = np.atleast_1d(np.asarray(pe, dtype=float)).copy()
+        self.n_force_calls = 1
+        self.n_evaluations = np.ones(self.n_structures, dtype=int)
+
+    def evaluate(self, x, active):
+        """Fuerzas (R, n) y energías (R,) en ``x``; cuenta solo las estructuras activas."""
+        positions = x.reshape(self.shape)
+        forces = np.zeros_like(positions)
+        _, pe = self.term.compute(positions, out=forces)
+        self.n_force_calls += 1
+        self.n_evaluations += active
+        return forces.reshape(self.n_structures, -1), np.atleast_1d(np.asarray(pe, dtype=float))
+
+    def fmax(self, f):
+        """Mayor norma por átomo (R,) de un arreglo aplanado (R, n)."""
+        atoms = f.reshape(self.n_structures, self.atom_shape[0], -1)
+        return np.sqrt(np.einsum('rnd,rnd->rn', atoms, atoms).max(axis=1))
+
+    def result(self, method, converged, n_iterations):
+        fmax = self.fmax(self.f)
+        if self.batched:
+            return MinimizeResult(method, self.positions, self.e, self.forces, fmax, converged,
+                                  n_iterations, self.n_evaluations, self.n_force_calls)
+        return MinimizeResult(method, self.positions, float(self.e[0]), self.forces,
+                              float(fmax[0]), bool(converged[0]), int(n_iterations[0]),
+                              int(self.n_evaluations[0]), self.n_force_calls)
+
+
+def _energy_converged(e_old, e_new, etol):
+    return np.abs(e_old - e_new) <= etol * np.maximum(1.0, np.abs(e_new))
+
+
+# ==============================================
+# FIRE
+# ==============================================
+def fire(force_field, positions, ftol=1e-3, etol=0.0, max_iter=5000, dt=0.02, dt_max=0.2,
+         max_step=0.2, n_min=5, f_inc=1.1, f_dec=0.5, alpha_start=0.1, f_alpha=0.99):
+    """FIRE (Bitzek et al. 2006): dinámica con masas unitarias que mezcla v hacia F.
+
+    Mientras la potencia F·v es positiva el paso crece y la velocidad se
+    alinea con la fuerza; si se vuelve negativa la velocidad se anula y el
+    paso se reduce. ``etol = 0`` desactiva el criterio de energía (la
+    energía de FIRE no decrece de forma monótona).
+    """
+    p = _Problem(force_field, positions)
+    n_struct = p.n_structures
+    v = np.zeros_like(p.x)
+    dt = np.full(n_struct, float(dt))
+    alpha = np.full(n_struct, float(alpha_start))
+    n_positive = np.zeros(n_struct, dtype=int)
+    iterations = np.zeros(n_struct, dtype=int)
+    converged = p.fmax(p.f) < ftol
+    active = ~converged
+
+    for _ in range(max_iter):
+        if not active.any():
+            break
+        power = np.einsum('rn,rn->r', p.f, v)
+        uphill = power <= 0.0
+        f_norm = np.sqrt(np.einsum('rn,rn->r', p.f, p.f))
+        v_norm = np.sqrt(np.einsum('rn,rn->r', v, v))
+        mix = np.where(f_norm > 0, alpha * v_norm / np.where(f_norm > 0, f_norm, 1.0), 0.0)
+        v *= (1.0 - alpha)[:, None]
+        v += mix[:, None] * p.f
+        grow = ~uphill & (n_positive > n_min)
+        dt = np.where(grow, np.minimum(dt * f_inc, dt_max), dt)
+        alpha = np.where(grow, alpha * f_alpha, alpha)
+        n_positive = np.where(uphill, 0, n_positive + 1)
+        v[uphill] = 0.0
+        dt = np.where(uphill, dt * f_dec, dt)
+        alpha = np.where(uphill, alpha_start, alpha)
+
+        # Euler semi-implícito con desplazamiento acotado
+        v += dt[:, None] * p.f
+        v[~active] = 0.0
+        dx = dt[:, None] * v
+        scale = np.minimum(1.0, max_step / np.maximum(p.fmax(dx), 1e-300))
+        p.x += scale[:, None] * dx
+
+        e_old = p.e
+        p.f[...], p.e = p.evaluate(p.x, active)
+        iterations += active
+        done = p.fmax(p.f) < ftol
+        if etol > 0:
+            done |= _energy_converged(e_old, p.e, etol)
+        converged |= active & done
+        active &= ~done
+    return p.result('FIRE', converged, iterations)
+
+
+# ==============================================
+# L-BFGS
+# ==============================================
+def lbfgs(force_field, positions, ftol=1e-3, etol=1e-12, max_iter=1000, memory=10,
+          max_step=0.2, c1=1e-4, max_backtrack=30):
+    """L-BFGS con búsqueda lineal de Armijo por retroceso, por lotes.
+
+    Cada estructura guarda los últimos ``memory`` pares (s, y) y su
+    dirección sale de la recursión de dos bucles, vectorizada sobre el
+    lote. Si una dirección no es de descenso la historia de esa
+    estructura se borra y se usa -∇U. Una estructura que no logra bajar la
+    energía en ``max_backtrack`` retrocesos se detiene sin converger.
+    """
+    p = _Problem(force_field, positions)
+    n_struct, n = p.x.shape
+    s_hist = np.zeros((memory, n_struct, n))
+    y_hist = np.zeros((memory, n_struct, n))
+    rho = np.zeros((memory, n_struct))
+    valid = np.zeros((memory, n_struct), dtype=bool)
+    coeff = np.zeros((memory, n_struct))
+    iterations = np.zeros(n_struct, dtype=int)
+    converged = p.fmax(p.f) < ftol
+    active = ~converged
+    g = -p.f
+
+    for it in range(max_iter):
+        if not active.any():
+            break
+        # Recursión de dos bucles (de la más nueva a la más vieja y de vuelta)
+        order = [(it - 1 - k) % memory for k in range(min(it, memory))]
+        q = g.copy()
+        for slot in order:
+            coeff[slot] = np.where(valid[slot], rho[slot] * np.einsum('rn,rn->r', s_hist[slot], q), 0.0)
+            q -= coeff[slot][:, None] * y_hist[slot]
+        gamma = np.ones(n_struct)
+        if order:
+            newest = order[0]
+            yy = np.einsum('rn,rn->r', y_hist[newest], y_hist[newest])
+            gamma = np.where(valid[newest], 1.0 / np.where(valid[newest], rho[newest] * yy, 1.0), 1.0)
+        d = gamma[:, None] * q
+        for slot in reversed(order):
+            beta = np.where(valid[slot], rho[slot] * np.einsum('rn,rn->r', y_hist[slot], d), 0.0)
+            d += (coeff[slot] - beta)[:, None] * s_hist[slot]
+        d = -d
+
+        slope = np.einsum('rn,rn->r', g, d)
+        reset = slope >= 0.0
+        if reset.any():
+            d[reset] = -g[reset]
+            valid[:, reset] = False
+            slope = np.einsum('rn,rn->r', g, d)
+
+        # Búsqueda lineal: paso 1 acotado a max_step por átomo, mitades hasta Armijo
+        step = np.minimum(1.0, max_step / np.maximum(p.fmax(d), 1e-300))
+        x_new, f_new, e_new = p.x.copy(), p.f.copy(), p.e.copy()
+        pending = active.copy()
+        for _ in range(max_backtrack):
+            trial = p.x + step[:, None] * d
+            trial[~pending] = x_new[~pending]
+            f_trial, e_trial = p.evaluate(trial, pending)
+            accept = pending & (e_trial <= p.e + c1 * step * slope)
+            x_new[accept], f_new[accept], e_new[accept] = trial[accept], f_trial[accept], e_trial[accept]
+            pending &= ~accept
+            if not pending.any():
+                break
+            step = np.where(pending, 0.5 * step, step)
+        stalled = pending
+        moved = active & ~stalled
+
+        # Historia: solo pares con curvatura positiva
+        slot = it % memory
+        s = x_new - p.x
+        y = p.f - f_new
+        sy = np.einsum('rn,rn->r', s, y)
+        keep = moved & (sy > 1e-12 * np.sqrt(np.einsum('rn,rn->r', s, s) * np.einsum('rn,rn->r', y, y)))
+        s_hist[slot], y_hist[slot] = s, y
+        rho[slot] = np.where(keep, 1.0 / np.where(keep, sy, 1.0), 0.0)
+        valid[slot] = keep
+
+        e_old = p.e.copy()
+        p.x[moved], p.f[moved], p.e[moved] = x_new[moved], f_new[moved], e_new[moved]
+        g = -p.f
+        iterations += active
+        done = moved & ((p.fmax(p.f) < ftol) | _energy_converged(e_old, p.e, etol))
+        converged |= done
+        active &= ~(done | stalled)
+    return p.result('L-BFGS', converged, iterations)
+
+
+def minimize(force_field, positions, method='lbfgs', **kwargs):
+    """``lbfgs`` o ``fire`` según ``method``."""
+    methods = {'lbfgs': lbfgs, 'fire': fire}
+    if method not in methods:
+        raise ValueError(f"método desconocido: {method!r} (opciones: {', '.join(methods)})")
+    return methods[method](force_field, positions, **kwargs)
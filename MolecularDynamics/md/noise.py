@@ -0,0 +1,111 @@
+"""
+Ruido gaussiano por bloques con un generador basado en contador (Philox).
+
+``NoiseStream`` sustituye a ``np.random.Generator`` en los integradores
+estocásticos (``Brownian``, ``BAOAB``, ``ensemble.brownian``): tiene el
+mismo ``standard_normal(out=...)``, pero en lugar de una llamada pequeña
+por paso genera de una vez ``block_steps`` pasos de ruido en un búfer
+reutilizable y en cada paso solo copia la fila que toca.
+
+Philox cifra un contador de 256 bits con una clave de 128 bits, así que
+cualquier posición del flujo se alcanza sin generar las anteriores. La
+clave sale de ``seed`` y el contador de arranque de cada bloque es::
+
+    (réplica << 192) | (bloque << 128),   bloque = paso // block_steps
+
+Por lo tanto el ruido del paso ``s`` de la réplica ``r`` depende solo de
+``(seed, r, s, block_steps)``: las réplicas y los procesos de trabajo son
+independientes entre sí, una corrida se puede repartir o reanudar en
+cualquier paso (``seek``) y un checkpoint solo necesita el número de paso.
+Con ``replica`` como secuencia cada fila trae un eje inicial de réplicas y
+la réplica ``r`` recibe exactamente el mismo ruido que una corrida
+individual con ``NoiseStream(seed, r)`` y el mismo ``block_steps``.
+
+Sin ``block_steps`` el bloque es de 256 pasos, acotado para que el búfer
+no pase de ``BLOCK_NUMBERS`` números (8 MiB); depende entonces solo del
+tamaño del sistema.
+"""
+import numpy as np
+
+BLOCK_NUMBERS = 1 << 20
+_MASK64 = (1 << 64) - 1
+
+
+class NoiseStream:
+    """Flujo ξ ~ N(0, 1) de una o varias réplicas, por bloques de ``block_steps`` pasos.
+
+    La forma de cada paso se fija en la primera llamada a
+    ``standard_normal``. ``seed=None`` toma entropía del sistema y la
+    guarda en ``seed`` para poder reproducir la corrida.
+    """
+
+    def __init__(self, seed=None, replica=0, block_steps=None):
+        self.seed = np.random.SeedSequence(seed).entropy
+        self.replica = replica
+        self._replicas = np.atleast_1d(np.asarray(replica, dtype=np.uint64))
+        self.batched = np.ndim(replica) > 0
+        self.block_steps = None if block_steps is None else int(block_steps)
+        self.step = 0
+        self.generator = np.random.Generator(np.random.Philox(key=self._key()))
+        self._bit_state = self.generator.bit_generator.state
+        self._buffer = None
+        self._rows = None
+        self._first = -1  # ningún bloque generado
+
+    def _key(self):
+        words = np.random.SeedSequence(self.seed).generate_state(2, np.uint64)
+        return int(words[0]) | int(words[1]) << 64
+
+    def _allocate(self, out):
+        shape = out.shape[1:] if self.batched else out.shape
+        if self.block_steps is None:
+            per_step = len(self._replicas) * int(np.prod(shape))
+            self.block_steps = int(np.clip(BLOCK_NUMBERS // max(per_step, 1), 1, 256))
+        self._buffer = np.empty((len(self._replicas), self.block_steps) + shape)
+        # Vistas fijas de cada paso del bloque: (réplicas, *forma) o (*forma)
+        rows = self._buffer.swapaxes(0, 1) if self.batched else self._buffer[0]
+        self._rows = list(rows)
+
+    def _fill(self, block):
+        """Genera los ``block_steps`` pasos del bloque ``block`` de cada réplica."""
+        state = self._bit_state
+        counter = state['state']['counter']
+        for r, replica in enumerate(self._replicas):
+            counter[:] = 0, 0, block & _MASK64, replica
+            state['buffer_pos'] = 4  # descarta salidas de otro bloque
+            self.generator.bit_generator.state = state
+            self.generator.standard_normal(out=self._buffer[r])
+        self._first = block * self.block_steps
+
+    def standard_normal(self, out):
+        """Escribe en ``out`` el ruido del paso actual y avanza un paso."""
+        row = self.step - self._first
+        if self._buffer is None:
+            self._allocate(out)
+            row = -1
+        if not 0 <= row < self.block_steps:
+            self._fill(self.step // self.block_steps)
+            row = self.step - self._first
+        np.copyto(out, self._rows[row])
+        self.step += 1
+        return out
+
+    def seek(self, step):
+        """Coloca el flujo en el paso ``step`` (el bloque se regenera si hace falta)."""
+        self.step = int(step)
+
+    def spawn(self, replica):
+        """Flujo de otra réplica (o proceso de trabajo) con la misma semilla."""
+        return NoiseStream(self.seed, replica, self.block_steps)
+
+    # Protocolo de md.checkpoint: basta con la posición
+    def checkpoint_state(self):
+        replica = self._replicas.tolist() if self.batched else int(self.replica)
+        return {'seed': self.seed, 'replica': replica, 'block_steps': self.block_steps,
+                'step': self.step}
+
+    def restore_state(self, extra):
+        if (extra['seed'], extra['block_steps']) != (self.seed, self.block_steps) \
+                or extra['replica'] != self.checkpoint_state()['replica']:
+            self.__init__(extra['seed'], extra['replica'], extra['block_steps'])
+        self.seek(extra['step'])
@@ -0,0 +1,222 @@
+"""
+Observables calculados al vuelo con acumuladores acotados.
+
+En lugar de recalcular distancias y energías con ``sum()`` sobre
+generadores en cada paso y guardarlas en listas, ``Observables`` toma la
+energía potencial y las longitudes de enlace que el kernel de fuerzas ya
+calculó (``state.pe`` y ``HarmonicBonds.last_lengths``) y calcula de forma
+vectorizada, cada ``every`` pasos, la energía cinética, la temperatura, el
+RMSD respecto a una referencia y los ángulos pedidos.
+
+Cada cantidad alimenta un ``RunningStats``: media y varianza de Welford y
+promedios por bloques con memoria fija (cuando se llenan los bloques se
+fusionan de a pares y el tamaño de bloque se duplica), de donde sale el
+error estándar de la media con muestras correlacionadas.
+"""
+import numpy as np
+
+K_B = 0.0019872041  # constante de Boltzmann [kcal/mol/K]
+
+
+# ==============================================
+# GEOMETRÍA VECTORIZADA
+# ==============================================
+def bond_angles(pos, a, center, b):
+    """Ángulos a-center-b en grados para arreglos de índices (o escalares)."""
+    pos = np.asarray(pos, dtype=float)
+    u = pos[a] - pos[center]
+    v = pos[b] - pos[center]
+    cos = np.einsum('...d,...d->...', u, v) / np.sqrt(
+        np.einsum('...d,...d->...', u, u) * np.einsum('...d,...d->...', v, v))
+    return np.degrees(np.arccos(np.clip(cos, -1.0, 1.0)))
+
+
+def star_angles(center, others):
+    """Tripletes (a, center, b) de todos los pares de vecinos (H-C-H, H-O-H)."""
+    others = np.asarray(others, dtype=np.intp)
+    a, b = np.triu_indices(len(others), k=1)
+    return others[a], np.full(len(a), center, dtype=np.intp), others[b]
+
+
+def rmsd(pos, reference, masses=None):
+    """RMSD tras centrar y superponer óptimamente (Kabsch) sobre ``reference``.
+
+    Sale de los valores singulares de la matriz de covarianza, sin construir
+    la rotación: RMSD² = Σw|p|² + Σw|q|² - 2 (σ1 + σ2 + signo(det H) σ3).
+    """
+    pos = np.asarray(pos, dtype=float).reshape(len(pos), -1)
+    ref = np.asarray(reference, dtype=float).reshape(len(reference), -1)
+    w = np.ones(len(pos)) if masses is None else np.asarray(masses, dtype=float)
+    w = w / w.sum()
+    p = pos - w @ pos
+    q = ref - w @ ref
+    e = w @ np.einsum('nd,nd->n', p, p) + w @ np.einsum('nd,nd->n', q, q)
+    if p.shape[1] == 1:
+        return float(np.sqrt(max(e - 2 * (w @ (p * q)[:, 0]), 0.0)))
+    h = (p * w[:, None]).T @ q
+    sigma = np.linalg.svd(h, compute_uv=False)
+    if np.linalg.det(h) < 0:
+        sigma[-1] = -sigma[-1]
+    return float(np.sqrt(max(e - 2 * sigma.sum(), 0.0)))
+
+
+# ==============================================
+# ACUMULADORES
+# ==============================================
+class RunningStats:
+    """Media, varianza y promedios por bloques de una serie escalar o vectorial.
+
+    La memoria es fija: a lo sumo ``max_blocks`` bloques; al llenarse se
+    fusionan de a pares y el tamaño de bloque se duplica. ``add`` trabaja
+    sobre buffers propios y no reserva memoria salvo al fusionar bloques
+    (una vez cada vez que el tamaño de bloque se duplica).
+    """
+
+    def __init__(self, shape=(), block_size=16, max_blocks=64):
+        self.shape = tuple(shape)
+        self.count = 0
+        self.mean = np.zeros(self.shape)
+        self._m2 = np.zeros(self.shape)
+        self._delta = np.zeros(self.shape)
+        self._scratch = np.zeros(self.shape)
+        self.block_size = int(block_size)
+        self.max_blocks = int(max_blocks) - int(max_blocks) % 2
+        self.blocks = np.zeros((self.max_blocks,) + self.shape)
+        self.n_blocks = 0
+        self._block_sum = np.zeros(self.shape)
+        self._block_count = 0
+        self.last = np.zeros(self.shape)
+
+    def add(self, value):
+        np.copyto(self.last, value)
+        value = self.last
+        self.count += 1
+        delta, scratch = self._delta, self._scratch
+        np.subtract(value, self.mean, out=delta)
+        np.divide(delta, self.count, out=scratch)
+        self.mean += scratch
+        # M2 += δ (x - media nueva)
+        np.subtract(value, self.mean, out=scratch)
+        delta *= scratch
+        self._m2 += delta
+        self._block_sum += value
+        self._block_count += 1
+        if self._block_count == self.block_size:
+            if self.n_blocks == self.max_blocks:
+                half = self.max_blocks // 2
+                self.blocks[:half] = 0.5 * (self.blocks[0::2] + self.blocks[1::2])
+                self.n_blocks = half
+                self.block_size *= 2
+                # El bloque en curso tiene la mitad del tamaño nuevo: sigue acumulando
+                return
+            np.divide(self._block_sum, self._block_count, out=self.blocks[self.n_blocks:self.n_blocks + 1])
+            self.n_blocks += 1
+            self._block_sum[...] = 0.0
+            self._block_count = 0
+
+    @property
+    def variance(self):
+        return self._m2 / max(self.count - 1, 1)
+
+    @property
+    def std(self):
+        return np.sqrt(self.variance)
+
+    @property
+    def sem(self):
+        """Error estándar de la media a partir de los promedios por bloques."""
+        if self.n_blocks < 2:
+            return np.full(self.shape, np.nan)
+        return self.blocks[:self.n_blocks].std(axis=0, ddof=1) / np.sqrt(self.n_blocks)
+
+
+# ==============================================
+# OBSERVABLES DEL SISTEMA
+# ==============================================
+class Observables:
+    """Callback de ``Integrator.run`` que muestrea cada ``every`` pasos.
+
+    ``bonds`` (HarmonicBonds) aporta las longitudes calculadas por el
+    kernel de fuerzas; con ``reuse_lengths=False`` se recalculan (para
+    backends que no pasan por ``HarmonicBonds.compute``, como FusedVerlet).
+    ``angles`` son tripletes (a, centro, b), p. ej. ``star_angles(0,
+    range(1, 5))``. ``reference`` activa el RMSD. ``dof`` son los grados de
+    libertad de la temperatura (por defecto dim·N menos las restricciones).
+
+    Las cantidades (``pe``, ``ke``, ``te``, ``temperature``, ``lengths``,
+    ``angles``, ``rmsd``) viven en un solo vector por muestra y un único
+    ``RunningStats``; ``last``, ``mean``, ``std`` y ``sem`` las devuelven
+    por nombre.
+    """
+
+    def __init__(self, bonds=None, angles=None, reference=None, every=1, dof=None,
+                 constraints=0, reuse_lengths=True, block_size=16, max_blocks=64):
+        self.bonds = bonds
+        self.angles = None if angles is None else tuple(np.asarray(x, dtype=np.intp) for x in angles)
+        self.reference = None if reference is None else np.array(reference, dtype=float)
+        self.every = int(every)
+        self.dof = dof
+        self.constraints = int(constraints)
+        self.reuse_lengths = reuse_lengths
+        sizes = {'pe': 1, 'ke': 1, 'te': 1, 'temperature': 1}
+        if bonds is not None:
+            sizes['lengths'] = len(bonds)
+        if self.angles is not None:
+            sizes['angles'] = len(self.angles[0])
+        if self.reference is not None:
+            sizes['rmsd'] = 1
+        self.slices = {}
+        offset = 0
+        for name, size in sizes.items():
+            self.slices[name] = slice(offset, offset + size)
+            offset += size
+        self.values = np.zeros(offset)
+        self.stats = RunningStats((offset,), block_size, max_blocks)
+
+    def __call__(self, state):
+        if state.step % self.every == 0:
+            self.sample(state)
+
+    def sample(self, state):
+        """Calcula y acumula todas las cantidades para el estado actual."""
+        values, slices = self.values, self.slices
+        v = state.velocities.reshape(state.n_atoms, -1)
+        ke = 0.5 * float(state.masses @ np.einsum('nd,nd->n', v, v))
+        dof = self.dof if self.dof is not None else v.size - self.constraints
+        values[:4] = state.pe, ke, state.pe + ke, 2.0 * ke / (dof * K_B)
+        if self.bonds is not None:
+            if self.reuse_lengths:
+                values[slices['lengths']] = self.bonds.last_lengths
+            else:
+                values[slices['lengths']] = self.bonds.lengths(state.positions)
+        if self.angles is not None:
+            values[slices['angles']] = bond_angles(state.positions, *self.angles)
+        if self.reference is not None:
+            values[slices['rmsd']] = rmsd(state.positions, self.reference, state.masses)
+        self.stats.add(values)
+
+    def _get(self, array, name):
+        part = array[self.slices[name]]
+        return float(part[0]) if name in ('pe', 'ke', 'te', 'temperature', 'rmsd') else part
+
+    def last(self, name):
+        return self._get(self.stats.last, name)
+
+    def mean(self, name):
+        return self._get(self.stats.mean, name)
+
+    def std(self, name):
+        return self._get(self.stats.std, name)
+
+    def sem(self, name):
+        return self._get(self.stats.sem, name)
+
+    def summary(self):
+        """Tabla de media ± error estándar (bloques) y desviación de cada componente."""
+        mean, sem, std = self.stats.mean, self.stats.sem, self.stats.std
+        lines = [f"{'cantidad':<12} {'media':>12} {'± sem':>10} {'desv.':>10}"]
+        for name, part in self.slices.items():
+            for k in range(part.start, part.stop):
+                label = name if part.stop - part.start == 1 else f"{name}[{k - part.start}]"
+                lines.append(f"{label:<12} {mean[k]:>12.5g} {sem[k]:>10.2g} {std[k]:>10.2g}")
+        return '\n'.join(lines)
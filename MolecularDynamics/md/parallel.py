@@ -0,0 +1,206 @@
+"""
+Evaluación de fuerzas en paralelo con un grupo de procesos.
+
+Cada término de fuerza se reparte entre los procesos: los enlaces por
+bloques contiguos de enlaces y ``NonBondedForce`` por bloques de la lista
+de pares (cada proceso construye solo los pares de sus átomos en el orden
+por celdas, así que la lista de vecinos se reparte y no se repite). Las
+posiciones, las fuerzas parciales de cada proceso y la fuerza total viven en
+``multiprocessing.shared_memory``, así que en cada paso solo viaja un byte
+de orden por una tubería; no se serializa ningún arreglo.
+
+En cada evaluación:
+
+1. el proceso principal copia las posiciones al bloque compartido y avisa
+   a todos los procesos;
+2. cada proceso calcula sus fuerzas parciales sobre su propia capa;
+3. tras una barrera, cada proceso suma las capas de todos sobre su rango de
+   átomos (la reducción también es paralela) y responde.
+
+``ParallelForceField`` tiene la misma interfaz que ``compute_forces`` de
+los scripts (``f(pos) -> (forces, pe)``) y que los términos de
+``md.integrators`` (``compute(pos, out)``), así que se puede pasar
+directamente a cualquier integrador.
+"""
+import multiprocessing as mp
+import os
+import traceback
+import weakref
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from .integrators import ForceField
+
+_COMPUTE = b'f'
+_QUIT = b'q'
+_OK = b'k'
+
+
+def partition_term(term, rank, n_parts):
+    """Parte ``rank`` de ``n_parts`` de un término de fuerza, o None.
+
+    Los términos con método ``partition`` (``HarmonicBonds``,
+    ``NonBondedForce``) se dividen; los demás (funciones arbitrarias) se
+    asignan enteros al proceso 0.
+    """
+    if hasattr(term, 'partition'):
+        return term.partition(rank, n_parts)
+    return term if rank == 0 else None
+
+
+def _block(n, rank, n_parts):
+    """Rango [lo, hi) del bloque ``rank`` al repartir n elementos."""
+    return n * rank // n_parts, n * (rank + 1) // n_parts
+
+
+# ==============================================
+# PROCESO DE TRABAJO
+# ==============================================
+def _worker(rank, n_workers, terms, shape, names, barrier, conn):
+    blocks = [shared_memory.SharedMemory(name=name) for name in names]
+    try:
+        pos = np.ndarray(shape, dtype=float, buffer=blocks[0].buf)
+        partials = np.ndarray((n_workers,) + shape, dtype=float, buffer=blocks[1].buf)
+        total = np.ndarray(shape, dtype=float, buffer=blocks[2].buf)
+        pe = np.ndarray(n_workers, dtype=float, buffer=blocks[3].buf)
+        field = ForceField(*[p for p in (partition_term(t, rank, n_workers) for t in terms)
+                             if p is not None])
+        mine = partials[rank]
+        lo, hi = _block(shape[0], rank, n_workers)
+
+        while True:
+            command = conn.recv_bytes()
+            if command == _QUIT:
+                break
+            try:
+                pe[rank] = field.compute(pos, out=mine)[1]
+                barrier.wait()
+                np.sum(partials[:, lo:hi], axis=0, out=total[lo:hi])
+            except Exception:
+                barrier.abort()
+                conn.send_bytes(traceback.format_exc().encode())
+            else:
+                conn.send_bytes(_OK)
+    finally:
+        for block in blocks:
+            block.close()
+        conn.close()
+
+
+def _shutdown(processes, conns, blocks):
+    for conn in conns:
+        try:
+            conn.send_bytes(_QUIT)
+        except (BrokenPipeError, OSError):
+            pass
+    for proc in processes:
+        proc.join(timeout=5)
+        if proc.is_alive():
+            proc.terminate()
+    for conn in conns:
+        conn.close()
+    for block in blocks:
+        block.close()
+        block.unlink()
+
+
+# ==============================================
+# CAMPO DE FUERZAS PARALELO
+# ==============================================
+class ParallelForceField:
+    """Suma de términos de fuerza evaluada por ``n_workers`` procesos.
+
+    ``terms`` es un término o una lista de ellos (como en
+    ``md.ForceField``). Los procesos se lanzan en la primera evaluación,
+    cuando se conoce la forma de las posiciones, y se cierran con
+    ``close()`` o al salir de un bloque ``with``. ``context`` elige el
+    método de arranque de multiprocessing (por defecto el del sistema).
+    """
+
+    def __init__(self, terms, n_workers=None, context=None, timeout=60.0):
+        self.terms = list(terms) if isinstance(terms, (list, tuple)) else [terms]
+        self.n_workers = int(n_workers or os.cpu_count() or 1)
+        self.context = mp.get_context(context)
+        self.timeout = timeout
+        self.shape = None
+        self._finalizer = None
+
+    def start(self, shape):
+        """Reserva la memoria compartida y lanza los procesos."""
+        if self.shape is not None:
+            raise RuntimeError("el grupo de procesos ya está en marcha")
+        shape = tuple(shape)
+        n_workers = self.n_workers
+        size = int(np.prod(shape)) * 8
+        blocks = [shared_memory.SharedMemory(create=True, size=max(n, 8))
+                  for n in (size, n_workers * size, size, n_workers * 8)]
+        self._positions = np.ndarray(shape, dtype=float, buffer=blocks[0].buf)
+        self._total = np.ndarray(shape, dtype=float, buffer=blocks[2].buf)
+        self._pe = np.ndarray(n_workers, dtype=float, buffer=blocks[3].buf)
+
+        # La barrera debe seguir viva mientras los procesos la deserializan (spawn)
+        self._barrier = barrier = self.context.Barrier(n_workers, timeout=self.timeout)
+        names = [block.name for block in blocks]
+        self._conns, self._processes = [], []
+        for rank in range(n_workers):
+            parent, child = self.context.Pipe()
+            proc = self.context.Process(
+                target=_worker, args=(rank, n_workers, self.terms, shape, names, barrier, child),
+                daemon=True, name=f"md-force-{rank}")
+            proc.start()
+            child.close()
+            self._conns.append(parent)
+            self._processes.append(proc)
+        self.shape = shape
+        self._finalizer = weakref.finalize(self, _shutdown, self._processes,
+                                           self._conns, blocks)
+
+    def compute(self, pos, out=None):
+        """Devuelve (forces, pe); con ``out`` las fuerzas se suman sobre él."""
+        pos = np.asarray(pos, dtype=float)
+        if self.shape is None:
+            self.start(pos.shape)
+        elif pos.shape != self.shape:
+            raise ValueError(f"forma de posiciones {pos.shape}, se esperaba {self.shape}")
+        self._positions[...] = pos
+        for conn in self._conns:
+            conn.send_bytes(_COMPUTE)
+        errors = []
+        for rank, conn in enumerate(self._conns):
+            if not conn.poll(self.timeout):
+                errors.append(f"proceso {rank}: sin respuesta en {self.timeout} s")
+                continue
+            try:
+                reply = conn.recv_bytes()
+            except (EOFError, OSError):
+                errors.append(f"proceso {rank}: terminó inesperadamente")
+                continue
+            if reply != _OK:
+                errors.append(f"proceso {rank}:\n{reply.decode()}")
+        if errors:
+            self.close()
+            raise RuntimeError("falló la evaluación paralela de fuerzas\n" + "\n".join(errors))
+        pe = float(self._pe.sum())
+        if out is None:
+            return self._total.copy(), pe
+        out += self._total
+        return out, pe
+
+    def __call__(self, pos):
+        """Misma firma que ``compute_forces(pos)`` de los scripts."""
+        return self.compute(pos)
+
+    def close(self):
+        """Detiene los procesos y libera la memoria compartida."""
+        if self._finalizer is not None:
+            self._finalizer()
+            self._finalizer = None
+            self.shape = None
+            self._positions = self._total = self._pe = self._barrier = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,245 @@
+"""
+Electrostática periódica con Ewald de malla de partículas suave (SPME).
+
+La suma de Coulomb sobre todas las imágenes periódicas se separa en
+
+- una parte real de corto alcance, k qi qj erfc(α r) / r, que
+  ``NonBondedForce(electrostatics='pme')`` suma sobre la lista de pares
+  dentro del radio de corte (imagen mínima);
+- una parte recíproca suave que ``ParticleMeshEwald`` calcula en una malla:
+  las cargas se reparten con B-splines cardinales de orden ``order``, la
+  convolución con la función de Green se hace con ``np.fft.rfftn`` y las
+  fuerzas salen de interpolar el potencial con las derivadas de los mismos
+  splines (Essmann et al. 1995). El costo es O(N) para repartir e
+  interpolar y O(M log M) para la FFT de M puntos de malla;
+- las correcciones de autoenergía, de los pares excluidos (enlazados de la
+  misma molécula, que la parte recíproca sí incluye) y del fondo
+  neutralizante si la carga total no es nula.
+
+``ewald_sum`` es la suma de Ewald directa (con vectores de onda
+explícitos, O(N²)) que sirve de referencia. Solo cajas ortorrómbicas 3D.
+"""
+import numpy as np
+
+from .bonded import scatter_pair_forces
+from .nonbonded import _TWO_OVER_SQRT_PI, erfc, minimum_image
+from .units import COULOMB_K
+
+
+def fft_size(n):
+    """Menor entero >= n cuyos factores primos son 2, 3 y 5."""
+    n = max(int(np.ceil(n)), 1)
+    while True:
+        m = n
+        for p in (2, 3, 5):
+            while m % p == 0:
+                m //= p
+        if m == 1:
+            return n
+        n += 1
+
+
+def bspline_weights(w, order):
+    """Pesos M_n(w + k), k = 0..n-1, y sus derivadas para fracciones ``w`` en [0, 1).
+
+    ``w`` tiene cualquier forma; el resultado agrega un último eje de
+    tamaño ``order``. Recurrencia de Essmann et al. (1995).
+    """
+    w = np.asarray(w, dtype=float)
+    data = np.zeros(w.shape + (order,))
+    data[..., 0] = 1.0 - w
+    data[..., 1] = w
+    for j in range(3, order):
+        div = 1.0 / (j - 1)
+        data[..., j - 1] = div * w * data[..., j - 2]
+        for k in range(1, j - 1):
+            data[..., j - k - 1] = div * ((w + k) * data[..., j - k - 2]
+                                          + (j - k - w) * data[..., j - k - 1])
+        data[..., 0] = div * (1.0 - w) * data[..., 0]
+    deriv = np.empty_like(data)
+    deriv[..., 0] = -data[..., 0]
+    deriv[..., 1:] = data[..., :-1] - data[..., 1:]
+    div = 1.0 / (order - 1)
+    data[..., order - 1] = div * w * data[..., order - 2]
+    for k in range(1, order - 1):
+        data[..., order - k - 1] = div * ((w + k) * data[..., order - k - 2]
+                                          + (order - k - w) * data[..., order - k - 1])
+    data[..., 0] = div * (1.0 - w) * data[..., 0]
+    return data, deriv
+
+
+def _bspline_moduli(n_grid, order):
+    """|b(m)|² de la interpolación por B-splines para m = 0..n_grid-1."""
+    values = bspline_weights(np.zeros(1), order)[0][0]   # M_n(1..n) en el orden de la malla
+    m = np.arange(n_grid)
+    phase = np.exp(2j * np.pi * np.outer(m, np.arange(order)) / n_grid)
+    denom = np.abs(phase @ values) ** 2
+    return np.where(denom > 1e-10, 1.0 / np.where(denom > 1e-10, denom, 1.0), 0.0)
+
+
+def constant_energies(charges, box, alpha, coulomb_k=COULOMB_K):
+    """Autoenergía -k α/√π Σq² y fondo neutralizante -k π Q² / (2 V α²)."""
+    q = np.asarray(charges, dtype=float)
+    volume = float(np.prod(box))
+    total = q.sum()
+    return (-coulomb_k * alpha / np.sqrt(np.pi) * np.dot(q, q),
+            -coulomb_k * np.pi * total * total / (2 * volume * alpha * alpha))
+
+
+def excluded_pairs_correction(pos, charges, pairs, box, alpha, out, coulomb_k=COULOMB_K):
+    """Resta k qi qj erf(α r) / r de los pares excluidos; suma sus fuerzas en ``out``."""
+    if not len(pairs):
+        return 0.0
+    i, j = pairs[:, 0], pairs[:, 1]
+    qq = charges[i] * charges[j]
+    r_vec = minimum_image(pos[j] - pos[i], box)
+    r = np.sqrt(np.einsum('bd,bd->b', r_vec, r_vec))
+    ar = alpha * r
+    erf = 1.0 - erfc(ar)
+    f_over_r = coulomb_k * qq * (_TWO_OVER_SQRT_PI * alpha * np.exp(-ar * ar) - erf / r) / (r * r)
+    scatter_pair_forces(out, i, j, f_over_r[:, None] * r_vec)
+    return float(np.sum(-coulomb_k * qq * erf / r))
+
+
+# ==============================================
+# PARTE RECÍPROCA EN MALLA
+# ==============================================
+class ParticleMeshEwald:
+    """Parte recíproca de Ewald (SPME) más autoenergía y correcciones.
+
+    ``box`` son los lados de la caja ortorrómbica, ``alpha`` el parámetro
+    de separación (ver ``ewald_alpha``), ``spacing`` el espaciado máximo
+    de la malla [Å] y ``order`` el orden de los B-splines. ``exclusions``
+    (n, 2) son los pares cuya interacción se resta (la parte real no los
+    incluye). Las fuerzas se suman en ``out``.
+    """
+
+    def __init__(self, charges, box, alpha, spacing=1.0, order=4, exclusions=None,
+                 coulomb_k=COULOMB_K):
+        self.charges = np.asarray(charges, dtype=float)
+        self.box = np.asarray(box, dtype=float)
+        if self.box.shape != (3,):
+            raise ValueError("ParticleMeshEwald requiere una caja ortorrómbica 3D")
+        self.alpha = float(alpha)
+        self.order = int(order)
+        self.coulomb_k = coulomb_k
+        self.grid = tuple(max(fft_size(side / spacing), self.order) for side in self.box)
+        self.exclusions = (np.empty((0, 2), dtype=np.intp) if exclusions is None
+                           else np.asarray(exclusions, dtype=np.intp).reshape(-1, 2))
+        self._green = self._green_function()
+        self.self_energy, self.background_energy = constant_energies(self.charges, self.box,
+                                                                     self.alpha, coulomb_k)
+        self.last_energies = {}
+
+    def _green_function(self):
+        """G(m) de la mitad del espectro (rfftn), con el módulo de los B-splines."""
+        k1, k2, k3 = self.grid
+        m = [np.fft.fftfreq(k, 1.0 / k) / side for k, side in zip(self.grid[:2], self.box[:2])]
+        m.append(np.arange(k3 // 2 + 1) / self.box[2])
+        mx, my, mz = np.meshgrid(*m, indexing='ij')
+        m2 = mx * mx + my * my + mz * mz
+        m2[0, 0, 0] = 1.0
+        volume = float(np.prod(self.box))
+        green = (self.coulomb_k / (np.pi * volume) * np.exp(-(np.pi / self.alpha) ** 2 * m2) / m2)
+        green[0, 0, 0] = 0.0
+        b = [_bspline_moduli(k, self.order) for k in self.grid]
+        return green * b[0][:, None, None] * b[1][None, :, None] * b[2][None, None, :k3 // 2 + 1]
+
+    def _stencil(self, pos):
+        """Índices planos de la malla (N, p³) y pesos/derivadas por eje."""
+        u = pos / self.box * self.grid
+        base = np.floor(u).astype(np.intp)
+        w, dw = bspline_weights(u - base, self.order)              # (N, 3, p)
+        offsets = np.arange(self.order)
+        idx = [np.mod(base[:, d, None] + offsets, self.grid[d]) for d in range(3)]
+        flat = ((idx[0][:, :, None, None] * self.grid[1] + idx[1][:, None, :, None])
+                * self.grid[2] + idx[2][:, None, None, :])
+        return flat.reshape(len(pos), -1), w, dw
+
+    def reciprocal(self, pos, out):
+        """Energía recíproca; suma las fuerzas en ``out``."""
+        q = self.charges
+        flat, w, dw = self._stencil(pos)
+        theta = np.einsum('na,nb,nc->nabc', w[:, 0], w[:, 1], w[:, 2]).reshape(len(pos), -1)
+        grid = np.bincount(flat.ravel(), weights=(q[:, None] * theta).ravel(),
+                           minlength=int(np.prod(self.grid))).reshape(self.grid)
+        potential = np.fft.irfftn(self._green * np.fft.rfftn(grid), s=self.grid)
+        potential *= np.prod(self.grid)
+        energy = 0.5 * float(np.vdot(grid, potential))
+        phi = potential.ravel()[flat]                               # (N, p³)
+        scale = np.asarray(self.grid) / self.box
+        for d, (a, b, c) in enumerate(((dw, w, w), (w, dw, w), (w, w, dw))):
+            grad = np.einsum('na,nb,nc->nabc', a[:, 0], b[:, 1], c[:, 2]).reshape(len(pos), -1)
+            out[:, d] -= q * scale[d] * np.einsum('nk,nk->n', phi, grad)
+        return energy
+
+    def compute(self, pos, out=None):
+        """Devuelve (forces, pe) de la parte recíproca y las correcciones."""
+        pos = np.asarray(pos, dtype=float)
+        if out is None:
+            out = np.zeros_like(pos)
+        recip = self.reciprocal(pos, out)
+        excluded = excluded_pairs_correction(pos, self.charges, self.exclusions, self.box,
+                                             self.alpha, out, self.coulomb_k)
+        self.last_energies = {'reciprocal': recip, 'self': self.self_energy,
+                              'excluded': excluded, 'background': self.background_energy}
+        return out, recip + excluded + self.self_energy + self.background_energy
+
+
+# ==============================================
+# SUMA DE EWALD DIRECTA (REFERENCIA)
+# ==============================================
+def ewald_kmax(box, alpha, tol=1e-5):
+    """Menor k_max con exp(-π² n² / (α L)²) < tol en cada eje de la caja."""
+    return int(np.ceil(alpha * np.max(box) * np.sqrt(np.log(1.0 / tol)) / np.pi))
+
+
+def ewald_sum(pos, charges, box, alpha, cutoff, k_max, exclusions=None, coulomb_k=COULOMB_K,
+              chunk=1024):
+    """Energía y fuerzas de Coulomb periódicas por suma de Ewald explícita.
+
+    La parte real suma todos los pares (imagen mínima, ``cutoff`` < L/2) y
+    la recíproca todos los vectores de onda con |n_d| <= ``k_max``. Costo
+    O(N² + N k_max³); solo para validar cajas pequeñas. Los vectores de
+    onda se recorren en bloques de ``chunk``.
+    """
+    pos = np.asarray(pos, dtype=float)
+    q = np.asarray(charges, dtype=float)
+    box = np.asarray(box, dtype=float)
+    n = len(pos)
+    forces = np.zeros_like(pos)
+
+    # Parte real (sin pares excluidos)
+    i, j = np.triu_indices(n, k=1)
+    if exclusions is not None and len(exclusions):
+        ex = np.sort(np.asarray(exclusions, dtype=np.intp), axis=1)
+        keep = ~np.isin(i * n + j, ex[:, 0] * n + ex[:, 1])
+        i, j = i[keep], j[keep]
+    r_vec = minimum_image(pos[j] - pos[i], box)
+    r = np.sqrt(np.einsum('bd,bd->b', r_vec, r_vec))
+    inside = r < cutoff
+    i, j, r_vec, r = i[inside], j[inside], r_vec[inside], r[inside]
+    ar = alpha * r
+    e_real = coulomb_k * q[i] * q[j] * erfc(ar) / r
+    f_over_r = (e_real + coulomb_k * q[i] * q[j] * _TWO_OVER_SQRT_PI * alpha * np.exp(-ar * ar)) / (r * r)
+    scatter_pair_forces(forces, i, j, f_over_r[:, None] * r_vec)
+
+    # Parte recíproca: S(k) = Σ q exp(i k·r) para todos los k != 0, por bloques de k
+    n_vec = np.indices((2 * k_max + 1,) * 3).reshape(3, -1).T - k_max
+    n_vec = n_vec[np.any(n_vec != 0, axis=1)]
+    volume = float(np.prod(box))
+    e_recip = 0.0
+    for start in range(0, len(n_vec), chunk):
+        k_vec = 2 * np.pi * n_vec[start:start + chunk] / box
+        k2 = np.einsum('kd,kd->k', k_vec, k_vec)
+        coeff = 2 * np.pi * coulomb_k / volume * np.exp(-k2 / (4 * alpha * alpha)) / k2
+        phase = pos @ k_vec.T                                       # (N, bloque)
+        cos, sin = np.cos(phase), np.sin(phase)
+        s_re, s_im = q @ cos, q @ sin
+        e_recip += float(np.sum(coeff * (s_re * s_re + s_im * s_im)))
+        forces += 2 * q[:, None] * ((sin * s_re - cos * s_im) * coeff) @ k_vec
+
+    pairs = np.empty((0, 2), dtype=np.intp) if exclusions is None else np.asarray(exclusions)
+    excluded = excluded_pairs_correction(pos, q, pairs, box, alpha, forces, coulomb_k)
+    return forces, float(np.sum(e_real)) + e_recip + excluded + sum(
+        constant_energies(q, box, alpha, coulomb_k))
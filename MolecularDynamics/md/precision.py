@@ -0,0 +1,52 @@
+"""
+Política de precisión del motor.
+
+- ``'double'`` (por defecto): posiciones, velocidades y fuerzas en float64.
+- ``'mixed'``: posiciones, velocidades, fuerzas y los temporales por
+  enlace o por par en float32, que reduce a la mitad la memoria del
+  estado y el tráfico de memoria de cada paso. Todo lo que se *suma*
+  sobre muchos términos se acumula en float64: la energía potencial
+  (``energy_sum``), la cinética, el centro de masas y el momento total
+  (``State.center_of_mass``, ``State.momentum``), y las fuerzas por átomo,
+  que ``np.bincount`` reduce en float64 antes de guardarlas en float32.
+  Las masas y los parámetros del campo de fuerzas se guardan en float64
+  (los kernels los convierten al dtype de trabajo) y la parte recíproca
+  de PME (FFT sobre la malla) se calcula en float64.
+
+La variable de entorno ``MD_PRECISION`` elige la política por defecto
+(como ``MD_BACKEND`` el backend), así que ``MD_PRECISION=mixed python
+verlet-CO.py`` corre cualquier script en precisión mixta.
+
+Las trayectorias se pueden guardar aparte en float32, float16
+(``TrajectoryWriter(..., dtype=np.float16)``) o cuantizadas a 16 bits
+por cuadro (``quantize=True``), independientemente de la del estado.
+"""
+import os
+
+import numpy as np
+
+PRECISIONS = {'double': np.dtype(np.float64), 'mixed': np.dtype(np.float32)}
+
+
+def select_precision(name=None):
+    """Devuelve la política pedida, la de ``MD_PRECISION`` o ``'double'``."""
+    name = name or os.environ.get('MD_PRECISION') or 'double'
+    if name not in PRECISIONS:
+        raise ValueError(f"precisión desconocida: {name!r} (opciones: {tuple(PRECISIONS)})")
+    return name
+
+
+def state_dtype(precision=None):
+    """dtype de posiciones, velocidades y fuerzas de la política."""
+    return PRECISIONS[select_precision(precision)]
+
+
+def as_working(x):
+    """``x`` como arreglo en su precisión de trabajo: float32 se conserva, lo demás a float64."""
+    x = np.asarray(x)
+    return x if x.dtype == np.float32 else np.asarray(x, dtype=float)
+
+
+def energy_sum(x):
+    """Suma de energías por término acumulada en float64 (como float de Python)."""
+    return float(np.sum(x, dtype=np.float64))
@@ -0,0 +1,431 @@
+"""
+Barridos de parámetros con caché de resultados direccionada por contenido.
+
+``run_sweep`` corre un script de modelo (``verlet-CO.py``,
+``leapfrog-CO2.py``, ``verlet-H20.py``, ``verlet-CH4.py``,
+``binary-system.py``...) en cada punto de una rejilla de parámetros,
+repartiendo los puntos entre un grupo de procesos (spawn). Cada punto es
+un diccionario ``{nombre: valor}``:
+
+- los nombres que el script asigna en su primer nivel (``k``, ``r_eq``,
+  ``dt``, ``gamma``, ``damping``...) reemplazan esa constante antes de
+  importarlo (``load_script(..., overrides=...)``), así que ``bonds`` y
+  las condiciones iniciales ya se construyen con los valores nuevos;
+- los demás deben ser argumentos de ``make_system`` (``seed``, ``n``...).
+
+De cada corrida se guardan observables cada ``sample_every`` pasos
+(tiempo, energía potencial, cinética y total, longitudes de ``bonds`` si
+el script los define) y, opcionalmente, la trayectoria en ``.mdtraj``.
+
+La clave de una corrida es el sha256 de los parámetros, de las opciones
+de la corrida y de la versión del código: el texto del script, los
+archivos de los paquetes locales que importa (``md``, ``nbody``) y los
+archivos de datos de ``data/`` junto al script (``parameters.dat``, las
+plantillas XYZ). Editar una constante por defecto, el motor o un archivo
+de parámetros invalida las entradas viejas; repetir un barrido, o uno
+que se solapa con otro, solo calcula los puntos nuevos. Los archivos que
+un script lea desde otro lugar no entran en la clave.
+
+``ResultCache`` guarda cada entrada en un directorio
+``raíz/ab/abcdef.../`` (``meta.json``, ``observables.npz`` y
+``trajectory.mdtraj``). Los procesos escriben en un directorio temporal
+que luego se renombra, así que una entrada está completa o no existe. La
+fecha de modificación de ``meta.json`` se renueva en cada acierto y
+``evict`` borra las entradas usadas hace más tiempo hasta respetar
+``max_bytes`` y ``max_entries`` (LRU).
+"""
+import ast
+import hashlib
+import inspect
+import itertools
+import json
+import multiprocessing as mp
+import os
+import shutil
+import time
+
+import numpy as np
+
+from .benchmark import assigned_constants, load_script
+from .trajectory import TrajectoryWriter
+
+# Cambia si cambia lo que se guarda en una entrada
+CACHE_FORMAT = 1
+# Directorios de datos junto al script que entran en la versión del código
+DATA_DIRS = ('data',)
+
+_META = 'meta.json'
+_OBSERVABLES = 'observables.npz'
+_TRAJECTORY = 'trajectory.mdtraj'
+
+
+# ==============================================
+# REJILLAS, CLAVES Y VERSIÓN DEL CÓDIGO
+# ==============================================
+def parameter_grid(**axes):
+    """Producto cartesiano de ``axes`` ({nombre: valores}) como lista de dicts.
+
+    Un valor escalar es un eje de un solo punto. El último eje varía más
+    rápido (como ``np.meshgrid(..., indexing='ij')``).
+    """
+    names = list(axes)
+    values = [v if isinstance(v, (list, tuple, np.ndarray)) else [v] for v in axes.values()]
+    return [dict(zip(names, combo)) for combo in itertools.product(*values)]
+
+
+def _plain(value):
+    """Escalares y arreglos de numpy -> tipos de Python (con ``repr`` válido en el script)."""
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, (list, tuple)):
+        return [_plain(v) for v in value]
+    return value
+
+
+def _canonical(value):
+    """Forma estable para el hash: 500, 500.0 y np.float64(500) dan la misma clave."""
+    value = _plain(value)
+    if isinstance(value, bool) or value is None or isinstance(value, str):
+        return value
+    if isinstance(value, (int, float)):
+        return float(value)
+    if isinstance(value, list):
+        return [_canonical(v) for v in value]
+    raise TypeError(f"parámetro no serializable: {value!r}")
+
+
+def _local_imports(tree):
+    names = set()
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            names.update(alias.name.split('.')[0] for alias in node.names)
+        elif isinstance(node, ast.ImportFrom) and node.level == 0 and node.module:
+            names.add(node.module.split('.')[0])
+    return names
+
+
+def _tree_files(root_dir):
+    """Archivos bajo ``root_dir`` en orden estable, sin ``__pycache__`` ni ``.pyc``."""
+    files = []
+    for root, dirs, filenames in os.walk(root_dir):
+        dirs[:] = sorted(d for d in dirs if d != '__pycache__')
+        files += [os.path.join(root, f) for f in sorted(filenames) if not f.endswith('.pyc')]
+    return files
+
+
+def code_version(script):
+    """sha256 del script, de los paquetes y módulos locales que importa y de sus datos.
+
+    Solo cuentan los que están junto al script (``md/``, ``nbody/``, con
+    todos sus archivos y no solo los ``.py``) y los directorios
+    ``DATA_DIRS``; las bibliotecas instaladas (numpy, numba) no entran en
+    la versión.
+    """
+    script = os.path.abspath(script)
+    directory = os.path.dirname(script)
+    with open(script, 'rb') as f:
+        source = f.read()
+    files = []
+    for name in sorted(_local_imports(ast.parse(source))):
+        package = os.path.join(directory, name)
+        if os.path.isfile(os.path.join(package, '__init__.py')):
+            files += _tree_files(package)
+        elif os.path.isfile(package + '.py'):
+            files.append(package + '.py')
+    for name in DATA_DIRS:
+        files += _tree_files(os.path.join(directory, name))
+    digest = hashlib.sha256(source)
+    for path in files:
+        digest.update(os.path.relpath(path, directory).encode())
+        with open(path, 'rb') as f:
+            digest.update(hashlib.sha256(f.read()).digest())
+    return digest.hexdigest()
+
+
+def run_key(script, params, options, code=None):
+    """Clave de una corrida: sha256 de script, versión del código, parámetros y opciones."""
+    payload = {
+        'format': CACHE_FORMAT,
+        'script': os.path.basename(script),
+        'code': code or code_version(script),
+        'params': {name: _canonical(v) for name, v in params.items()},
+        'options': {name: _canonical(v) for name, v in options.items()},
+    }
+    return hashlib.sha256(json.dumps(payload, sort_keys=True).encode()).hexdigest()
+
+
+def _make_system_args(tree):
+    for node in tree.body:
+        if isinstance(node, ast.FunctionDef) and node.name == 'make_system':
+            return [a.arg for a in node.args.args + node.args.kwonlyargs]
+    raise ValueError("el script no define make_system()")
+
+
+def split_params(script, params):
+    """Reparte ``params`` en (constantes del script, argumentos de ``make_system``).
+
+    Un nombre que es constante del script va siempre a las constantes
+    (``dt`` de ``verlet-CO.py`` es ambas cosas). Un nombre que no es
+    ninguna de las dos es un error.
+    """
+    with open(script, encoding='utf-8') as f:
+        tree = ast.parse(f.read())
+    constants = set(assigned_constants(tree))
+    arguments = set(_make_system_args(tree))
+    unknown = set(params) - constants - arguments
+    if unknown:
+        raise ValueError(f"{os.path.basename(script)} no tiene los parámetros {sorted(unknown)}")
+    overrides = {name: _plain(v) for name, v in params.items() if name in constants}
+    kwargs = {name: _plain(v) for name, v in params.items() if name not in constants}
+    return overrides, kwargs
+
+
+# ==============================================
+# CACHÉ EN DISCO
+# ==============================================
+class SweepResult:
+    """Resultado de un punto del barrido (``cached``: ya estaba en la caché)."""
+
+    def __init__(self, key, params, meta, observables, trajectory=None, cached=False):
+        self.key = key
+        self.params = params
+        self.meta = meta
+        self.observables = observables
+        self.trajectory = trajectory
+        self.cached = cached
+
+    def __getitem__(self, name):
+        return self.observables[name]
+
+    def __repr__(self):
+        return f"SweepResult({self.params}, {'caché' if self.cached else 'calculado'})"
+
+
+class ResultCache:
+    """Resultados de corridas en ``root``, con expulsión LRU por tamaño o número.
+
+    ``max_bytes`` y ``max_entries`` (None = sin límite) se aplican en
+    ``evict``, que ``run_sweep`` llama al terminar cada barrido.
+    """
+
+    def __init__(self, root, max_bytes=None, max_entries=None):
+        self.root = os.path.abspath(root)
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        os.makedirs(self.root, exist_ok=True)
+
+    def path(self, key):
+        return os.path.join(self.root, key[:2], key)
+
+    def __contains__(self, key):
+        return os.path.isfile(os.path.join(self.path(key), _META))
+
+    def load(self, key, params=None, touch=True):
+        """``SweepResult`` de ``key`` (None si no está); renueva su uso para el LRU."""
+        entry = self.path(key)
+        meta_path = os.path.join(entry, _META)
+        try:
+            with open(meta_path, encoding='utf-8') as f:
+                meta = json.load(f)
+            with np.load(os.path.join(entry, _OBSERVABLES)) as data:
+                observables = {name: data[name] for name in data.files}
+        except FileNotFoundError:  # no existe o se expulsó entre tanto
+            return None
+        if touch:
+            os.utime(meta_path)
+        trajectory = os.path.join(entry, _TRAJECTORY)
+        return SweepResult(key, meta['params'] if params is None else params, meta, observables,
+                           trajectory if os.path.isfile(trajectory) else None, cached=True)
+
+    def entries(self):
+        """[(clave, bytes, último uso)] de todas las entradas completas."""
+        found = []
+        for prefix in os.listdir(self.root):
+            folder = os.path.join(self.root, prefix)
+            if len(prefix) != 2 or not os.path.isdir(folder):
+                continue
+            for key in os.listdir(folder):
+                entry = os.path.join(folder, key)
+                try:
+                    used = os.stat(os.path.join(entry, _META)).st_mtime
+                    size = sum(os.path.getsize(os.path.join(entry, f)) for f in os.listdir(entry))
+                except FileNotFoundError:
+                    continue
+                found.append((key, size, used))
+        return found
+
+    def size(self):
+        """Bytes ocupados por las entradas."""
+        return sum(size for _, size, _ in self.entries())
+
+    def evict(self, keep=()):
+        """Borra las entradas usadas hace más tiempo hasta respetar los límites.
+
+        Las claves de ``keep`` (p. ej. las del barrido en curso) no se
+        borran aunque el límite quede excedido. Devuelve las claves borradas.
+        """
+        entries = sorted(self.entries(), key=lambda e: e[2])
+        total = sum(size for _, size, _ in entries)
+        count = len(entries)
+        keep = set(keep)
+        removed = []
+        for key, size, _ in entries:
+            over_bytes = self.max_bytes is not None and total > self.max_bytes
+            over_count = self.max_entries is not None and count > self.max_entries
+            if not (over_bytes or over_count):
+                break
+            if key in keep:
+                continue
+            shutil.rmtree(self.path(key), ignore_errors=True)
+            total -= size
+            count -= 1
+            removed.append(key)
+        return removed
+
+    def clear(self):
+        for key, _, _ in self.entries():
+            shutil.rmtree(self.path(key), ignore_errors=True)
+
+
+def _commit(root, key, tmp):
+    """Renombra el directorio temporal a la entrada final (si otro proceso ganó, se descarta)."""
+    final = os.path.join(root, key[:2], key)
+    os.makedirs(os.path.dirname(final), exist_ok=True)
+    try:
+        os.rename(tmp, final)
+    except OSError:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+# ==============================================
+# CORRIDAS
+# ==============================================
+def _measure(state):
+    ke = state.kinetic_energy()
+    return float(state.pe), ke, float(state.pe) + ke
+
+
+def run_point(script, params, steps=None, sample_every=10, trajectory=None):
+    """Corre un punto en este proceso; devuelve (observables, metadatos).
+
+    ``steps`` por defecto es la constante ``steps`` del script (con los
+    reemplazos aplicados). Con ``trajectory`` (una ruta) guarda las
+    posiciones de cada muestra en ``.mdtraj``.
+    """
+    overrides, kwargs = split_params(script, params)
+    module = load_script(script, overrides=overrides)
+    n_steps = int(steps if steps is not None else getattr(module, 'steps', 0))
+    if n_steps <= 0:
+        raise ValueError(f"{os.path.basename(script)} no define steps; pásese steps=")
+    accepted = inspect.signature(module.make_system).parameters
+    state, integrator = module.make_system(**{k: v for k, v in kwargs.items() if k in accepted})
+    bonds = getattr(module, 'bonds', None)
+    lengths = getattr(bonds, 'lengths', None)
+
+    n_samples = n_steps // sample_every + 1 + (n_steps % sample_every > 0)
+    series = {name: np.empty(n_samples) for name in ('time', 'pe', 'ke', 'energy')}
+    if lengths is not None:
+        series['lengths'] = np.empty((n_samples, len(lengths(state.positions))))
+    writer = None
+    if trajectory is not None:
+        writer = TrajectoryWriter(trajectory, state.positions.shape, dt=integrator.dt * sample_every,
+                                  stride=sample_every)
+
+    t0 = time.perf_counter()
+    integrator.evaluate(state)
+    done = 0
+    for sample in range(n_samples):
+        if sample > 0:
+            block = min(sample_every, n_steps - done)
+            integrator.advance(state, block)
+            done += block
+        series['time'][sample] = state.time
+        series['pe'][sample], series['ke'][sample], series['energy'][sample] = _measure(state)
+        if lengths is not None:
+            series['lengths'][sample] = lengths(state.positions)
+        if writer is not None:
+            writer.append(state.positions)
+    if writer is not None:
+        writer.close()
+    meta = {
+        'script': os.path.basename(script),
+        'params': {name: _plain(v) for name, v in params.items()},
+        'steps': n_steps,
+        'sample_every': sample_every,
+        'dt': float(integrator.dt),
+        'seconds': time.perf_counter() - t0,
+        'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+    }
+    return series, meta
+
+
+def _compute(task):
+    """Tarea de un proceso: corre el punto y lo escribe en la caché."""
+    root, key, script, params, code, steps, sample_every, trajectory = task
+    tmp = os.path.join(root, f'tmp-{key}-{os.getpid()}')
+    os.makedirs(tmp, exist_ok=True)
+    try:
+        series, meta = run_point(script, params, steps, sample_every,
+                                 os.path.join(tmp, _TRAJECTORY) if trajectory else None)
+        meta.update(key=key, code=code)
+        np.savez(os.path.join(tmp, _OBSERVABLES), **series)
+        with open(os.path.join(tmp, _META), 'w', encoding='utf-8') as f:
+            json.dump(meta, f, indent=2)
+    except BaseException:
+        shutil.rmtree(tmp, ignore_errors=True)
+        raise
+    _commit(root, key, tmp)
+    return key
+
+
+def run_sweep(script, points, cache, n_workers=None, steps=None, sample_every=10,
+              trajectory=False, context=None, progress=None):
+    """Corre ``script`` en cada punto de ``points`` (lista de dicts o ``parameter_grid``).
+
+    Los puntos que ya están en ``cache`` (un ``ResultCache``) se leen; los
+    demás se reparten entre ``n_workers`` procesos (por defecto, uno por
+    CPU; con 1, en este proceso). Puntos repetidos se calculan una vez.
+    ``progress(hechos, total)`` se llama cada vez que termina un punto.
+    La clave incluye ``data/`` junto al script (ver ``code_version``); un
+    script que lea datos de otro directorio debe pasarlos como parámetro
+    o limpiar la caché al cambiarlos. Devuelve un ``SweepResult`` por punto, en el orden de ``points``.
+    """
+    script = os.path.abspath(script)
+    points = [dict(p) for p in points]
+    for params in points:
+        split_params(script, params)  # nombres inválidos fallan antes de lanzar procesos
+    code = code_version(script)
+    options = {'steps': steps, 'sample_every': sample_every, 'trajectory': bool(trajectory)}
+    keys = [run_key(script, p, options, code) for p in points]
+
+    results = {}
+    for key, params in zip(keys, points):
+        if key not in results:
+            result = cache.load(key, params)
+            if result is not None:
+                results[key] = result
+    tasks = {}
+    for key, params in zip(keys, points):
+        if key not in results and key not in tasks:
+            tasks[key] = (cache.root, key, script, params, code, steps, sample_every, trajectory)
+
+    def collect(key):
+        result = cache.load(key, tasks[key][3])
+        result.cached = False
+        results[key] = result
+        if progress is not None:
+            progress(len(results) - n_cached, len(tasks))
+
+    n_cached = len(results)
+    n_workers = min(int(n_workers or os.cpu_count() or 1), max(len(tasks), 1))
+    if n_workers == 1:
+        for key in map(_compute, tasks.values()):
+            collect(key)
+    else:
+        with (context or mp.get_context('spawn')).Pool(n_workers) as pool:
+            for key in pool.imap_unordered(_compute, tasks.values()):
+                collect(key)
+    cache.evict(keep=results)
+    return [results[key] for key in keys]
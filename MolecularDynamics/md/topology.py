@@ -0,0 +1,289 @@
+"""
+Topología: átomos, masas, cargas, enlaces y ángulos como datos.
+
+En lugar de escribir en cada script los índices, masas y enlaces de la
+molécula, una ``Topology`` se construye a partir de un archivo XYZ (cuya
+primera columna es el *tipo* de átomo) y una tabla de parámetros::
+
+    atom   tipo   masa   carga   epsilon   sigma
+    bond   tipo1  tipo2  k       r_eq
+    angle  tipo1  vértice  tipo3  k       θ_eq [grados]
+
+Los enlaces se deducen de la geometría (pares de tipos con entrada
+``bond`` a menos de ``(1 + bond_tolerance) r_eq``) y los ángulos de los
+pares de enlaces que comparten un átomo. ``replicate`` copia la molécula
+en una red para llenar una caja y todo se compila a arreglos planos de
+índices para los kernels vectorizados::
+
+    params = read_parameters('data/parameters.dat')
+    water = Topology.from_xyz('data/h2o.xyz', params).replicate(1000, spacing=3.1)
+    state = water.state(kT=0.596, seed=0)
+    integrator = VelocityVerlet(water.terms(cutoff=9.0), 0.01)
+"""
+import numpy as np
+
+from .bonded import HarmonicAngles, HarmonicBonds
+from .constraints import BondConstraints, _components
+from .integrators import State
+from .nonbonded import NonBondedForce, cell_list_pairs
+
+
+# ==============================================
+# ARCHIVOS DE ENTRADA
+# ==============================================
+def read_xyz(path):
+    """Lee un XYZ: devuelve (tipos, posiciones (N, 3), comentario)."""
+    with open(path, encoding='utf-8') as f:
+        n_atoms = int(f.readline())
+        comment = f.readline().rstrip('\n')
+        types, coords = [], []
+        for _ in range(n_atoms):
+            fields = f.readline().split()
+            types.append(fields[0])
+            coords.append([float(x) for x in fields[1:4]])
+    return types, np.array(coords), comment
+
+
+def write_xyz(path, types, positions, comment=''):
+    """Escribe un cuadro XYZ (p. ej. una caja generada con ``replicate``)."""
+    positions = np.asarray(positions, dtype=float).reshape(len(types), -1)
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(f"{len(types)}\n{comment}\n")
+        for t, p in zip(types, positions):
+            f.write(f"{t:<4} " + " ".join(f"{x:12.6f}" for x in p) + "\n")
+
+
+class ParameterTable:
+    """Parámetros por tipo de átomo, par de tipos (enlace) y triplete (ángulo)."""
+
+    def __init__(self):
+        self.atoms = {}
+        self.bonds = {}
+        self.angles = {}
+
+    def add_atom(self, name, mass, charge=0.0, epsilon=0.0, sigma=0.0):
+        self.atoms[name] = (float(mass), float(charge), float(epsilon), float(sigma))
+
+    def add_bond(self, t1, t2, k, r_eq):
+        self.bonds[tuple(sorted((t1, t2)))] = (float(k), float(r_eq))
+
+    def add_angle(self, t1, center, t3, k, theta_eq_deg):
+        t1, t3 = sorted((t1, t3))
+        self.angles[(t1, center, t3)] = (float(k), np.radians(float(theta_eq_deg)))
+
+    def bond(self, t1, t2):
+        """(k, r_eq) del par de tipos, o None."""
+        return self.bonds.get(tuple(sorted((t1, t2))))
+
+    def angle(self, t1, center, t3):
+        """(k, θ_eq [rad]) del triplete, o None."""
+        t1, t3 = sorted((t1, t3))
+        return self.angles.get((t1, center, t3))
+
+
+def read_parameters(path):
+    """Lee una tabla ``atom``/``bond``/``angle`` (``#`` comenta hasta el final de la línea)."""
+    table = ParameterTable()
+    readers = {'atom': (table.add_atom, 1), 'bond': (table.add_bond, 2),
+               'angle': (table.add_angle, 3)}
+    with open(path, encoding='utf-8') as f:
+        for number, line in enumerate(f, 1):
+            fields = line.split('#', 1)[0].split()
+            if not fields:
+                continue
+            if fields[0] not in readers:
+                raise ValueError(f"{path}:{number}: entrada desconocida {fields[0]!r}")
+            add, n_names = readers[fields[0]]
+            names = fields[1:1 + n_names]
+            add(*names, *(float(x) for x in fields[1 + n_names:]))
+    return table
+
+
+# ==============================================
+# TOPOLOGÍA
+# ==============================================
+class Topology:
+    """Sistema descrito por arreglos planos.
+
+    Por átomo: ``types``, ``masses``, ``charges``, ``epsilon``, ``sigma``,
+    ``molecule`` (índice de molécula) y ``positions``. Enlaces: ``bonds``
+    (n, 2), ``bond_k``, ``bond_r_eq``. Ángulos: ``angles`` (m, 3) con el
+    vértice en la columna del medio, ``angle_k``, ``angle_theta_eq`` [rad].
+    ``pairs_13`` son los extremos de todo par de enlaces con un átomo
+    común (tenga o no parámetros de ángulo), para las exclusiones.
+    """
+
+    def __init__(self, types, positions, masses, charges, epsilon, sigma, bonds, bond_k,
+                 bond_r_eq, angles, angle_k, angle_theta_eq, pairs_13, molecule=None, box=None):
+        self.types = np.asarray(types)
+        self.positions = np.asarray(positions, dtype=float)
+        self.masses = np.asarray(masses, dtype=float)
+        self.charges = np.asarray(charges, dtype=float)
+        self.epsilon = np.asarray(epsilon, dtype=float)
+        self.sigma = np.asarray(sigma, dtype=float)
+        self.bonds = np.asarray(bonds, dtype=np.intp).reshape(-1, 2)
+        self.bond_k = np.asarray(bond_k, dtype=float)
+        self.bond_r_eq = np.asarray(bond_r_eq, dtype=float)
+        self.angles = np.asarray(angles, dtype=np.intp).reshape(-1, 3)
+        self.angle_k = np.asarray(angle_k, dtype=float)
+        self.angle_theta_eq = np.asarray(angle_theta_eq, dtype=float)
+        self.pairs_13 = np.asarray(pairs_13, dtype=np.intp).reshape(-1, 2)
+        n = len(self.types)
+        self.molecule = np.zeros(n, dtype=np.intp) if molecule is None else np.asarray(molecule)
+        self.box = None if box is None else np.asarray(box, dtype=float)
+
+    @property
+    def n_atoms(self):
+        return len(self.types)
+
+    @property
+    def n_molecules(self):
+        return int(self.molecule.max()) + 1 if self.n_atoms else 0
+
+    # Construcción
+    @classmethod
+    def from_xyz(cls, path, parameters, bond_tolerance=0.25):
+        types, positions, _ = read_xyz(path)
+        return cls.from_template(types, positions, parameters, bond_tolerance)
+
+    @classmethod
+    def from_template(cls, types, positions, parameters, bond_tolerance=0.25):
+        """Topología de una molécula (o de un XYZ completo) con enlaces deducidos."""
+        types = np.asarray(types)
+        positions = np.asarray(positions, dtype=float)
+        missing = sorted(set(types) - set(parameters.atoms))
+        if missing:
+            raise KeyError(f"tipos sin parámetros 'atom': {', '.join(missing)}")
+        per_atom = np.array([parameters.atoms[t] for t in types]).reshape(-1, 4)
+        masses, charges, epsilon, sigma = per_atom.T
+
+        # Enlaces: pares cercanos cuyos tipos tienen entrada ``bond``
+        r_max = (1.0 + bond_tolerance) * max((r for _, r in parameters.bonds.values()),
+                                             default=0.0)
+        i, j = cell_list_pairs(positions, r_max) if r_max > 0 else (np.empty(0, np.intp),) * 2
+        bonds, bond_k, bond_r_eq = [], [], []
+        dist = np.linalg.norm(positions[j] - positions[i], axis=1)
+        for a, b, r in zip(i, j, dist):
+            params = parameters.bond(types[a], types[b])
+            if params is not None and r <= (1.0 + bond_tolerance) * params[1]:
+                bonds.append((min(a, b), max(a, b)))
+                bond_k.append(params[0])
+                bond_r_eq.append(params[1])
+        order = np.lexsort(np.array(bonds).T[::-1]) if bonds else []
+        bonds = np.array(bonds, dtype=np.intp).reshape(-1, 2)[order]
+        bond_k, bond_r_eq = np.array(bond_k)[order], np.array(bond_r_eq)[order]
+
+        # Ángulos: pares de enlaces con un átomo común
+        neighbors = [[] for _ in range(len(types))]
+        for a, b in bonds:
+            neighbors[a].append(b)
+            neighbors[b].append(a)
+        pairs_13, angles, angle_k, angle_theta = [], [], [], []
+        for center, near in enumerate(neighbors):
+            for p in range(len(near)):
+                for q in range(p + 1, len(near)):
+                    a, c = sorted((near[p], near[q]))
+                    pairs_13.append((a, c))
+                    params = parameters.angle(types[a], types[center], types[c])
+                    if params is not None:
+                        angles.append((a, center, c))
+                        angle_k.append(params[0])
+                        angle_theta.append(params[1])
+
+        molecule = np.unique(_components(bonds[:, 0], bonds[:, 1], len(types)),
+                             return_inverse=True)[1]
+        return cls(types, positions, masses, charges, epsilon, sigma, bonds, bond_k, bond_r_eq,
+                   angles, angle_k, angle_theta, pairs_13, molecule)
+
+    def replicate(self, n_copies, spacing, random_orientation=False, seed=None):
+        """``n_copies`` copias en una red cúbica (cuadrada en 2D) de lado ``spacing``.
+
+        La red se llena en orden hasta ``n_copies``; ``box`` queda como el
+        lado de la red. Con ``random_orientation`` cada copia se rota al
+        azar alrededor de su centro de masa (solo 3D).
+        """
+        n, dim = self.positions.shape
+        side = int(np.ceil(n_copies ** (1.0 / dim) - 1e-9))
+        cells = np.indices((side,) * dim).reshape(dim, -1).T[:n_copies] * float(spacing)
+        template = self.positions - self.masses @ self.positions / self.masses.sum()
+        copies = np.broadcast_to(template, (n_copies, n, dim))
+        if random_orientation:
+            copies = np.einsum('cij,nj->cni', _random_rotations(n_copies, seed), template)
+        positions = (copies + cells[:, None, :]).reshape(-1, dim)
+
+        offsets = n * np.arange(n_copies)
+        tile = lambda x: np.tile(x, n_copies)
+        shift = lambda idx: (idx[None] + offsets.reshape((-1,) + (1,) * idx.ndim)).reshape(
+            -1, *idx.shape[1:])
+        molecule = (self.molecule[None] + self.n_molecules * np.arange(n_copies)[:, None]).ravel()
+        return Topology(tile(self.types), positions, tile(self.masses), tile(self.charges),
+                        tile(self.epsilon), tile(self.sigma), shift(self.bonds), tile(self.bond_k),
+                        tile(self.bond_r_eq), shift(self.angles), tile(self.angle_k),
+                        tile(self.angle_theta_eq), shift(self.pairs_13), molecule,
+                        box=np.full(dim, side * float(spacing)))
+
+    # Compilación a términos de fuerza
+    def bond_term(self, **kwargs):
+        return HarmonicBonds(self.bonds[:, 0], self.bonds[:, 1], self.bond_k, self.bond_r_eq,
+                             **kwargs)
+
+    def angle_term(self):
+        if not len(self.angles):
+            return None
+        return HarmonicAngles(self.angles[:, 0], self.angles[:, 1], self.angles[:, 2],
+                              self.angle_k, self.angle_theta_eq)
+
+    def exclusions(self):
+        """Pares 1-2 y 1-3 (misma molécula, separados por uno o dos enlaces), sin repetir.
+
+        En un anillo de 4 átomos el mismo par 1-3 aparece desde dos vértices y
+        en uno de 3 los pares 1-3 son también enlaces; la corrección de PME no
+        debe restarlos dos veces.
+        """
+        pairs = np.concatenate([self.bonds, self.pairs_13]).reshape(-1, 2)
+        return np.unique(np.sort(pairs, axis=1), axis=0)
+
+    def nonbonded(self, cutoff=9.0, skin=1.0, periodic=False, **kwargs):
+        """LJ + Coulomb; con ``periodic`` usa ``box`` (imagen mínima, admite PME)."""
+        charges = self.charges if np.any(self.charges) else None
+        if periodic:
+            kwargs['box'] = self.box
+        return NonBondedForce(self.epsilon, self.sigma, charges=charges, cutoff=cutoff, skin=skin,
+                              exclusions=self.exclusions(), **kwargs)
+
+    def terms(self, cutoff=None, rigid_bonds=False, **kwargs):
+        """Lista de términos para un integrador; ``cutoff`` activa los no enlazantes.
+
+        Con ``rigid_bonds`` los enlaces no entran (úsese ``constraints()``).
+        """
+        terms = [] if rigid_bonds else [self.bond_term()]
+        angles = self.angle_term()
+        if angles is not None:
+            terms.append(angles)
+        if cutoff is not None:
+            terms.append(self.nonbonded(cutoff, **kwargs))
+        return terms
+
+    def constraints(self, **kwargs):
+        return BondConstraints.from_bonds(self.bond_term(), **kwargs)
+
+    def state(self, kT=None, seed=None, precision=None):
+        """``State`` con velocidades de Maxwell-Boltzmann a ``kT`` (sin momento total)."""
+        velocities = None
+        if kT:
+            rng = np.random.default_rng(seed)
+            velocities = rng.normal(size=self.positions.shape) * np.sqrt(kT / self.masses)[:, None]
+            velocities -= self.masses @ velocities / self.masses.sum()
+        return State(self.positions, velocities, self.masses, precision)
+
+
+def _random_rotations(n, seed=None):
+    """n matrices de rotación uniformes (cuaterniones normalizados)."""
+    q = np.random.default_rng(seed).normal(size=(n, 4))
+    q /= np.linalg.norm(q, axis=1, keepdims=True)
+    w, x, y, z = q.T
+    return np.stack([
+        np.stack([1 - 2 * (y*y + z*z), 2 * (x*y - w*z), 2 * (x*z + w*y)], axis=-1),
+        np.stack([2 * (x*y + w*z), 1 - 2 * (x*x + z*z), 2 * (y*z - w*x)], axis=-1),
+        np.stack([2 * (x*z - w*y), 2 * (y*z + w*x), 1 - 2 * (x*x + y*y)], axis=-1),
+    ], axis=1)
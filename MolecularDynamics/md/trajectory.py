@@ -0,0 +1,373 @@
+"""
+Almacenamiento de trayectorias sin ``list.append(positions.copy())``.
+
+``TrajectoryRecorder`` reserva un búfer contiguo (cuadros, átomos, dim) y
+copia cada cuadro muestreado en su sitio, así que registrar un paso no
+asigna memoria. Cuando el búfer se llena crece por bloques o, si se da un
+archivo de volcado, escribe los cuadros a disco y reutiliza el búfer.
+
+Formato en disco (``.mdtraj``)::
+
+    MDTRAJ01 | uint32 largo del encabezado | encabezado JSON | cuadros
+
+El encabezado guarda ``frame_shape``, ``dtype``, ``dt``, ``stride`` y los
+nombres de columna opcionales; se rellena para que los datos empiecen en
+un múltiplo de 64 bytes. Los cuadros tienen tamaño fijo y el número de
+cuadros se deduce del tamaño del archivo, así que una corrida interrumpida
+conserva todos los cuadros ya escritos.
+
+Con ``dtype=np.float32`` o ``np.float16`` los cuadros ocupan la mitad o la
+cuarta parte. Con ``quantize=True`` cada cuadro se guarda como enteros de
+16 bits sobre su propio rango en cada eje (desplazamiento y escala en
+float64 al inicio del cuadro): el error es como mucho 1/131070 de la
+extensión del cuadro, fijo en Å en lugar de relativo como en float16, y
+``TrajectoryFile.frames`` decodifica solo lo que se indexa.
+"""
+import json
+import os
+import struct
+
+import numpy as np
+
+MAGIC = b'MDTRAJ01'
+_ALIGN = 64
+
+
+# ==============================================
+# ESCRITURA EN STREAMING
+# ==============================================
+class TrajectoryWriter:
+    """Escribe cuadros de tamaño fijo a un archivo ``.mdtraj`` a medida que llegan.
+
+    Los cuadros se acumulan en un búfer de ``buffer_frames`` y se vuelcan
+    al archivo cuando se llena, con ``flush()`` o al cerrar.
+    """
+
+    def __init__(self, path, frame_shape, dt=None, stride=1, dtype=np.float64,
+                 fields=None, buffer_frames=64, quantize=False):
+        self.path = path
+        self.frame_shape = tuple(int(n) for n in np.atleast_1d(frame_shape))
+        self.quantize = bool(quantize)
+        self.dtype = np.dtype(np.float64 if self.quantize else dtype)
+        self.stride = int(stride)
+        header = {
+            'frame_shape': list(self.frame_shape),
+            'dtype': self.dtype.str,
+            'dt': dt,
+            'stride': self.stride,
+            'fields': fields,
+        }
+        if self.quantize:
+            header['quantized'] = True
+        self._file = open(path, 'wb')
+        self._file.write(_encode_header(header))
+        self._allocate(buffer_frames)
+        self._n_buffered = 0
+        self.n_frames = 0
+
+    def _allocate(self, buffer_frames):
+        if self.quantize:
+            self._buffer = np.empty(int(buffer_frames), dtype=_quantized_dtype(self.frame_shape))
+        else:
+            self._buffer = np.empty((int(buffer_frames),) + self.frame_shape, dtype=self.dtype)
+
+    @classmethod
+    def resume(cls, path, n_frames, buffer_frames=64):
+        """Reabre ``path`` para seguir escribiendo tras el cuadro ``n_frames``.
+
+        Los cuadros posteriores (escritos después del checkpoint del que se
+        reanuda) se descartan truncando el archivo.
+        """
+        existing = TrajectoryFile(path)
+        if len(existing) < n_frames:
+            raise ValueError(f"{path} tiene {len(existing)} cuadros, se pidieron {n_frames}")
+        writer = cls.__new__(cls)
+        writer.path = path
+        writer.frame_shape = existing.frame_shape
+        writer.dtype = existing.dtype
+        writer.quantize = existing.quantized
+        writer.stride = existing.stride
+        end = existing.data_offset + n_frames * existing.frame_bytes
+        del existing  # suelta el memmap antes de truncar
+        writer._file = open(path, 'r+b')
+        writer._file.truncate(end)
+        writer._file.seek(0, os.SEEK_END)
+        writer._allocate(buffer_frames)
+        writer._n_buffered = 0
+        writer.n_frames = int(n_frames)
+        return writer
+
+    def append(self, frame):
+        """Añade un cuadro (se escribe al llenarse el búfer)."""
+        if self.quantize:
+            _quantize(frame, self._buffer[self._n_buffered:self._n_buffered + 1])
+        else:
+            self._buffer[self._n_buffered] = frame
+        self._n_buffered += 1
+        self.n_frames += 1
+        if self._n_buffered == len(self._buffer):
+            self.flush()
+
+    def record(self, step, frame):
+        """Añade el cuadro solo si ``step`` es múltiplo del stride."""
+        if step % self.stride == 0:
+            self.append(frame)
+            return True
+        return False
+
+    def write_block(self, frames):
+        """Escribe directamente un bloque (k, *frame_shape) de cuadros."""
+        if self.quantize:
+            for frame in frames:
+                self.append(frame)
+            return
+        self.flush()
+        np.ascontiguousarray(frames, dtype=self.dtype).tofile(self._file)
+        self.n_frames += len(frames)
+        self._file.flush()
+
+    def flush(self):
+        """Vuelca los cuadros pendientes al archivo."""
+        if self._n_buffered:
+            self._buffer[:self._n_buffered].tofile(self._file)
+            self._n_buffered = 0
+        self._file.flush()
+
+    def close(self):
+        if not self._file.closed:
+            self.flush()
+            self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+# ==============================================
+# LECTURA CON MEMMAP
+# ==============================================
+class TrajectoryFile:
+    """Lectura de un archivo ``.mdtraj`` mediante ``np.memmap``.
+
+    ``frames`` es una vista (cuadros, *frame_shape) sobre el archivo: el
+    rebanado por rango de cuadros o subconjunto de átomos no carga nada
+    más que lo pedido.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, 'rb') as f:
+            header, self.data_offset = _decode_header(f)
+        self.header = header
+        self.frame_shape = tuple(header['frame_shape'])
+        self.dtype = np.dtype(header['dtype'])
+        self.dt = header.get('dt')
+        self.stride = header.get('stride', 1)
+        self.fields = header.get('fields')
+        self.quantized = header.get('quantized', False)
+        if self.quantized:
+            record = _quantized_dtype(self.frame_shape)
+            self.frame_bytes = record.itemsize
+        else:
+            self.frame_bytes = int(np.prod(self.frame_shape)) * self.dtype.itemsize
+
+        # Un cuadro incompleto al final (corrida interrumpida) se ignora
+        n_frames = (os.path.getsize(path) - self.data_offset) // self.frame_bytes
+        if n_frames > 0 and self.quantized:
+            self.frames = QuantizedFrames(np.memmap(path, dtype=record, mode='r',
+                                                    offset=self.data_offset, shape=(n_frames,)))
+        elif n_frames > 0:
+            self.frames = np.memmap(path, dtype=self.dtype, mode='r', offset=self.data_offset,
+                                    shape=(n_frames,) + self.frame_shape)
+        else:
+            self.frames = np.empty((0,) + self.frame_shape, dtype=self.dtype)
+
+    def __len__(self):
+        return len(self.frames)
+
+    def __getitem__(self, key):
+        return self.frames[key]
+
+    def field(self, name):
+        """Columna por nombre para archivos de observables (cuadros, n_campos)."""
+        return self.frames[:, self.fields.index(name)]
+
+    def atoms(self, idx, start=None, stop=None):
+        """Subconjunto de átomos en un rango de cuadros."""
+        return self.frames[start:stop, idx]
+
+    def times(self):
+        """Tiempo de cada cuadro (requiere ``dt`` en el encabezado)."""
+        return np.arange(len(self)) * self.stride * (self.dt or 1.0)
+
+    def iter_chunks(self, chunk_frames=4096):
+        """Recorre el archivo por bloques: produce (inicio, bloque)."""
+        for start in range(0, len(self), chunk_frames):
+            yield start, self.frames[start:start + chunk_frames]
+
+
+class QuantizedFrames:
+    """Cuadros cuantizados de un ``.mdtraj`` que se decodifican al indexarlos.
+
+    Se indexa como el memmap (cuadros, *frame_shape) de un archivo sin
+    cuantizar y devuelve float64; solo se leen los enteros pedidos.
+    """
+
+    def __init__(self, records):
+        self.records = records
+        self.shape = (len(records),) + records.dtype['q'].shape
+        self.ndim = len(self.shape)
+        self.dtype = np.dtype(np.float64)
+        components = records.dtype['offset'].shape
+        self._axes = (len(records),) + (1,) * (self.ndim - 1 - len(components)) + components
+
+    def __len__(self):
+        return self.shape[0]
+
+    def __getitem__(self, key):
+        offset = np.broadcast_to(self.records['offset'].reshape(self._axes), self.shape)[key]
+        scale = np.broadcast_to(self.records['scale'].reshape(self._axes), self.shape)[key]
+        return self.records['q'][key] * scale + offset
+
+    def __array__(self, dtype=None, copy=None):
+        frames = self[:]
+        return frames if dtype is None else frames.astype(dtype)
+
+
+def _quantized_dtype(frame_shape):
+    """Registro de un cuadro cuantizado: desplazamiento y escala por eje + enteros."""
+    components = tuple(frame_shape[-1:]) if len(frame_shape) > 1 else ()
+    return np.dtype([('offset', '<f8', components), ('scale', '<f8', components),
+                     ('q', '<u2', tuple(frame_shape))])
+
+
+def _quantize(frame, record):
+    """Cuantiza ``frame`` sobre su rango en cada eje y lo escribe en ``record`` (1 registro)."""
+    frame = np.asarray(frame, dtype=np.float64)
+    axes = tuple(range(frame.ndim - 1)) if frame.ndim > 1 else None
+    lo = frame.min(axis=axes)
+    span = frame.max(axis=axes) - lo
+    scale = np.where(span > 0, span / 65535.0, 1.0)
+    record['offset'] = lo
+    record['scale'] = scale
+    record['q'] = np.rint((frame - lo) / scale)
+
+
+def open_trajectory(path):
+    """Abre un archivo ``.mdtraj`` para lectura sin cargarlo en memoria."""
+    return TrajectoryFile(path)
+
+
+def _encode_header(header):
+    body = json.dumps(header).encode('utf-8')
+    pad = (-(len(MAGIC) + 4 + len(body))) % _ALIGN
+    body += b' ' * pad
+    return MAGIC + struct.pack('<I', len(body)) + body
+
+
+def _decode_header(f):
+    magic = f.read(len(MAGIC))
+    if magic != MAGIC:
+        raise ValueError(f"{f.name} no es un archivo de trayectoria MDTRAJ01")
+    (length,) = struct.unpack('<I', f.read(4))
+    header = json.loads(f.read(length).decode('utf-8'))
+    return header, len(MAGIC) + 4 + length
+
+
+# ==============================================
+# BÚFER EN MEMORIA
+# ==============================================
+class TrajectoryRecorder:
+    """Búfer preasignado de cuadros con muestreo cada ``stride`` pasos.
+
+    ``frame_shape`` es la forma de un cuadro, p. ej. (n_atoms, dim) para
+    posiciones o (3,) para (PE, KE, TE). ``capacity`` es el número de
+    cuadros reservados al inicio y ``chunk`` cuántos se añaden cada vez que
+    el búfer se llena. Con ``spill_path`` el búfer lleno se vuelca a ese
+    archivo (formato ``.mdtraj``) en lugar de crecer, de modo que la
+    memoria queda acotada.
+    """
+
+    def __init__(self, frame_shape, stride=1, capacity=1024, chunk=None,
+                 dtype=float, spill_path=None, dt=None):
+        if stride < 1:
+            raise ValueError("stride debe ser >= 1")
+        self.frame_shape = tuple(int(n) for n in np.atleast_1d(frame_shape))
+        self.stride = int(stride)
+        self.chunk = int(chunk or capacity)
+        self.dtype = np.dtype(dtype)
+        self.buffer = np.empty((int(capacity),) + self.frame_shape, dtype=self.dtype)
+        self.n_buffered = 0
+        self.n_spilled = 0
+        self.spill_path = spill_path
+        self.dt = dt
+        self._writer = None
+
+    @classmethod
+    def for_run(cls, frame_shape, steps, stride=1, include_initial=True, **kwargs):
+        """Recorder dimensionado exactamente para ``steps`` pasos."""
+        capacity = -(-steps // stride) + (1 if include_initial else 0)
+        return cls(frame_shape, stride=stride, capacity=max(capacity, 1), **kwargs)
+
+    def __len__(self):
+        return self.n_spilled + self.n_buffered
+
+    def append(self, frame):
+        """Copia un cuadro al búfer (sin asignar memoria salvo al crecer)."""
+        if self.n_buffered == len(self.buffer):
+            self._make_room()
+        self.buffer[self.n_buffered] = frame
+        self.n_buffered += 1
+
+    def record(self, step, frame):
+        """Guarda el cuadro solo si ``step`` es múltiplo del stride."""
+        if step % self.stride == 0:
+            self.append(frame)
+            return True
+        return False
+
+    def _make_room(self):
+        if self.spill_path is not None:
+            self._spill()
+        else:
+            grown = np.empty((len(self.buffer) + self.chunk,) + self.frame_shape, dtype=self.dtype)
+            grown[:self.n_buffered] = self.buffer[:self.n_buffered]
+            self.buffer = grown
+
+    def _spill(self):
+        if self._writer is None:
+            self._writer = TrajectoryWriter(self.spill_path, self.frame_shape, dt=self.dt,
+                                            stride=self.stride, dtype=self.dtype)
+        self._writer.write_block(self.buffer[:self.n_buffered])
+        self.n_spilled += self.n_buffered
+        self.n_buffered = 0
+
+    def frames(self):
+        """Todos los cuadros registrados como arreglo (cuadros, ...).
+
+        Sin volcado a disco es una vista del búfer (sin copia). Con volcado,
+        los cuadros del archivo se leen con ``np.memmap`` y se concatenan
+        con los que siguen en memoria.
+        """
+        tail = self.buffer[:self.n_buffered]
+        if not self.n_spilled:
+            return tail
+        return np.concatenate([open_trajectory(self.spill_path).frames, tail])
+
+    def close(self):
+        """Vuelca lo pendiente y cierra el archivo de volcado (si existe)."""
+        if self.spill_path is not None and self.n_buffered:
+            self._spill()
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+
+    def discard(self):
+        """Cierra y borra el archivo de volcado."""
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+        if self.spill_path is not None and os.path.exists(self.spill_path):
+            os.remove(self.spill_path)
@@ -0,0 +1,9 @@
+"""
+Constantes del sistema de unidades del paquete: kcal/mol, Å, uma y carga en e.
+"""
+
+# Constante de Coulomb [kcal/mol · Å / e²]
+COULOMB_K = 332.0637
+
+# Unidad de tiempo de kcal/mol, Å y uma: sqrt(uma Å² / (kcal/mol)) en fs
+TIME_UNIT_FS = 48.888
@@ -0,0 +1,196 @@
+"""
+Visualización en vivo desacoplada del bucle de integración.
+
+El integrador publica instantáneas (paso, posiciones, observables) en una
+cola acotada con ``put_nowait``: si el visor va atrasado la instantánea se
+descarta en lugar de bloquear la simulación. El visor corre en otro
+proceso (o hilo) y actualiza artistas persistentes con ``set_data`` en vez
+de borrar y redibujar los ejes.
+"""
+import multiprocessing as mp
+import queue
+import threading
+
+import numpy as np
+
+from .trajectory import TrajectoryRecorder
+
+
+# ==============================================
+# FIGURA CON ARTISTAS PERSISTENTES
+# ==============================================
+class MoleculeFigure:
+    """Tres paneles: estructura 3D, distancias de enlace y energías.
+
+    ``bonds`` es una lista de pares (i, j); el átomo ``center`` se dibuja
+    en negro y el resto en rojo, como en verlet-CH4.v2.py. Los observables
+    esperados por ``update`` son una columna por enlace seguidas de
+    (PE, KE, TE).
+    """
+
+    def __init__(self, bonds, center=0, r_eq=None, limit=2.0,
+                 title='Estructura Molecular'):
+        import matplotlib.pyplot as plt
+
+        self.plt = plt
+        self.bonds = [tuple(b) for b in bonds]
+        self.center = center
+        self.title = title
+        self.fig = plt.figure(figsize=(18, 6))
+
+        # Gráfico 3D
+        self.ax1 = self.fig.add_subplot(131, projection='3d')
+        self.ax1.set_xlim(-limit, limit)
+        self.ax1.set_ylim(-limit, limit)
+        self.ax1.set_zlim(-limit, limit)
+        self.ax1.set_title(title)
+        self.center_marker, = self.ax1.plot([], [], [], 'o', color='black', ms=14, label='C')
+        self.other_markers, = self.ax1.plot([], [], [], 'o', color='red', ms=10, ls='', label='H')
+        self.bond_lines = [self.ax1.plot([], [], [], 'b-', alpha=0.5)[0] for _ in self.bonds]
+        self.ax1.legend()
+
+        # Distancias
+        self.ax2 = self.fig.add_subplot(132)
+        self.ax2.set_title('Evolución de Distancias C-H')
+        self.ax2.set_xlabel('Paso')
+        self.ax2.set_ylabel('Distancia (Å)')
+        self.dist_lines = [self.ax2.plot([], [], label=f'C-H{n + 1}')[0]
+                           for n in range(len(self.bonds))]
+        if r_eq is not None:
+            self.ax2.axhline(r_eq, color='k', linestyle='--', label='Equilibrio')
+        self.ax2.legend()
+        self.ax2.grid(True)
+
+        # Energías
+        self.ax3 = self.fig.add_subplot(133)
+        self.ax3.set_title('Energías del Sistema')
+        self.ax3.set_xlabel('Paso')
+        self.ax3.set_ylabel('Energía (kcal/mol)')
+        self.energy_lines = [
+            self.ax3.plot([], [], 'r-', label='Potencial')[0],
+            self.ax3.plot([], [], 'b-', label='Cinética')[0],
+            self.ax3.plot([], [], 'k--', label='Total')[0],
+        ]
+        self.ax3.legend()
+        self.ax3.grid(True)
+        self.fig.tight_layout()
+
+    def update(self, step, positions, steps, observables):
+        """Actualiza los artistas con la última estructura y la historia."""
+        others = [n for n in range(len(positions)) if n != self.center]
+        c = positions[self.center]
+        self.center_marker.set_data_3d([c[0]], [c[1]], [c[2]])
+        self.other_markers.set_data_3d(*positions[others].T)
+        for line, (i, j) in zip(self.bond_lines, self.bonds):
+            line.set_data_3d(*positions[[i, j]].T)
+        self.ax1.set_title(f'{self.title} (Paso {step})')
+
+        n_bonds = len(self.bonds)
+        for n, line in enumerate(self.dist_lines):
+            line.set_data(steps, observables[:, n])
+        for n, line in enumerate(self.energy_lines):
+            line.set_data(steps, observables[:, n_bonds + n])
+        for ax in (self.ax2, self.ax3):
+            ax.relim()
+            ax.autoscale_view()
+        self.fig.canvas.draw_idle()
+
+
+def _viewer_loop(snapshots, figure_kwargs, hold):
+    """Consume instantáneas hasta recibir None."""
+    import matplotlib.pyplot as plt
+
+    plt.ion()
+    figure = MoleculeFigure(**figure_kwargs)
+    steps = TrajectoryRecorder(1, capacity=1024)
+    history = None
+    while True:
+        try:
+            item = snapshots.get(timeout=0.05)
+        except queue.Empty:
+            figure.fig.canvas.flush_events()
+            continue
+        if item is None:
+            break
+        step, positions, observables = item
+        if history is None:
+            history = TrajectoryRecorder(len(observables), capacity=1024)
+        steps.append(step)
+        history.append(observables)
+        figure.update(step, positions, steps.frames()[:, 0], history.frames())
+        plt.pause(0.001)
+    plt.ioff()
+    if hold:
+        plt.show()
+
+
+# ==============================================
+# PUBLICADOR
+# ==============================================
+class LiveViewer:
+    """Visor en un proceso (o hilo) aparte alimentado por una cola acotada.
+
+    ``publish`` nunca bloquea: si la cola está llena la instantánea se
+    descarta y se cuenta en ``dropped``. Con ``use_process=False`` el visor
+    corre en un hilo, lo que solo es seguro con backends de matplotlib que
+    no requieren el hilo principal (p. ej. Agg).
+    """
+
+    def __init__(self, bonds, every=100, maxsize=4, use_process=True, hold=True,
+                 **figure_kwargs):
+        self.every = int(every)
+        self.use_process = use_process
+        self.hold = hold
+        self.figure_kwargs = dict(figure_kwargs, bonds=[tuple(int(x) for x in b) for b in bonds])
+        self._queue = mp.Queue(maxsize) if use_process else queue.Queue(maxsize)
+        self._worker = None
+        self.published = 0
+        self.dropped = 0
+
+    def start(self):
+        target = _viewer_loop
+        args = (self._queue, self.figure_kwargs, self.hold)
+        if self.use_process:
+            self._worker = mp.Process(target=target, args=args, daemon=True)
+        else:
+            self._worker = threading.Thread(target=target, args=args, daemon=True)
+        self._worker.start()
+        return self
+
+    def publish(self, step, positions, observables):
+        """Ofrece una instantánea cada ``every`` pasos; True si se encoló."""
+        if step % self.every:
+            return False
+        try:
+            self._queue.put_nowait((step, np.array(positions), np.array(observables)))
+        except queue.Full:
+            self.dropped += 1
+            return False
+        self.published += 1
+        return True
+
+    def close(self, timeout=None, put_timeout=1.0):
+        """Indica fin de datos; espera al visor (p. ej. hasta cerrar la ventana).
+
+        Si la cola sigue llena tras ``put_timeout`` s el visor murió o dejó
+        de leer: el proceso se termina en lugar de bloquear la simulación.
+        """
+        if self._worker is None:
+            return
+        try:
+            self._queue.put(None, timeout=put_timeout)
+        except queue.Full:
+            if self.use_process:
+                if self._worker.is_alive():
+                    self._worker.terminate()
+                self._queue.cancel_join_thread()   # no esperar a vaciar la cola al salir
+                self._worker.join(put_timeout)
+        else:
+            self._worker.join(timeout)
+        self._worker = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.close()
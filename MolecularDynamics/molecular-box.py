@@ -0,0 +1,92 @@
+import os
+import sys
+import time
+
+import numpy as np
+
+from md import BAOAB, NoiseStream, Observables, Topology, TrajectoryWriter, read_parameters
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+# ==============================================
+# PARÁMETROS (kcal/mol, Å, uma; unidad de tiempo ≈ 48.9 fs)
+# ==============================================
+molecule_file = os.path.join(HERE, 'data', 'h2o.xyz')
+parameter_file = os.path.join(HERE, 'data', 'parameters.dat')
+n_molecules = 216
+# Separación de la red por molécula [Å]: ~3.1 da la densidad del agua líquida
+spacing = {'h2o.xyz': 3.1, 'ch4.xyz': 4.2, 'co2.xyz': 5.0}
+cutoff = 9.0
+# Caja periódica (imagen mínima) con Coulomb por PME en lugar del corte;
+# cutoff + skin debe ser menor que L/2 (≈ 9.3 Å para 216 aguas)
+pme = False
+pme_cutoff = 8.0
+kT = 0.596        # 300 K
+friction = 5.0    # termostato de Langevin (BAOAB)
+dt = 0.01         # ≈ 0.5 fs
+steps = 500
+sample_every = 10
+
+# Uso: python molecular-box.py [--pme] [molécula.xyz [n_moléculas [pasos [prefijo de salida]]]]
+args = sys.argv[1:] if __name__ == "__main__" else []
+if '--pme' in args:
+    pme = True
+    args.remove('--pme')
+if len(args) > 0:
+    molecule_file = args[0]
+if len(args) > 1:
+    n_molecules = int(args[1])
+if len(args) > 2:
+    steps = int(args[2])
+output = args[3] if len(args) > 3 else None
+
+
+def build_topology(path=molecule_file, n=n_molecules, seed=0):
+    """Caja de ``n`` copias con orientación al azar de la molécula del XYZ."""
+    template = Topology.from_xyz(path, read_parameters(parameter_file))
+    return template.replicate(n, spacing.get(os.path.basename(path), 4.0),
+                              random_orientation=True, seed=seed)
+
+
+def force_terms(topology, periodic=pme):
+    """Enlaces, ángulos y no enlazantes (con ``periodic``, caja periódica y PME)."""
+    if periodic:
+        return topology.terms(cutoff=pme_cutoff, periodic=True, electrostatics='pme')
+    return topology.terms(cutoff=cutoff)
+
+
+def make_system(path=molecule_file, n=n_molecules, seed=0, periodic=pme):
+    """Estado inicial e integrador (usado también por benchmark-suite.py)."""
+    topology = build_topology(path, n, seed)
+    state = topology.state(kT=kT, seed=seed)
+    integrator = BAOAB(force_terms(topology, periodic), dt, friction=friction, kT=kT,
+                       rng=NoiseStream(seed))
+    return state, integrator
+
+
+if __name__ == "__main__":
+    topology = build_topology()
+    print(f"{topology.n_molecules} moléculas de {os.path.basename(molecule_file)}: "
+          f"{topology.n_atoms} átomos, {len(topology.bonds)} enlaces, "
+          f"{len(topology.angles)} ángulos, caja de {topology.box[0]:.1f} Å"
+          f"{' periódica con PME' if pme else ''}")
+    state = topology.state(kT=kT, seed=0)
+    integrator = BAOAB(force_terms(topology), dt, friction=friction, kT=kT, rng=NoiseStream(0))
+    bonds = integrator.force_field.terms[0]
+    observables = Observables(bonds, every=sample_every)
+    callbacks = [observables]
+    if output is not None:
+        writer = TrajectoryWriter(f'{output}.mdtraj', state.positions.shape, dt=dt * sample_every)
+        callbacks.append(lambda s: writer.append(s.positions))
+
+    t0 = time.perf_counter()
+    integrator.run(state, steps, callbacks=callbacks, stride=sample_every)
+    elapsed = time.perf_counter() - t0
+    if output is not None:
+        writer.close()
+
+    ns_per_day = steps * dt * 48.888e-6 / (elapsed / 86400)
+    print(f"{steps} pasos en {elapsed:.1f} s: {1e6 * elapsed / steps:.0f} µs/paso, "
+          f"{ns_per_day:.3f} ns/día")
+    print(f"T media = {observables.mean('temperature'):.1f} K (objetivo {kT / 0.0019872041:.0f} K), "
+          f"<r_enlace> = {np.mean(observables.mean('lengths')):.4f} Å")
@@ -0,0 +1,84 @@
+import ast
+import os
+import sys
+import time
+
+import numpy as np
+
+from md.sweep import ResultCache, parameter_grid, run_sweep
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+# ==============================================
+# BARRIDO DE PARÁMETROS CON CACHÉ
+# ==============================================
+# Modelos: cualquier constante de primer nivel del script (k, r_eq, dt,
+# gamma, damping, kT, steps...) o argumento de make_system (seed) es un eje
+MODELS = {
+    'CO': 'verlet-CO.py',
+    'CO2': 'leapfrog-CO2.py',
+    'H2O': 'verlet-H20.py',
+    'H2O-browniano': 'browniam-dynamics-H20.py',
+    'CH4': 'verlet-CH4.py',
+    'CH4-v2': 'verlet-CH4.v2.py',
+    'binario': os.path.join('..', 'vpython', 'binary-system.py'),
+}
+model = 'H2O'
+grid = {'k': [50.0, 100.0, 200.0, 400.0], 'gamma': [0.5, 1.0, 2.0]}
+sample_every = 10
+save_trajectory = False
+n_workers = None           # None: un proceso por CPU
+cache_dir = os.path.join(HERE, 'sweep-cache')
+max_cache_mib = 512        # expulsión LRU por encima de este tamaño
+
+# Uso: python parameter-sweep.py [--trajectory] [--clear] [modelo [nombre=v1,v2,... ...]]
+# p. ej. python parameter-sweep.py CO k=250,500,750 dt=0.001,0.002 steps=2000
+args = sys.argv[1:] if __name__ == "__main__" else []
+save_trajectory = save_trajectory or '--trajectory' in args
+clear = '--clear' in args
+args = [a for a in args if a not in ('--trajectory', '--clear')]
+if args and '=' not in args[0]:
+    model = args.pop(0)
+if args:
+    grid = {}
+    for arg in args:
+        name, values = arg.split('=', 1)
+        grid[name] = [ast.literal_eval(v) for v in values.split(',')]
+
+
+def summary(result):
+    """Energía inicial y final, deriva máxima y longitud media de enlace."""
+    energy = result['energy']
+    row = [energy[0], energy[-1], np.max(np.abs(energy - energy[0]))]
+    row.append(result['lengths'].mean() if 'lengths' in result.observables else np.nan)
+    return row
+
+
+if __name__ == "__main__":
+    script = os.path.join(HERE, MODELS.get(model, model))
+    cache = ResultCache(cache_dir, max_bytes=max_cache_mib * 2**20)
+    if clear:
+        cache.clear()
+    points = parameter_grid(**grid)
+    print(f"{os.path.basename(script)}: {len(points)} puntos, caché en {cache.root}")
+
+    t0 = time.perf_counter()
+    results = run_sweep(script, points, cache, n_workers=n_workers, sample_every=sample_every,
+                        trajectory=save_trajectory,
+                        progress=lambda done, total: print(f"  {done}/{total} calculados",
+                                                           end='\r', flush=True))
+    elapsed = time.perf_counter() - t0
+    print(' ' * 40, end='\r')
+
+    names = list(grid)
+    print(" ".join(f"{n:>10}" for n in names) + f" {'origen':>10} {'E inicial':>12} "
+          f"{'E final':>12} {'máx |ΔE|':>10} {'<r>':>8}")
+    for result in results:
+        e0, e1, drift, r = summary(result)
+        print(" ".join(f"{result.params[n]!s:>10}" for n in names)
+              + f" {'caché' if result.cached else 'calculado':>10} {e0:>12.5g} {e1:>12.5g} "
+              f"{drift:>10.3g} {r:>8.4f}")
+    n_cached = sum(r.cached for r in results)
+    print(f"\n{len(results) - n_cached} calculados y {n_cached} leídos de la caché en "
+          f"{elapsed:.1f} s; caché de {cache.size() / 2**20:.1f} MiB "
+          f"({len(cache.entries())} entradas)")
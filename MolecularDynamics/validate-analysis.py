@@ -0,0 +1,122 @@
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+
+from md import TrajectoryWriter, open_trajectory
+from md.analysis import (mean_squared_displacement, spectrum_peaks, trajectory_geometry,
+                         velocity_autocorrelation)
+from md.benchmark import load_script
+from md.observables import bond_angles, star_angles
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+# ==============================================
+# VALIDACIÓN DEL ANÁLISIS DE TRAYECTORIAS
+# ==============================================
+n_frames = 2048     # cuadros del archivo grande
+n_atoms = 1024      # átomos del archivo grande (≈ 50 MB)
+chunk = 64          # átomos o cuadros por bloque
+
+# Uso: python validate-analysis.py [cuadros [átomos]]
+if len(sys.argv) > 1:
+    n_frames = int(sys.argv[1])
+if len(sys.argv) > 2:
+    n_atoms = int(sys.argv[2])
+
+ch4 = load_script(os.path.join(HERE, 'verlet-CH4.py'))
+co2 = load_script(os.path.join(HERE, 'leapfrog-CO2.py'))
+
+
+def check(name, ok, detail):
+    print(f"[{'PASA' if ok else 'FALLA'}] {name}: {detail}")
+    return ok
+
+
+def direct_correlation(a, b):
+    """<a(t)·b(t+m)> con el doble bucle O(T²) (referencia)."""
+    t = len(a)
+    return np.array([np.mean(np.sum(a[:t - m] * b[m:], axis=-1)) for m in range(t)])
+
+
+if __name__ == "__main__":
+    results = []
+    tmp = tempfile.mkdtemp(prefix='md-analysis-')
+    rng = np.random.default_rng(0)
+
+    # 1) Geometría por cuadro = bucle sobre cuadros con bonds.lengths / bond_angles
+    state, integrator = ch4.make_system()
+    frames = np.empty((500, 5, 3))
+    for t in range(len(frames)):
+        integrator.run(state, 5)
+        frames[t] = state.positions
+    triplets = star_angles(0, range(1, 5))
+    geometry = trajectory_geometry(frames, ch4.bonds, triplets, chunk_frames=chunk)
+    loop_r = np.array([ch4.bonds.lengths(f) for f in frames])
+    loop_theta = np.array([bond_angles(f, *triplets) for f in frames])
+    err = max(np.max(np.abs(geometry['lengths'] - loop_r)),
+              np.max(np.abs(geometry['angles'] - loop_theta)))
+    results.append(check("longitudes y ángulos de CH4", err < 1e-10,
+                         f"{len(frames)} cuadros, máx |Δ| = {err:.1e} frente al bucle por cuadro"))
+
+    # 2) MSD y VACF con FFT = doble bucle O(T²)
+    walk = np.cumsum(rng.normal(size=(400, 20, 3)), axis=0)
+    direct = np.mean([direct_correlation(walk[:, a], walk[:, a]) for a in range(20)], axis=0)
+    msd_direct = np.array([np.mean(np.sum((walk[m:] - walk[:len(walk) - m]) ** 2, axis=2))
+                           for m in range(len(walk))])
+    err_msd = np.max(np.abs(mean_squared_displacement(walk, chunk_atoms=7) - msd_direct))
+    err_acf = np.max(np.abs(velocity_autocorrelation(walk, normalize=False, chunk_atoms=7) - direct))
+    results.append(check("MSD y VACF con FFT", err_msd < 1e-8 and err_acf < 1e-8,
+                         f"máx |Δ| = {err_msd:.1e} (MSD), {err_acf:.1e} (VACF)"))
+
+    # 3) Caminata aleatoria: MSD(m) = dim σ² m
+    sigma = 0.1
+    walk = np.cumsum(rng.normal(0, sigma, size=(2000, 500, 3)), axis=0)
+    lag = np.arange(1, 200)
+    slope = np.polyfit(lag, mean_squared_displacement(walk)[lag], 1)[0]
+    results.append(check("difusión de una caminata aleatoria", abs(slope / (3 * sigma**2) - 1) < 0.05,
+                         f"pendiente {slope:.4f} (esperada {3 * sigma**2:.4f})"))
+
+    # 4) Espectro de CO2: picos en los estiramientos simétrico y antisimétrico
+    dt = 0.01
+    nu, power = co2.stretch_spectrum(steps=2**14, dt=dt)
+    peaks = spectrum_peaks(nu, power, n_peaks=2, min_separation=50.0)
+    expected = co2.stretch_modes()
+    resolution = nu[1]
+    results.append(check("espectro de CO2", np.all(np.abs(peaks - expected) < resolution),
+                         f"picos {peaks.round(1)} cm⁻¹, analíticos {expected.round(1)} "
+                         f"(resolución {resolution:.1f} cm⁻¹)"))
+
+    # 5) Archivo .mdtraj grande recorrido por bloques: mismos resultados y memoria acotada
+    path = os.path.join(tmp, 'grande.mdtraj')
+    with TrajectoryWriter(path, (n_atoms, 3), dt=dt) as writer:
+        position = np.zeros((n_atoms, 3))
+        for _ in range(n_frames):
+            position += rng.normal(0, sigma, size=position.shape)
+            writer.append(position)
+    traj = open_trajectory(path)
+    size_mib = os.path.getsize(path) / 2**20
+    tracemalloc.start()
+    t0 = time.perf_counter()
+    msd = mean_squared_displacement(traj, chunk_atoms=chunk)
+    vacf = velocity_autocorrelation(traj, chunk_atoms=chunk)
+    lengths = trajectory_geometry(traj, (np.arange(n_atoms - 1), np.arange(1, n_atoms)),
+                                  chunk_frames=chunk)['lengths']
+    elapsed = time.perf_counter() - t0
+    peak_mib = tracemalloc.get_traced_memory()[1] / 2**20
+    tracemalloc.stop()
+    sub = traj.frames[:256, :2 * chunk]
+    same = (np.allclose(mean_squared_displacement(open_trajectory(path).frames[:, :2 * chunk]),
+                        mean_squared_displacement(traj, atoms=np.arange(2 * chunk), chunk_atoms=chunk))
+            and np.allclose(lengths[:256, :2 * chunk - 1],
+                            np.linalg.norm(np.diff(sub, axis=1), axis=2)))
+    results.append(check("trayectoria en disco por bloques",
+                         same and peak_mib < 0.5 * size_mib + len(lengths.ravel()) * 8 / 2**20,
+                         f"{size_mib:.0f} MiB, pico de memoria {peak_mib:.1f} MiB "
+                         f"(incluye {lengths.nbytes / 2**20:.0f} MiB de longitudes), "
+                         f"{elapsed:.2f} s para MSD + VACF + longitudes"))
+
+    sys.exit(0 if all(results) else 1)
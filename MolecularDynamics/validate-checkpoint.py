@@ -0,0 +1,131 @@
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+from md import BAOAB, RESPA, CheckpointWriter, TrajectoryWriter
+from md.benchmark import load_script
+from md.checkpoint import load_checkpoint, restore, snapshot, write_checkpoint
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+# ==============================================
+# VALIDACIÓN DE CHECKPOINT/REINICIO
+# ==============================================
+kT = 0.596          # 300 K [kcal/mol]
+n_side = 3          # caja de 27 moléculas de CH4 (enlaces + LJ + Coulomb)
+steps = 600         # pasos de la corrida de referencia
+cut = 250           # la corrida interrumpida muere en este paso...
+every = 100         # ...y se reanuda desde el último checkpoint (paso 200)
+collision_every = 50
+
+# Uso: python validate-checkpoint.py [pasos]
+if len(sys.argv) > 1:
+    steps = int(sys.argv[1])
+    cut = steps // 2 - steps // 12
+
+
+def check(name, ok, detail):
+    print(f"[{'PASA' if ok else 'FALLA'}] {name}: {detail}")
+    return ok
+
+
+def methane_box():
+    """Términos de fuerza y estado inicial de la caja de metano de benchmark-suite.py."""
+    state, integrator = load_script(os.path.join(HERE, 'benchmark-suite.py')).methane_box(n_side)
+    return state, integrator.force_field.terms
+
+
+def make_run(kind, seed):
+    """(estado, integrador, generadores extra, callbacks) de un caso de prueba."""
+    state, (bonds, nonbonded) = methane_box()
+    if kind == 'respa':
+        return state, RESPA(bonds, nonbonded, 0.02, 4), {}, []
+    integrator = BAOAB([bonds, nonbonded], 0.01, friction=1.0, kT=kT,
+                       rng=np.random.default_rng(seed))
+    # Segundo flujo aleatorio: colisiones tipo Andersen sobre un átomo al azar
+    collisions = np.random.default_rng(seed + 1)
+
+    def collide(s):
+        if s.step % collision_every == 0:
+            k = collisions.integers(s.n_atoms)
+            s.velocities[k] = collisions.normal(size=3) * np.sqrt(kT / s.masses[k])
+    return state, integrator, {'colisiones': collisions}, [collide]
+
+
+def run_with_checkpoints(kind, directory, name, n_steps, resume=False, seed=0):
+    """Corre hasta ``n_steps`` escribiendo trayectoria y checkpoints; opcionalmente reanuda."""
+    # Con otra semilla: si el reinicio no restaurara los generadores, se notaría
+    state, integrator, rngs, callbacks = make_run(kind, seed + (100 if resume else 0))
+    path = os.path.join(directory, f'{name}.mdtraj')
+    checkpoint = os.path.join(directory, f'{name}.ckpt.npz')
+    if resume:
+        meta = restore(checkpoint, state, integrator, rngs)
+        writer = TrajectoryWriter.resume(path, meta['writers']['trayectoria'])
+    else:
+        writer = TrajectoryWriter(path, state.positions.shape)
+        writer.append(state.positions)
+    with writer, CheckpointWriter(checkpoint, every, integrator, rngs,
+                                  {'trayectoria': writer}) as checkpoints:
+        integrator.run(state, n_steps - state.step,
+                       callbacks=callbacks + [lambda s: writer.append(s.positions), checkpoints])
+    return state, integrator, path
+
+
+def same_bytes(a, b):
+    with open(a, 'rb') as fa, open(b, 'rb') as fb:
+        return fa.read() == fb.read()
+
+
+if __name__ == "__main__":
+    results = []
+    directory = tempfile.mkdtemp(prefix='md-checkpoint-')
+    print(f"{5 * n_side**3} átomos, {steps} pasos, checkpoint cada {every}, corte en el paso {cut}\n")
+
+    # 1) BAOAB con ruido y colisiones, RESPA con lista de vecinos: reinicio bit a bit
+    for kind in ('baoab', 'respa'):
+        ref, ref_integrator, ref_path = run_with_checkpoints(kind, directory, f'{kind}-ref', steps)
+        run_with_checkpoints(kind, directory, kind, cut)
+        state, integrator, path = run_with_checkpoints(kind, directory, kind, steps, resume=True)
+        exact = (np.array_equal(state.positions, ref.positions)
+                 and np.array_equal(state.velocities, ref.velocities) and state.pe == ref.pe)
+        results.append(check(f"reinicio exacto ({kind})", exact,
+                             f"máx |Δx| = {np.max(np.abs(state.positions - ref.positions)):.1e}"))
+        results.append(check(f"trayectoria idéntica ({kind})", same_bytes(path, ref_path),
+                             f"{os.path.getsize(path)} bytes"))
+        results.append(check(f"contadores ({kind})",
+                             integrator.n_force_calls == ref_integrator.n_force_calls,
+                             f"{integrator.n_force_calls} evaluaciones de fuerza"))
+
+    # 2) Escritura atómica: un temporal a medio escribir no daña el último checkpoint
+    checkpoint = os.path.join(directory, 'baoab.ckpt.npz')
+    leftovers = [f for f in os.listdir(directory) if f.endswith('.tmp')]
+    with open(f'{checkpoint}.tmp', 'wb') as f:
+        f.write(b'PK\x03\x04 corte a mitad de escritura')
+    _, meta = load_checkpoint(checkpoint)
+    results.append(check("escritura atómica", not leftovers and meta['state']['step'] == steps,
+                         f"sin temporales; último checkpoint legible (paso {meta['state']['step']})"))
+
+    # 3) Costo en el hilo principal: instantánea frente a escritura síncrona
+    state, integrator, rngs, _ = make_run('baoab', 0)
+    integrator.run(state, 10)
+    t0 = time.perf_counter()
+    integrator.run(state, 200)
+    step_time = (time.perf_counter() - t0) / 200
+    t0 = time.perf_counter()
+    for _ in range(20):
+        snap = snapshot(state, integrator, rngs)
+    snap_time = (time.perf_counter() - t0) / 20
+    t0 = time.perf_counter()
+    for _ in range(20):
+        write_checkpoint(checkpoint, *snap)
+    write_time = (time.perf_counter() - t0) / 20
+    print(f"\npaso: {1e6 * step_time:.0f} µs; instantánea (hilo principal): {1e6 * snap_time:.0f} µs; "
+          f"escritura con fsync (hilo de fondo): {1e6 * write_time:.0f} µs")
+    results.append(check("checkpoint barato", snap_time < write_time and snap_time < 5 * step_time,
+                         f"cada {every} pasos cuesta {100 * snap_time / (every * step_time):.2f} % "
+                         f"del tiempo de integración"))
+
+    sys.exit(0 if all(results) else 1)
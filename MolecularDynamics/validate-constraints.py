@@ -0,0 +1,145 @@
+import sys
+
+import numpy as np
+
+from md import (BAOAB, BondConstraints, Brownian, HarmonicBonds, NonBondedForce, State,
+                VelocityVerlet)
+
+# ==============================================
+# VALIDACIÓN DE SHAKE/RATTLE (CAJA DE METANO, kcal/mol, Å, uma)
+# ==============================================
+m_C = 12.011
+m_H = 1.008
+k_bond = 450.0     # C-H [kcal/mol/Å²]
+r_eq = 1.09
+k_hh = 35.0        # resortes H-H (Urey-Bradley) que mantienen el tetraedro
+r_hh = r_eq * np.sqrt(8 / 3)
+eps = {'C': 0.066, 'H': 0.030}
+sig = {'C': 3.50, 'H': 2.50}
+charge = {'C': -0.24, 'H': 0.06}
+n_side = 3
+spacing = 4.2
+cutoff = 9.0
+kT = 0.596         # 300 K
+t_total = 2.0      # [unidades de 48.9 fs]
+dt_flexible = 0.005
+dt_factors = [2, 3, 4]
+tol = 1e-10
+
+# Uso: python validate-constraints.py [t_total]
+if len(sys.argv) > 1:
+    t_total = float(sys.argv[1])
+
+
+def methane_box(seed=0):
+    """Caja de CH4: (posiciones, velocidades, masas, enlaces C-H, resortes H-H, no enlazantes)."""
+    rng = np.random.default_rng(seed)
+    tetra = np.array([[1, 1, 1], [-1, -1, 1], [-1, 1, -1], [1, -1, -1]]) / np.sqrt(3) * r_eq
+    centers = np.indices((n_side,) * 3).reshape(3, -1).T * spacing
+    n_mol = len(centers)
+    pos = np.concatenate([np.vstack([c, c + tetra]) for c in centers])
+    kinds = ['C', 'H', 'H', 'H', 'H'] * n_mol
+    masses = np.array([m_C if k == 'C' else m_H for k in kinds])
+    vel = rng.normal(size=pos.shape) * np.sqrt(kT / masses)[:, None]
+    vel -= masses @ vel / masses.sum()
+
+    first = 5 * np.arange(n_mol)
+    ch = HarmonicBonds(np.repeat(first, 4), (first[:, None] + np.arange(1, 5)).ravel(),
+                       k_bond, r_eq)
+    hh_pairs = np.array([(a, b) for a in range(1, 5) for b in range(a + 1, 5)])
+    hh = (first[:, None, None] + hh_pairs[None]).reshape(-1, 2)
+    hh = HarmonicBonds(hh[:, 0], hh[:, 1], k_hh, r_hh)
+    pairs = np.array([(a, b) for a in range(5) for b in range(a + 1, 5)])
+    exclusions = (first[:, None, None] + pairs[None]).reshape(-1, 2)
+    nonbonded = NonBondedForce([eps[k] for k in kinds], [sig[k] for k in kinds],
+                               charges=[charge[k] for k in kinds], cutoff=cutoff,
+                               skin=1.0, exclusions=exclusions)
+    return pos, vel, masses, ch, hh, nonbonded
+
+
+def run_nve(dt, rigid, method='shake', n_steps=None):
+    """NVE; devuelve (error de energía, estado, restricciones o None)."""
+    pos, vel, masses, ch, hh, nonbonded = methane_box()
+    state = State(pos, vel, masses)
+    if rigid:
+        constraints = BondConstraints.from_bonds(ch, method=method, tol=tol)
+        constraints.project_velocities(state)
+        integrator = VelocityVerlet([hh, nonbonded], dt, constraints=constraints)
+    else:
+        constraints = None
+        integrator = VelocityVerlet([ch, hh, nonbonded], dt)
+    integrator.evaluate(state)
+    e0 = state.total_energy()
+    n_steps = int(round(t_total / dt)) if n_steps is None else n_steps
+    deviation = np.empty(n_steps)
+
+    def track(s):
+        deviation[s.step - 1] = s.total_energy() - e0
+
+    integrator.run(state, n_steps, callbacks=[track])
+    # Error: desviación máxima de la energía total relativa a la energía cinética media
+    return np.max(np.abs(deviation)) / (1.5 * len(masses) * kT), state, constraints
+
+
+def check(name, ok, detail):
+    print(f"[{'PASA' if ok else 'FALLA'}] {name}: {detail}")
+    return ok
+
+
+if __name__ == "__main__":
+    results = []
+    print(f"{n_side**3} moléculas de CH4, t = {t_total} ({t_total * 48.9:.0f} fs)\n")
+
+    # 1) Satisfacción de las restricciones (posiciones y velocidades), ambos métodos
+    for method in ('shake', 'matrix'):
+        _, state, constraints = run_nve(dt_flexible * 3, True, method)
+        dev = constraints.deviation(state.positions)
+        vdev = constraints.velocity_deviation(state.positions, state.velocities)
+        results.append(check(f"longitudes ({method})", dev < 10 * tol,
+                             f"máx |r - L|/L = {dev:.1e} (tolerancia {tol:.0e}), "
+                             f"{constraints.n_iterations} iteraciones en el último paso"))
+        results.append(check(f"velocidades RATTLE ({method})", vdev < 1e-8,
+                             f"máx |v_rel · r̂| = {vdev:.1e} Å/u.t."))
+
+    # 2) Ambos métodos resuelven el mismo problema (trayectoria corta, antes del caos)
+    _, shake_state, _ = run_nve(dt_flexible * 3, True, 'shake', n_steps=50)
+    _, matrix_state, matrix = run_nve(dt_flexible * 3, True, 'matrix', n_steps=50)
+    diff = np.max(np.abs(shake_state.positions - matrix_state.positions))
+    results.append(check("SHAKE = SHAKE matricial", diff < 1e-6, f"máx |Δx| = {diff:.1e} Å"))
+    # Los bloques por molécula se arman una sola vez, no en cada deriva o proyección
+    results.append(check("bloques de SHAKE matricial", matrix.n_block_builds == 1,
+                         f"{matrix.n_block_builds} construcciones en 50 pasos"))
+
+    # 3) Conservación de la energía: con C-H rígidos el paso puede crecer 2-4 veces
+    err_flexible, _, _ = run_nve(dt_flexible, False)
+    print(f"\n{'dt':>8} {'enlaces C-H':>12} {'error de energía':>17}")
+    print(f"{dt_flexible:>8.4f} {'flexibles':>12} {err_flexible:>17.2e}")
+    best = 1
+    for factor in dt_factors:
+        dt = dt_flexible * factor
+        err, _, _ = run_nve(dt, True)
+        print(f"{dt:>8.4f} {'rígidos':>12} {err:>17.2e}")
+        if err <= err_flexible:
+            best = factor
+    err_unconstrained, _, _ = run_nve(dt_flexible * dt_factors[-1], False)
+    print(f"{dt_flexible * dt_factors[-1]:>8.4f} {'flexibles':>12} {err_unconstrained:>17.2e}\n")
+    results.append(check("paso mayor con enlaces rígidos", best >= 2,
+                         f"dt x{best} con error <= {err_flexible:.2e} (flexibles, dt = {dt_flexible})"))
+
+    # 4) BAOAB y Browniano con H2O rígida (como verlet-H20.py y browniam-dynamics-H20.py)
+    h2o = HarmonicBonds.star(0, [1, 2], 100.0, 0.96)
+    constraints = BondConstraints.from_bonds(h2o, tol=tol)
+    start = [[0.0, 0.0], [0.96, 0.0], [-0.5, 0.8]]
+    state = State(start, masses=[16.0, 1.0, 1.0])
+    BAOAB([], 0.01, friction=1.0, kT=kT, rng=np.random.default_rng(1),
+          constraints=constraints).run(state, 2000)
+    dev = constraints.deviation(state.positions)
+    results.append(check("BAOAB con enlaces rígidos", dev < 10 * tol, f"máx |r - L|/L = {dev:.1e}"))
+    state = State(start)
+    Brownian([], 1e-3, gamma=1.0, kT=0.05, rng=np.random.default_rng(2),
+             constraints=constraints).run(state, 2000)
+    dev = constraints.deviation(state.positions)
+    results.append(check("Browniano con enlaces rígidos", dev < 10 * tol,
+                         f"máx |r - L|/L = {dev:.1e}"))
+
+    sys.exit(0 if all(results) else 1)
@@ -0,0 +1,153 @@
+import sys
+
+import numpy as np
+
+from md import (BAOAB, HAVE_NUMBA, RESPA, Brownian, FusedVerlet, HarmonicBonds, Leapfrog,
+                NoiseStream, State, VelocityVerlet)
+
+# ==============================================
+# VALIDACIÓN DE LOS INTEGRADORES (CH4 DE verlet-CH4.v2.py)
+# ==============================================
+m_C = 12.011
+m_H = 1.008
+k_bond = 450.0
+r_eq = 1.09
+dt = 0.001
+steps = 20000
+drift_tol = 1e-4  # deriva relativa máxima de la energía total (NVE)
+
+masses = np.array([m_C] + [m_H]*4)
+bonds = HarmonicBonds.star(0, range(1, 5), k_bond, r_eq, r_min=0.01)
+
+
+def init_state(seed=0):
+    rng = np.random.default_rng(seed)
+    positions = np.zeros((5, 3))
+    positions[1:] = np.array([[1, 1, 1], [-1, -1, 1], [-1, 1, -1], [1, -1, -1]]) / np.sqrt(3) * r_eq
+    positions[1:] += rng.normal(0, 0.1, (4, 3))
+    return State(positions, masses=masses)
+
+
+def check(name, ok, detail):
+    print(f"[{'PASA' if ok else 'FALLA'}] {name}: {detail}")
+    return ok
+
+
+if __name__ == "__main__":
+    results = []
+
+    # 1) NVE: conservación de energía y una evaluación de fuerzas por paso
+    state = init_state()
+    integrator = VelocityVerlet(bonds, dt)
+    integrator.evaluate(state)
+    e0 = state.total_energy()
+    energies = np.empty(steps)
+    for step in range(steps):
+        integrator.step(state)
+        energies[step] = state.total_energy()
+    drift = abs(energies[-1000:].mean() - e0) / abs(e0)
+    results.append(check("deriva de energía NVE", drift < drift_tol,
+                         f"{drift:.2e} (tolerancia {drift_tol:.0e})"))
+    results.append(check("evaluaciones de fuerza", integrator.n_force_calls == steps + 1,
+                         f"{integrator.n_force_calls} para {steps} pasos "
+                         f"(el esquema anterior usaba {2 * steps})"))
+
+    # 2) BAOAB con kT = 0: el amortiguamiento solo puede disipar energía
+    state = init_state()
+    integrator = BAOAB(bonds, dt, friction=0.3)
+    energies = np.empty(steps)
+
+    def store_energy(s):
+        energies[s.step - 1] = s.total_energy()
+
+    integrator.run(state, steps, callbacks=[store_energy])
+    increases = np.count_nonzero(np.diff(energies) > 1e-12 * abs(energies[0]))
+    results.append(check("BAOAB amortiguado disipa", energies[-1] < 1e-2 * energies[0]
+                         and increases == 0,
+                         f"E: {energies[0]:.3f} -> {energies[-1]:.2e} kcal/mol, "
+                         f"{increases} pasos con aumento"))
+
+    # 3) BAOAB con kT > 0: equipartición <KE> = (3N/2) kT
+    kT = 0.6
+    state = init_state()
+    integrator = BAOAB(bonds, dt, friction=5.0, kT=kT, rng=np.random.default_rng(1))
+    ke = np.empty(5 * steps)
+    for step in range(len(ke)):
+        integrator.step(state)
+        ke[step] = state.kinetic_energy()
+    expected = 1.5 * len(masses) * kT
+    measured = ke[steps:].mean()
+    results.append(check("equipartición BAOAB", abs(measured / expected - 1) < 0.05,
+                         f"<KE> = {measured:.3f}, esperado {expected:.3f} kcal/mol"))
+
+    # 4) Leapfrog (CO2 1D de leapfrog-CO2.py): energía con velocidades sincronizadas
+    co2_bonds = HarmonicBonds([0, 1], [1, 2], 500.0, 1.16)
+    state = State([-1.16, 0.0, 1.36], masses=[16.0, 12.0, 16.0])
+    integrator = Leapfrog(co2_bonds, dt)
+    integrator.evaluate(state)
+    e0 = state.total_energy()
+    integrator.run(state, steps)
+    v_sync = integrator.synchronized_velocities(state)
+    e1 = state.pe + 0.5 * np.sum(state.masses * v_sync**2)
+    drift = abs(e1 - e0) / e0
+    results.append(check("deriva de energía leapfrog", drift < drift_tol,
+                         f"{drift:.2e} (tolerancia {drift_tol:.0e})"))
+
+    # 5) Browniano (H2O 2D, ruido Philox por bloques): varianza de la distancia O-H ≈ kT/k
+    h2o_bonds = HarmonicBonds.star(0, [1, 2], 100.0, 0.96)
+    state = State([[0.0, 0.0], [0.96, 0.0], [-0.5, 0.8]])
+    integrator = Brownian(h2o_bonds, 1e-3, gamma=1.0, kT=0.05, rng=NoiseStream(2))
+    lengths = np.empty((steps, 2))
+
+    def store_lengths(s):
+        lengths[s.step - 1] = h2o_bonds.lengths(s.positions)
+
+    integrator.run(state, steps, callbacks=[store_lengths])
+    ratio = lengths[steps // 5:].var() / (0.05 / 100.0)
+    results.append(check("fluctuaciones Brownianas", abs(ratio - 1) < 0.2,
+                         f"var(r)/(kT/k) = {ratio:.2f}"))
+
+    # 6) RESPA sin fuerzas lentas = velocity Verlet con el paso interno
+    respa_state, verlet_state = init_state(), init_state()
+    RESPA(bonds, [], 4 * dt, n_inner=4).run(respa_state, steps // 4)
+    VelocityVerlet(bonds, dt).run(verlet_state, steps)
+    diff = np.max(np.abs(respa_state.positions - verlet_state.positions))
+    results.append(check("RESPA reduce a velocity Verlet", diff < 1e-9,
+                         f"máx |Δx| = {diff:.1e} Å"))
+
+    # 7) NoiseStream: el ruido depende solo de (seed, réplica, paso)
+    sequential = NoiseStream(7, replica=3, block_steps=64)
+    noise = np.empty((1000, 3, 2))
+    for row in noise:
+        sequential.standard_normal(out=row)
+    jumped = NoiseStream(7, replica=3, block_steps=64)
+    jumped.seek(777)
+    batch = NoiseStream(7, replica=np.arange(5), block_steps=64)
+    rows = np.empty((778, 5, 3, 2))
+    for row in rows:
+        batch.standard_normal(out=row)
+    same = (np.array_equal(jumped.standard_normal(out=np.empty((3, 2))), noise[777])
+            and np.array_equal(rows[:, 3], noise[:778]))
+    other = NoiseStream(7, replica=4, block_steps=64)
+    corr = np.corrcoef(noise.ravel(), np.array([other.standard_normal(out=np.empty((3, 2)))
+                                                for _ in range(1000)]).ravel())[0, 1]
+    results.append(check("ruido reproducible por (seed, réplica, paso)", same and abs(corr) < 0.05,
+                         f"seek y lote idénticos; correlación entre réplicas {corr:+.3f}"))
+
+    # 8) FusedVerlet = VelocityVerlet con enlaces acotados (clamp=True, como
+    #    verlet-CH4.py); r_min cerca de r_eq para que la cota actúe
+    clamped = HarmonicBonds.star(0, range(1, 5), k_bond, r_eq, r_min=1.05, clamp=True)
+    reference = init_state()
+    below = []
+    VelocityVerlet(clamped, dt).run(
+        reference, 2000, callbacks=[lambda s: below.append(clamped.lengths(s.positions).min() < 1.05)])
+    diffs = []
+    for backend in ('numpy', 'numba') if HAVE_NUMBA else ('numpy',):
+        state = init_state()
+        FusedVerlet(clamped, dt, backend=backend).run(state, 2000)
+        diffs.append(np.max(np.abs(state.positions - reference.positions)))
+    results.append(check("FusedVerlet con clamp", max(diffs) < 1e-9 and sum(below) > 0,
+                         f"máx |Δx| = {max(diffs):.1e} Å ({', '.join(f'{d:.0e}' for d in diffs)}); "
+                         f"cota activa en {sum(below)} de 2000 pasos"))
+
+    sys.exit(0 if all(results) else 1)
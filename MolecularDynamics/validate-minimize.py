@@ -0,0 +1,105 @@
+import os
+import sys
+import time
+
+import numpy as np
+
+from md import EnsembleBonds, Topology, fire, lbfgs, read_parameters
+from md.benchmark import load_script
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+# ==============================================
+# VALIDACIÓN DE LA MINIMIZACIÓN (FIRE / L-BFGS)
+# ==============================================
+ftol = 1e-4            # [kcal/mol/Å]
+n_structures = 2000    # metanos minimizados en un solo lote
+n_cluster = 8          # moléculas del cúmulo de metano con LJ + Coulomb
+
+# Uso: python validate-minimize.py [estructuras en lote]
+if len(sys.argv) > 1:
+    n_structures = int(sys.argv[1])
+
+v2 = load_script(os.path.join(HERE, 'verlet-CH4.v2.py'))
+
+
+def check(name, ok, detail):
+    print(f"[{'PASA' if ok else 'FALLA'}] {name}: {detail}")
+    return ok
+
+
+def fmax(forces):
+    return float(np.linalg.norm(forces.reshape(len(forces), -1), axis=1).max())
+
+
+if __name__ == "__main__":
+    results = []
+    start = v2.init_positions(seed=0)
+
+    # 1) L-BFGS y FIRE sobre compute_forces de verlet-CH4.v2.py
+    runs = {m.__name__: m(v2.compute_forces, start, ftol=ftol) for m in (lbfgs, fire)}
+    for name, r in runs.items():
+        lengths = v2.bonds.lengths(r.positions)
+        results.append(check(f"CH4 con {r.method}",
+                             r.converged and np.max(np.abs(lengths - v2.r_eq)) < 1e-5,
+                             f"{r.n_evaluations} evaluaciones, máx |F| = {r.fmax:.1e}, "
+                             f"máx |r - r_eq| = {np.max(np.abs(lengths - v2.r_eq)):.1e} Å"))
+
+    # 2) Frente a la dinámica amortiguada del script (steps pasos de BAOAB)
+    state, integrator = v2.make_system()
+    t0 = time.perf_counter()
+    integrator.run(state, v2.steps)
+    t_dynamics = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    result = lbfgs(v2.compute_forces, start, ftol=ftol)
+    t_lbfgs = time.perf_counter() - t0
+    damped = fmax(state.forces)
+    results.append(check("L-BFGS vs dinámica amortiguada",
+                         result.n_evaluations < 50 and result.fmax < damped,
+                         f"máx |F| = {result.fmax:.1e} en {result.n_evaluations} evaluaciones "
+                         f"({1e3 * t_lbfgs:.1f} ms) vs {damped:.1e} en {integrator.n_force_calls} "
+                         f"({1e3 * t_dynamics:.0f} ms)"))
+
+    # 3) Criterio de energía: con ftol = 0 se detiene por el cambio relativo de energía
+    r = lbfgs(v2.compute_forces, start, ftol=0.0, etol=1e-10)
+    results.append(check("parada por energía", r.converged and r.energy < 1e-8,
+                         f"energía {r.energy:.1e} tras {r.n_evaluations} evaluaciones"))
+
+    # 4) Lote: miles de metanos deformados en una llamada por iteración
+    rng = np.random.default_rng(1)
+    batch = v2.ideal_positions() + rng.normal(0, 0.1, (n_structures, 5, 3))
+    k = rng.uniform(300.0, 600.0, n_structures)
+    ensemble = EnsembleBonds([0] * 4, range(1, 5), k, v2.r_eq, n_structures)
+    for method in (lbfgs, fire):
+        t0 = time.perf_counter()
+        r = method(ensemble, batch, ftol=ftol)
+        elapsed = time.perf_counter() - t0
+        lengths = np.linalg.norm(r.positions[:, 1:] - r.positions[:, :1], axis=2)
+        results.append(check(f"lote de {n_structures} ({r.method})",
+                             r.converged.all() and np.max(np.abs(lengths - v2.r_eq)) < 1e-5,
+                             f"{r.n_force_calls} llamadas, evaluaciones por estructura "
+                             f"{r.n_evaluations.mean():.1f} (máx {r.n_evaluations.max()}), "
+                             f"{1e6 * elapsed / n_structures:.0f} µs/estructura"))
+
+    # 5) Una estructura del lote = la misma minimización por separado
+    one = EnsembleBonds([0] * 4, range(1, 5), k[7], v2.r_eq, 1)
+    alone = lbfgs(one, batch[7:8], ftol=ftol)
+    together = lbfgs(ensemble, batch, ftol=ftol)
+    diff = np.max(np.abs(alone.positions[0] - together.positions[7]))
+    same = diff == 0.0 and alone.n_evaluations[0] == together.n_evaluations[7]
+    results.append(check("lote = estructura aislada", same,
+                         f"máx |Δx| = {diff:.1e}, {alone.n_evaluations[0]} evaluaciones sola y "
+                         f"{together.n_evaluations[7]} en el lote"))
+
+    # 6) Cúmulo de metanos con enlaces, ángulos, LJ y Coulomb (topología de data/)
+    top = Topology.from_xyz(os.path.join(HERE, 'data', 'ch4.xyz'),
+                            read_parameters(os.path.join(HERE, 'data', 'parameters.dat')))
+    cluster = top.replicate(n_cluster, 4.2, random_orientation=True, seed=1)
+    terms = cluster.terms(cutoff=20.0)
+    e0 = sum(t.compute(cluster.positions)[1] for t in terms)
+    r = lbfgs(terms, cluster.positions, ftol=1e-2, max_iter=3000)
+    results.append(check(f"cúmulo de {n_cluster} CH4", r.converged and r.energy < e0,
+                         f"energía {e0:.2f} → {r.energy:.2f} kcal/mol, máx |F| = {r.fmax:.1e} "
+                         f"en {r.n_evaluations} evaluaciones"))
+
+    sys.exit(0 if all(results) else 1)
@@ -0,0 +1,146 @@
+import os
+import sys
+
+import numpy as np
+
+from md import (COULOMB_K, NonBondedForce, Topology, VelocityVerlet, cell_list_pairs, ewald_sum,
+                read_parameters)
+from md.nonbonded import ewald_alpha
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+# ==============================================
+# VALIDACIÓN DE LA CAJA PERIÓDICA Y PME
+# ==============================================
+n_water = 64       # caja de agua periódica (4 × 4 × 4 moléculas, lado 12.4 Å)
+cutoff = 5.0       # < L/2 - skin
+dt = 0.005
+t_total = 1.0      # [unidades de 48.9 fs]
+
+# Uso: python validate-pme.py [moléculas de agua]
+if len(sys.argv) > 1:
+    n_water = int(sys.argv[1])
+
+water = Topology.from_xyz(os.path.join(HERE, 'data', 'h2o.xyz'),
+                          read_parameters(os.path.join(HERE, 'data', 'parameters.dat')))
+
+
+def check(name, ok, detail):
+    print(f"[{'PASA' if ok else 'FALLA'}] {name}: {detail}")
+    return ok
+
+
+def coulomb_pme(top, **kwargs):
+    """Solo Coulomb (ε = 0) por PME sobre la caja periódica de ``top``."""
+    return NonBondedForce(0.0, 1.0, top.charges, cutoff=cutoff, skin=0.5, box=top.box,
+                          exclusions=top.exclusions(), electrostatics='pme', **kwargs)
+
+
+def relative_errors(forces, energy, ref_forces, ref_energy):
+    return (abs(energy - ref_energy) / abs(ref_energy),
+            np.sqrt(np.mean((forces - ref_forces) ** 2) / np.mean(ref_forces ** 2)))
+
+
+if __name__ == "__main__":
+    results = []
+    rng = np.random.default_rng(0)
+
+    # 1) Constante de Madelung del NaCl con la suma de Ewald directa y con PME
+    r0, n_cells = 2.0, 3
+    fcc = np.array([[0, 0, 0], [0.5, 0.5, 0], [0.5, 0, 0.5], [0, 0.5, 0.5]])
+    cells = np.indices((n_cells,) * 3).reshape(3, -1).T
+    ions = np.concatenate([fcc, fcc + [0.5, 0, 0]])
+    pos = ((ions[None] + cells[:, None]) * 2 * r0).reshape(-1, 3)
+    q = np.tile(np.repeat([1.0, -1.0], 4), len(cells))
+    box = np.full(3, n_cells * 2 * r0)
+    alpha = ewald_alpha(5.5, 1e-8)
+    madelung = -ewald_sum(pos, q, box, alpha, 5.5, 12)[1] / (len(pos) / 2) * r0 / COULOMB_K
+    nb = NonBondedForce(0.0, 1.0, q, cutoff=5.5, skin=0.2, box=box, electrostatics='pme',
+                        ewald_tol=1e-8, pme_spacing=0.5, pme_order=6)
+    madelung_pme = -nb.compute(pos)[1] / (len(pos) / 2) * r0 / COULOMB_K
+    results.append(check("Madelung del NaCl", abs(madelung - 1.747565) < 1e-6
+                         and abs(madelung_pme - 1.747565) < 1e-6,
+                         f"Ewald {madelung:.7f}, PME {madelung_pme:.7f} (exacto 1.747565)"))
+
+    # 2) Caja de 64 aguas con exclusiones: PME converge a la suma de Ewald directa
+    box_top = water.replicate(64, 3.1, random_orientation=True, seed=1)
+    ref_f, ref_e = ewald_sum(box_top.positions, box_top.charges, box_top.box,
+                             ewald_alpha(cutoff, 1e-5), cutoff, 12, box_top.exclusions())
+    lines = []
+    errors = []
+    for spacing, order in ((None, 4), (0.4, 6), (0.25, 8)):
+        pme = coulomb_pme(box_top, pme_spacing=spacing, pme_order=order)
+        errors.append(relative_errors(*pme.compute(box_top.positions), ref_f, ref_e))
+        lines.append(f"malla {pme.pme.grid[0]}³ orden {order}: ΔE/E = {errors[-1][0]:.0e}, "
+                     f"ΔF/F = {errors[-1][1]:.0e}")
+    ok = errors[0][1] < 5e-3 and errors[-1][1] < 1e-6 and errors[1][1] < errors[0][1]
+    results.append(check("PME vs Ewald (64 aguas)", ok, "; ".join(lines)))
+
+    # 3) Carga neta y caja no cúbica: fondo neutralizante
+    box = np.array([11.0, 12.0, 13.0])
+    pos = rng.uniform(0, 1, (40, 3)) * box
+    q = rng.normal(size=40) + 0.1
+    ref_f, ref_e = ewald_sum(pos, q, box, ewald_alpha(cutoff, 1e-6), cutoff, 16)
+    nb = NonBondedForce(0.0, 1.0, q, cutoff=cutoff, skin=0.0, box=box, electrostatics='pme',
+                        ewald_tol=1e-6, pme_spacing=0.25, pme_order=8)
+    err_e, err_f = relative_errors(*nb.compute(pos), ref_f, ref_e)
+    results.append(check("carga neta, caja ortorrómbica", err_e < 1e-6 and err_f < 1e-6,
+                         f"Q = {q.sum():.2f} e, ΔE/E = {err_e:.0e}, ΔF/F = {err_f:.0e}"))
+
+    # 4) Fuerzas = -∇E (parte real + recíproca + exclusiones)
+    pme = coulomb_pme(box_top)
+    pos = box_top.positions.copy()
+    forces = pme.compute(pos)[0]
+    h = 1e-5
+    numerical = []
+    for atom in rng.choice(len(pos), 6, replace=False):
+        for d in range(3):
+            p = pos.copy()
+            p[atom, d] += h
+            up = pme.compute(p)[1]
+            p[atom, d] -= 2 * h
+            numerical.append((forces[atom, d], -(up - pme.compute(p)[1]) / (2 * h)))
+    numerical = np.array(numerical)
+    err = np.max(np.abs(numerical[:, 0] - numerical[:, 1])) / np.max(np.abs(numerical[:, 1]))
+    results.append(check("fuerzas de PME = -∇E", err < 1e-5, f"máx error relativo {err:.1e}"))
+
+    # 5) Lista de pares periódica = fuerza bruta con imagen mínima
+    box = np.array([20.0, 24.0, 22.0])
+    pos = rng.uniform(-1, 2, (800, 3)) * box       # posiciones fuera de la caja
+    i, j = cell_list_pairs(pos, 6.0, box)
+    a, b = np.triu_indices(len(pos), k=1)
+    d = pos[b] - pos[a]
+    d -= box * np.round(d / box)
+    brute = set(zip(a[np.einsum('bd,bd->b', d, d) < 36.0], b[np.einsum('bd,bd->b', d, d) < 36.0]))
+    found = set(zip(np.minimum(i, j), np.maximum(i, j)))
+    results.append(check("pares con imagen mínima", found == brute and len(i) == len(found),
+                         f"{len(found)} pares, iguales a la fuerza bruta"))
+
+    # 6) Invariancia ante traslaciones y envolvimiento de coordenadas
+    shifted = box_top.positions + rng.uniform(-30, 30, 3)
+    e0 = coulomb_pme(box_top).compute(box_top.positions)[1]
+    e1 = coulomb_pme(box_top).compute(shifted)[1]
+    per_molecule = abs(e1 - e0) / box_top.n_molecules
+    results.append(check("traslación de toda la caja", per_molecule < 0.01,
+                         f"E = {e0:.4f} vs {e1:.4f} kcal/mol ({per_molecule:.4f} por molécula, "
+                         f"del orden del error de la malla)"))
+
+    # 7) NVE de agua periódica con PME: el error de energía escala como dt²
+    top = water.replicate(n_water, 3.1, random_orientation=True, seed=2)
+    errors = []
+    for step in (dt, dt / 2):
+        state = top.state(kT=0.596, seed=3)
+        integrator = VelocityVerlet(top.terms(cutoff=cutoff, skin=1.0, periodic=True,
+                                              electrostatics='pme', ewald_tol=1e-6), step)
+        integrator.evaluate(state)
+        e_start = state.total_energy()
+        energies = []
+        integrator.run(state, int(round(t_total / step)),
+                       callbacks=[lambda s: energies.append(s.total_energy())])
+        errors.append(np.max(np.abs(np.array(energies) - e_start)) / state.kinetic_energy())
+    order = np.log2(errors[0] / errors[1])
+    results.append(check(f"NVE de {n_water} aguas con PME", 1.7 < order < 2.3,
+                         f"máx |ΔE|/KE = {errors[0]:.1e} (dt = {dt}), {errors[1]:.1e} (dt/2): "
+                         f"orden {order:.2f}"))
+
+    sys.exit(0 if all(results) else 1)
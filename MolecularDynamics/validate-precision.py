@@ -0,0 +1,165 @@
+import os
+import shutil
+import sys
+import tempfile
+
+import numpy as np
+
+from md import (ForceField, Topology, TrajectoryWriter, VelocityVerlet, open_trajectory,
+                read_parameters, select_precision)
+from md.benchmark import load_script
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+# ==============================================
+# VALIDACIÓN DE LA PRECISIÓN MIXTA (FLOAT32 + ACUMULACIÓN EN FLOAT64)
+# ==============================================
+steps = 50000
+n_samples = 100
+# Error de energía en precisión mixta permitido por encima del de float64:
+# máx |ΔE|/E0 (mixta) <= drift_factor * máx |ΔE|/E0 (double) + drift_floor
+drift_factor = 3.0
+drift_floor = 2e-4
+n_waters = 300     # caja de agua para energías, fuerzas y trayectorias
+
+# Uso: python validate-precision.py [pasos]
+if len(sys.argv) > 1:
+    steps = int(sys.argv[1])
+
+# Modelos de los scripts (CH4 sin fricción para que la energía se conserve)
+MODELS = [
+    ('CO', 'verlet-CO.py', {}),
+    ('CO2', 'leapfrog-CO2.py', {}),
+    ('CH4', 'verlet-CH4.py', {'friction': 0.0}),
+]
+
+
+def check(name, ok, detail):
+    print(f"[{'PASA' if ok else 'FALLA'}] {name}: {detail}")
+    return ok
+
+
+def nve_run(script, precision):
+    """ΔE/E0 y longitud media de enlace cada steps/n_samples pasos, y el estado final."""
+    state, integrator = script.make_system()
+    state = state.astype(precision)
+    integrator.evaluate(state)
+    e0 = state.total_energy()
+    energies, lengths = np.empty(n_samples), np.empty(n_samples)
+    for sample in range(n_samples):
+        integrator.advance(state, steps // n_samples)
+        energies[sample] = state.total_energy()
+        lengths[sample] = script.bonds.lengths(state.positions).mean()
+    return (energies - e0) / abs(e0), lengths.mean(), state
+
+
+def water_box():
+    water = Topology.from_xyz(os.path.join(HERE, 'data', 'h2o.xyz'),
+                              read_parameters(os.path.join(HERE, 'data', 'parameters.dat')))
+    return water.replicate(n_waters, 3.1, random_orientation=True, seed=0)
+
+
+if __name__ == "__main__":
+    results = []
+
+    # 1-3) Deriva de energía NVE de cada modelo: float32 frente a float64
+    for name, path, overrides in MODELS:
+        script = load_script(os.path.join(HERE, path), overrides=overrides)
+        runs = {precision: nve_run(script, precision) for precision in ('double', 'mixed')}
+        (de_d, r_d, state_d), (de_m, r_m, state_m) = runs['double'], runs['mixed']
+        t = np.arange(n_samples)
+        slope_d, slope_m = (np.polyfit(t, de, 1)[0] * n_samples for de in (de_d, de_m))
+        err_d, err_m = np.max(np.abs(de_d)), np.max(np.abs(de_m))
+        ok = (state_m.positions.dtype == np.float32 and state_d.positions.dtype == np.float64
+              and err_m <= drift_factor * err_d + drift_floor)
+        results.append(check(f"deriva NVE {name}", ok,
+                             f"máx |ΔE|/E0 {err_d:.1e} (double) / {err_m:.1e} (mixta); "
+                             f"tendencia en {steps} pasos {slope_d:+.1e} / {slope_m:+.1e}; "
+                             f"<r> {r_d:.5f} / {r_m:.5f} Å"))
+
+    # 4) Momento y centro de masas: con fuerzas en float32 la suma de fuerzas
+    # no es exactamente cero y el momento hace un paseo al azar del orden del
+    # redondeo de float32 (relativo a Σ m|v|), no una deriva
+    script = load_script(os.path.join(HERE, 'verlet-CH4.py'), overrides={'friction': 0.0})
+    state, integrator = script.make_system()
+    state = state.astype('mixed')
+    com0 = state.center_of_mass()
+    integrator.evaluate(state)
+    integrator.advance(state, steps // 5)
+    p, com = state.momentum(), state.center_of_mass()
+    rel_p = np.max(np.abs(p)) / np.sum(state.masses[:, None] * np.abs(state.velocities))
+    shift = np.max(np.abs(com - com0))
+    ok = p.dtype == np.float64 and rel_p < 1e-5 and shift < 1e-3
+    results.append(check("momento y centro de masas (CH4, mixta)", ok,
+                         f"máx |P| / Σ m|v| = {rel_p:.1e}, desplazamiento del CM "
+                         f"{shift:.1e} Å en {steps // 5} pasos"))
+
+    # 5) Caja de agua: fuerzas y energía en float32 con la suma de energías en float64
+    top = water_box()
+    mixed = top.state(kT=0.596, seed=1, precision='mixed')
+    double = top.state(precision='double')
+    double.positions[:] = mixed.positions        # mismas posiciones (redondeadas a float32)
+    forces_m, pe_m = ForceField(*top.terms(cutoff=9.0)).compute(mixed.positions)
+    forces_d, pe_d = ForceField(*top.terms(cutoff=9.0)).compute(double.positions)
+    rel_pe = abs(pe_m - pe_d) / abs(pe_d)
+    rel_f = np.max(np.abs(forces_m - forces_d)) / np.max(np.abs(forces_d))
+    ok = (forces_m.dtype == np.float32 and isinstance(pe_m, float)
+          and isinstance(mixed.kinetic_energy(), float) and rel_pe < 1e-5 and rel_f < 1e-4)
+    results.append(check(f"energía y fuerzas de {3 * n_waters} átomos", ok,
+                         f"fuerzas float32 con error relativo {rel_f:.1e}, energía "
+                         f"(float64) {pe_m:.4f} frente a {pe_d:.4f} ({rel_pe:.1e})"))
+
+    # 6) Un paso de dinámica en precisión mixta conserva el dtype del estado
+    integrator = VelocityVerlet(top.terms(cutoff=9.0), 0.005)
+    integrator.evaluate(mixed)
+    integrator.advance(mixed, 5)
+    ok = all(a.dtype == np.float32 for a in (mixed.positions, mixed.velocities, mixed.forces))
+    results.append(check("estado float32 tras integrar", ok,
+                         f"posiciones, velocidades y fuerzas {mixed.dtype}; "
+                         f"{mixed.positions.nbytes + mixed.velocities.nbytes + mixed.forces.nbytes} "
+                         f"bytes frente a {3 * double.positions.nbytes} en float64"))
+
+    # 7) Trayectorias compactas: float16 y cuantizada a 16 bits por cuadro
+    tmp = tempfile.mkdtemp(prefix='md-precision-')
+    frames = []
+    for _ in range(20):
+        integrator.advance(mixed, 5)
+        frames.append(mixed.positions.astype(np.float64))
+    frames = np.array(frames)
+    sizes, errors = {}, {}
+    for label, options in (('float64', {}), ('float32', {'dtype': np.float32}),
+                           ('float16', {'dtype': np.float16}), ('cuantizada', {'quantize': True})):
+        path = os.path.join(tmp, f'{label}.mdtraj')
+        with TrajectoryWriter(path, frames.shape[1:], **options) as writer:
+            writer.write_block(frames)
+        sizes[label] = os.path.getsize(path)
+        errors[label] = np.max(np.abs(np.asarray(open_trajectory(path).frames) - frames))
+    span = np.ptp(frames, axis=1).max()
+    ok = (errors['float64'] == 0 and errors['cuantizada'] <= span / 65535
+          and errors['cuantizada'] < errors['float16']
+          and sizes['cuantizada'] < 0.3 * sizes['float64'])
+    results.append(check("trayectorias compactas", ok,
+                         ", ".join(f"{label} {sizes[label]} bytes (error {errors[label]:.1e} Å)"
+                                   for label in sizes)))
+    shutil.rmtree(tmp, ignore_errors=True)
+
+    # 8) MD_PRECISION elige la política por defecto; un nombre desconocido falla
+    previous = os.environ.get('MD_PRECISION')
+    os.environ['MD_PRECISION'] = 'mixed'
+    try:
+        state = load_script(os.path.join(HERE, 'verlet-CO.py')).make_system()[0]
+        ok = select_precision() == 'mixed' and state.positions.dtype == np.float32
+        try:
+            select_precision('half')
+            ok = False
+        except ValueError:
+            pass
+    finally:
+        if previous is None:
+            del os.environ['MD_PRECISION']
+        else:
+            os.environ['MD_PRECISION'] = previous
+    results.append(check("MD_PRECISION", ok and select_precision() == (previous or 'double'),
+                         "MD_PRECISION=mixed corre los scripts en float32; 'half' es ValueError"))
+
+    sys.exit(0 if all(results) else 1)
@@ -0,0 +1,143 @@
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+from md import open_trajectory
+from md.benchmark import load_script
+from md.sweep import ResultCache, code_version, parameter_grid, run_key, run_sweep
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+# ==============================================
+# VALIDACIÓN DEL BARRIDO DE PARÁMETROS Y LA CACHÉ
+# ==============================================
+n_workers = 4
+steps = 2000
+
+# Uso: python validate-sweep.py [procesos]
+if len(sys.argv) > 1:
+    n_workers = int(sys.argv[1])
+
+CO = os.path.join(HERE, 'verlet-CO.py')
+CO2 = os.path.join(HERE, 'leapfrog-CO2.py')
+BROWNIAN = os.path.join(HERE, 'browniam-dynamics-H20.py')
+
+
+def check(name, ok, detail):
+    print(f"[{'PASA' if ok else 'FALLA'}] {name}: {detail}")
+    return ok
+
+
+def same(a, b):
+    return all(np.array_equal(a[name], b[name]) for name in a.observables)
+
+
+if __name__ == "__main__":
+    results = []
+    tmp = tempfile.mkdtemp(prefix='md-sweep-')
+    cache = ResultCache(os.path.join(tmp, 'cache'))
+    options = {'steps': steps, 'sample_every': 10, 'trajectory': False}
+
+    # 1) Claves: independientes del orden y del tipo numérico, sensibles a cada valor
+    key = run_key(CO, {'k': 500, 'dt': 0.001}, options)
+    ok = (key == run_key(CO, {'dt': np.float64(0.001), 'k': 500.0}, options)
+          and key != run_key(CO, {'k': 500, 'dt': 0.002}, options)
+          and key != run_key(CO, {'k': 500, 'dt': 0.001}, dict(options, steps=steps + 1))
+          and key != run_key(CO2, {'k': 500, 'dt': 0.001}, options))
+    results.append(check("claves por contenido", ok, f"{key[:16]}... estable ante orden y tipos"))
+
+    # 2) Un punto del barrido = el script con esas constantes
+    points = parameter_grid(k=[250.0, 500.0, 750.0], dt=[0.001, 0.002])
+    t0 = time.perf_counter()
+    first = run_sweep(CO2, points, cache, n_workers=n_workers, steps=steps, trajectory=True)
+    t_first = time.perf_counter() - t0
+    script = load_script(CO2, overrides={'k': 750.0, 'dt': 0.002})
+    direct = script.run_simulation(steps=steps, dt=script.dt)[::10]
+    swept = open_trajectory(first[-1].trajectory).frames
+    results.append(check("punto = script con constantes reemplazadas",
+                         np.array_equal(direct, swept) and not any(r.cached for r in first),
+                         f"{len(swept)} cuadros de CO2 (k = 750, dt = 0.002) idénticos a "
+                         f"run_simulation; {len(first)} puntos en {t_first:.1f} s"))
+
+    # 3) Repetir el barrido: todo sale de la caché, idéntico y sin lanzar procesos
+    t0 = time.perf_counter()
+    again = run_sweep(CO2, points, cache, n_workers=n_workers, steps=steps, trajectory=True)
+    t_again = time.perf_counter() - t0
+    ok = all(r.cached for r in again) and all(same(a, b) for a, b in zip(first, again))
+    results.append(check("barrido repetido", ok and t_again < 0.2 * t_first,
+                         f"{sum(r.cached for r in again)}/{len(again)} de la caché en "
+                         f"{1e3 * t_again:.0f} ms ({t_first / t_again:.0f}x)"))
+
+    # 4) Barrido solapado con puntos repetidos: solo los nuevos, una vez cada uno
+    overlap = parameter_grid(k=[500.0, 750.0, 1000.0], dt=[0.002, 0.004]) + [{'k': 1000, 'dt': 0.004}]
+    counted = []
+    mixed = run_sweep(CO2, overlap, cache, n_workers=n_workers, steps=steps, trajectory=True,
+                      progress=lambda done, total: counted.append(total))
+    new = [r for r in mixed if not r.cached]
+    ok = (len(new) == 5 and counted[-1] == 4 and mixed[-1] is mixed[-2]
+          and same(mixed[0], first[3]))
+    results.append(check("barrido solapado", ok,
+                         f"{len(overlap)} puntos: {len(overlap) - len(new)} de la caché, "
+                         f"{counted[-1]} corridas nuevas"))
+
+    # 5) Resultado independiente del número de procesos y semillas reproducibles
+    seeds = parameter_grid(seed=[1, 2, 3], kT=0.01)
+    serial = run_sweep(BROWNIAN, seeds, ResultCache(os.path.join(tmp, 'serial')), n_workers=1,
+                       steps=steps)
+    parallel = run_sweep(BROWNIAN, seeds, ResultCache(os.path.join(tmp, 'paralelo')),
+                         n_workers=n_workers, steps=steps)
+    ok = (all(same(a, b) for a, b in zip(serial, parallel))
+          and not np.array_equal(serial[0]['lengths'], serial[1]['lengths']))
+    results.append(check("serie = paralelo, semillas", ok,
+                         f"H2O browniano con 3 semillas idéntico con 1 y {n_workers} procesos"))
+
+    # 6) Cambiar el código invalida las entradas
+    copy = os.path.join(tmp, 'verlet-CO.py')
+    shutil.copy(CO, copy)
+    before = run_sweep(copy, [{'k': 300.0}], cache, n_workers=1, steps=200)[0]
+    with open(copy, 'a', encoding='utf-8') as f:
+        f.write("\n# versión nueva\n")
+    after = run_sweep(copy, [{'k': 300.0}], cache, n_workers=1, steps=200)[0]
+    # ... y también los archivos de datos junto al script (data/parameters.dat)
+    data = os.path.join(tmp, 'data')
+    os.makedirs(data)
+    shutil.copy(os.path.join(HERE, 'data', 'parameters.dat'), data)
+    with_data = code_version(copy)
+    with open(os.path.join(data, 'parameters.dat'), 'a', encoding='utf-8') as f:
+        f.write("# k modificado\n")
+    ok = (not before.cached and not after.cached and after.key != before.key
+          and with_data != after.meta['code'] and code_version(copy) != with_data)
+    results.append(check("versión del código en la clave", ok,
+                         f"código {before.meta['code'][:8]} -> {after.meta['code'][:8]}, "
+                         f"datos {with_data[:8]} -> {code_version(copy)[:8]}: se recalcula"))
+
+    # 7) Expulsión LRU por número de entradas y por tamaño
+    lru = ResultCache(os.path.join(tmp, 'lru'), max_entries=3)
+    a, b, c = (run_sweep(CO, [{'k': k}], lru, n_workers=1, steps=200)[0] for k in (100, 200, 300))
+    time.sleep(0.01)
+    lru.load(a.key)                                   # A pasa a ser la más reciente
+    d = run_sweep(CO, [{'k': 400}], lru, n_workers=1, steps=200)[0]
+    kept = {key for key, _, _ in lru.entries()}
+    ok_count = kept == {a.key, c.key, d.key}
+    entry_bytes = max(size for _, size, _ in lru.entries())
+    lru.max_entries, lru.max_bytes = None, 2 * entry_bytes
+    removed = lru.evict()
+    ok_bytes = lru.size() <= lru.max_bytes and c.key in removed and d.key not in removed
+    results.append(check("expulsión LRU", ok_count and ok_bytes,
+                         f"con 3 entradas se expulsa la menos usada (k = 200); con "
+                         f"{2 * entry_bytes} bytes quedan {len(lru.entries())} entradas"))
+
+    # 8) Parámetros inválidos fallan antes de correr nada
+    try:
+        run_sweep(CO, [{'k': 100.0, 'damping': 0.3}], cache, n_workers=n_workers)
+        ok = False
+    except ValueError as err:
+        ok = 'damping' in str(err)
+    results.append(check("parámetro inexistente", ok, "ValueError sin lanzar procesos"))
+
+    shutil.rmtree(tmp, ignore_errors=True)
+    sys.exit(0 if all(results) else 1)
@@ -0,0 +1,141 @@
+import os
+import sys
+import tempfile
+
+import numpy as np
+
+from md import (HarmonicAngles, HarmonicBonds, ParameterTable, Topology, VelocityVerlet,
+                read_parameters, write_xyz)
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+# ==============================================
+# VALIDACIÓN DE LA TOPOLOGÍA (data/*.xyz + data/parameters.dat)
+# ==============================================
+parameters = read_parameters(os.path.join(HERE, 'data', 'parameters.dat'))
+n_water = 1000
+dt = 0.005
+t_total = 2.0     # [unidades de 48.9 fs]
+
+# Uso: python validate-topology.py [moléculas de agua]
+if len(sys.argv) > 1:
+    n_water = int(sys.argv[1])
+
+
+def load(name):
+    return Topology.from_xyz(os.path.join(HERE, 'data', name), parameters)
+
+
+def check(name, ok, detail):
+    print(f"[{'PASA' if ok else 'FALLA'}] {name}: {detail}")
+    return ok
+
+
+def numerical_forces(term, pos, h=1e-6):
+    forces = np.zeros_like(pos)
+    for idx in np.ndindex(pos.shape):
+        p = pos.copy()
+        p[idx] += h
+        up = term.compute(p)[1]
+        p[idx] -= 2 * h
+        forces[idx] = -(up - term.compute(p)[1]) / (2 * h)
+    return forces
+
+
+if __name__ == "__main__":
+    results = []
+
+    # 1) Enlaces y ángulos deducidos de cada XYZ
+    expected = {'h2o.xyz': (2, 1), 'ch4.xyz': (4, 6), 'co2.xyz': (2, 1)}
+    for name, (n_bonds, n_angles) in expected.items():
+        top = load(name)
+        bonded = sum(t.compute(top.positions)[1] for t in top.terms())
+        results.append(check(f"topología de {name}",
+                             (len(top.bonds), len(top.angles)) == (n_bonds, n_angles)
+                             and bonded < 1e-6,
+                             f"{len(top.bonds)} enlaces, {len(top.angles)} ángulos, "
+                             f"energía enlazante en la geometría del XYZ {bonded:.1e}"))
+
+    # 2) Mismos arreglos que los enlaces escritos a mano (HarmonicBonds.star de verlet-CH4.v2.py)
+    methane = load('ch4.xyz').bond_term()
+    star = HarmonicBonds.star(0, range(1, 5), 450.0, 1.09)
+    same = all(np.array_equal(getattr(methane, a), getattr(star, a)) for a in ('i', 'j', 'k', 'r_eq'))
+    results.append(check("CH4 = HarmonicBonds.star", same, "índices y parámetros idénticos"))
+
+    # 3) Fuerzas de ángulo = -∇U (2D, 3D y CO2 casi lineal)
+    rng = np.random.default_rng(0)
+    errors = []
+    for dim, theta_eq in ((2, 1.8), (3, np.radians(104.52)), (3, np.pi)):
+        pos = rng.normal(size=(6, dim))
+        if theta_eq == np.pi:
+            pos[2] = 2 * pos[1] - pos[0] + 0.05 * rng.normal(size=dim)
+        term = HarmonicAngles([0, 3], [1, 4], [2, 5], [55.0, 35.0], theta_eq)
+        errors.append(np.max(np.abs(term.compute(pos)[0] - numerical_forces(term, pos))))
+    results.append(check("fuerzas de ángulo", max(errors) < 1e-6,
+                         f"máx |F - (-∇U)| = {max(errors):.1e}"))
+
+    # 4) Red de moléculas: índices desplazados, moléculas y exclusiones
+    box = load('h2o.xyz').replicate(n_water, 3.1, random_orientation=True, seed=1)
+    bonded = sum(t.compute(box.positions)[1] for t in box.terms())
+    per_molecule = np.bincount(box.molecule)
+    ok = (box.n_atoms == 3 * n_water and box.n_molecules == n_water
+          and np.all(per_molecule == 3) and len(box.exclusions()) == 3 * n_water
+          and bonded < 1e-6 * n_water)
+    results.append(check(f"caja de {n_water} aguas", ok,
+                         f"{box.n_atoms} átomos, {len(box.bonds)} enlaces, {len(box.angles)} "
+                         f"ángulos, {len(box.exclusions())} exclusiones, caja {box.box[0]:.1f} Å"))
+
+    # 5) Deducción de enlaces sobre un XYZ grande (la caja escrita y leída de nuevo)
+    path = os.path.join(tempfile.mkdtemp(prefix='md-topology-'), 'caja.xyz')
+    write_xyz(path, box.types, box.positions, 'caja de agua')
+    reread = Topology.from_xyz(path, parameters)
+    same = (np.array_equal(reread.bonds, box.bonds) and np.array_equal(reread.angles, box.angles)
+            and np.array_equal(reread.molecule, box.molecule))
+    results.append(check("XYZ de la caja", same, "mismos enlaces, ángulos y moléculas"))
+
+    # 6) NVE de una caja de metano con enlaces, ángulos, LJ y Coulomb: el error
+    #    de energía de velocity Verlet escala como dt² si las fuerzas son -∇U
+    methane_box = load('ch4.xyz').replicate(64, 4.2, random_orientation=True, seed=2)
+    errors = []
+    for h in (dt, dt / 2):
+        state = methane_box.state(kT=0.596, seed=3)
+        integrator = VelocityVerlet(methane_box.terms(cutoff=9.0), h)
+        integrator.evaluate(state)
+        e0 = state.total_energy()
+        energies = []
+        integrator.run(state, int(round(t_total / h)),
+                       callbacks=[lambda s: energies.append(s.total_energy())])
+        errors.append(np.max(np.abs(np.array(energies) - e0)) / state.kinetic_energy())
+    order = np.log2(errors[0] / errors[1])
+    results.append(check("NVE de 64 CH4", 1.7 < order < 2.3,
+                         f"máx |ΔE|/KE = {errors[0]:.1e} (dt = {dt}), {errors[1]:.1e} (dt/2): "
+                         f"orden {order:.2f}"))
+
+    # 7) Anillos de 3 y 4 átomos: cada par excluido una sola vez y la
+    #    electrostática PME de un anillo neutro aislado, con todos sus pares
+    #    excluidos, se anula (restar un par dos veces deja decenas de kcal/mol)
+    ring = ParameterTable()
+    ring.add_atom('A', 12.0, charge=0.4)
+    ring.add_atom('B', 12.0, charge=-0.4)
+    ring.add_atom('C', 12.0, charge=-0.2)
+    ring.add_bond('A', 'B', 300.0, 1.5)
+    ring.add_bond('A', 'C', 300.0, 1.5)
+    ring.add_bond('C', 'C', 300.0, 1.5)
+    side = 1.5
+    rings = {'cuadrado': (['A', 'B', 'A', 'B'], [[0, 0, 0], [side, 0, 0], [side, side, 0],
+                                                 [0, side, 0]], 6),
+             'triángulo': (['A', 'C', 'C'], [[0, 0, 0], [side, 0, 0],
+                                             [side / 2, side * np.sqrt(3) / 2, 0]], 3)}
+    tmp = tempfile.mkdtemp(prefix='md-topology-')
+    for name, (types, coords, n_pairs) in rings.items():
+        path = os.path.join(tmp, f'{name}.xyz')
+        write_xyz(path, types, coords, name)
+        top = Topology.from_xyz(path, ring).replicate(1, 30.0)
+        pe = top.nonbonded(cutoff=9.0, periodic=True, electrostatics='pme').compute(top.positions)[1]
+        pairs = top.exclusions()
+        results.append(check(f"exclusiones del anillo ({name})",
+                             len(pairs) == n_pairs and abs(pe) < 1e-2,
+                             f"{len(top.bonds)} enlaces + {len(top.pairs_13)} pares 1-3 -> "
+                             f"{len(pairs)} exclusiones; energía PME {pe:.1e} kcal/mol"))
+
+    sys.exit(0 if all(results) else 1)
@@ -1,6 +1,11 @@
+import sys
+
 import numpy as np
-import matplotlib.pyplot as plt
-from mpl_toolkits.mplot3d import Axes3D
+
+from md import (BAOAB, BondConstraints, HarmonicBonds, LiveViewer, Observables, Profiler, State,
+                TrajectoryRecorder, TrajectoryWriter, minimize, open_trajectory)
+from md.analysis import trajectory_geometry
+from md.observables import bond_angles, star_angles
 
 # ==============================================
 # PARÁMETROS FÍSICOS (UNIDADES REALISTAS)
@@ -10,162 +15,177 @@ m_H = 1.008   # masa del hidrógeno [uma]
 k_bond = 450.0  # constante de enlace [kcal/mol/Å²]
 r_eq = 1.09    # distancia de equilibrio [Å]
 dt = 0.001    # paso de tiempo reducido [fs]
-steps = 10000  # más pasos para mejor convergencia
+steps = 10000  # pasos de la dinámica amortiguada (--dynamics)
+# Minimización directa (por defecto): 'lbfgs' o 'fire', hasta que la mayor
+# fuerza baje de ftol [kcal/mol/Å]
+method = 'lbfgs'
+ftol = 1e-4
 damping = 0.3  # coeficiente de amortiguamiento
+# Enlaces C-H rígidos (SHAKE/RATTLE) en lugar de resortes: sin la vibración
+# C-H el paso de tiempo puede ser 2-4 veces mayor
+rigid_bonds = False
+# Pasos entre muestras de observables, historia y archivos de salida
+sample_every = 10
+
+# Columnas del archivo de observables
+OBS_FIELDS = ['d1', 'd2', 'd3', 'd4', 'pe', 'ke', 'te']
 
 # ==============================================
 # INICIALIZACIÓN DEL SISTEMA
 # ==============================================
-def init_positions():
-    """Configuración inicial tetraédrica con pequeña perturbación"""
+def ideal_positions():
+    """Tetraedro ideal con enlaces C-H de longitud r_eq (referencia del RMSD)"""
     positions = np.zeros((5, 3))
     # Posiciones tetraédricas ideales
     positions[1] = [ 1,  1,  1]  # H1
     positions[2] = [-1, -1,  1]  # H2
     positions[3] = [-1,  1, -1]  # H3
     positions[4] = [ 1, -1, -1]  # H4
-    # Normalizar a distancia de equilibrio y añadir perturbación
-    for i in range(1, 5):
-        positions[i] = positions[i]/np.linalg.norm(positions[i]) * r_eq
-        positions[i] += np.random.normal(0, 0.1, 3)  # Pequeña perturbación aleatoria
+    # Normalizar a distancia de equilibrio
+    positions[1:] *= r_eq / np.sqrt(3)
+    return positions
+
+def init_positions(seed=None):
+    """Configuración inicial tetraédrica con pequeña perturbación"""
+    positions = ideal_positions()
+    rng = np.random.default_rng(seed)
+    positions[1:] += rng.normal(0, 0.1, (4, 3))  # Pequeña perturbación aleatoria
     return positions
 
 # ==============================================
 # CÁLCULO DE FUERZAS MEJORADO
 # ==============================================
-def compute_forces(pos, vel):
-    forces = np.zeros_like(pos)
-    C = pos[0]
-    
-    # Fuerzas de enlace C-H con protección numérica
-    for i in range(1, 5):
-        r_vec = pos[i] - C
-        r = np.linalg.norm(r_vec)
-        if r > 0.01:  # Evitar división por cero
-            f_mag = -k_bond * (r - r_eq)
-            forces[i] = f_mag * (r_vec/r)
-            forces[0] -= f_mag * (r_vec/r)
+# Enlaces C-H; los de longitud <= 0.01 se ignoran (evita división por cero)
+bonds = HarmonicBonds.star(0, range(1, 5), k_bond, r_eq, r_min=0.01)
+
+# Interacciones no enlazantes opcionales (p. ej. md.NonBondedForce para una
+# caja con muchas moléculas); None para la molécula aislada. En sistemas de
+# miles de átomos, md.ParallelForceField([bonds, nonbonded]) reemplaza
+# directamente a compute_forces repartiendo el cálculo entre procesos.
+nonbonded = None
+
+def compute_forces(pos):
+    """Fuerzas conservativas y energía potencial; la fricción la aplica el integrador."""
+    # Fuerzas de enlace C-H con protección numérica (nulas si son rígidos)
+    if rigid_bonds:
+        forces, pe = np.zeros_like(pos), 0.0
+    else:
+        forces, pe = bonds.compute(pos)
     
-    # Amortiguamiento más fuerte para mejor minimización
-    forces -= damping * vel
+    # Lennard-Jones + Coulomb con lista de vecinos
+    if nonbonded is not None:
+        pe += nonbonded.compute(pos, out=forces)[1]
     
-    return forces
+    return forces, pe
 
 # ==============================================
-# SIMULACIÓN CON VISUALIZACIÓN EN TIEMPO REAL
+# SIMULACIÓN (SIN DEPENDENCIA DE MATPLOTLIB)
 # ==============================================
-def run_simulation_with_visualization():
+def make_system(seed=None):
+    """Estado inicial e integrador (usado también por benchmark-suite.py y parameter-sweep.py)."""
+    state = State(init_positions(seed), masses=[m_C] + [m_H]*4)
+    
+    # Amortiguamiento más fuerte para mejor minimización (paso O de BAOAB)
+    constraints = BondConstraints.from_bonds(bonds) if rigid_bonds else None
+    return state, BAOAB(compute_forces, dt, friction=damping, constraints=constraints)
+
+def make_observables():
+    """PE y distancias del cálculo de fuerzas; KE, T, RMSD y ángulos H-C-H vectorizados."""
+    return Observables(bonds, star_angles(0, range(1, 5)), reference=ideal_positions(),
+                       every=sample_every, constraints=len(bonds) if rigid_bonds else 0,
+                       reuse_lengths=not rigid_bonds)
+
+def run_simulation(output=None, viewer=None, profiler=None, observables=None):
+    """Integra el sistema a toda velocidad.
+
+    Con ``output`` las posiciones y observables de cada muestra se
+    escriben a ``output.mdtraj`` y ``output-obs.mdtraj`` a medida que se
+    producen. ``viewer`` (md.LiveViewer) recibe instantáneas sin bloquear
+    el bucle. ``profiler`` (md.Profiler) mide el tiempo de cada fase del
+    paso y ``observables`` (md.Observables) acumula promedios y errores.
+    """
     # Configuración inicial
-    positions = init_positions()
-    velocities = np.zeros_like(positions)
-    masses = np.array([m_C] + [m_H]*4)
-    
-    # Preparar gráficos
-    plt.ion()  # Modo interactivo
-    fig = plt.figure(figsize=(18, 6))
-    
-    # Gráfico 3D
-    ax1 = fig.add_subplot(131, projection='3d')
-    ax1.set_title('Estructura Molecular')
-    ax1.set_xlim(-2, 2)
-    ax1.set_ylim(-2, 2)
-    ax1.set_zlim(-2, 2)
-    
-    # Gráfico de distancias
-    ax2 = fig.add_subplot(132)
-    ax2.set_title('Distancias C-H')
-    ax2.set_xlabel('Paso')
-    ax2.set_ylabel('Distancia (Å)')
-    ax2.axhline(r_eq, color='k', linestyle='--')
-    
-    # Gráfico de energía
-    ax3 = fig.add_subplot(133)
-    ax3.set_title('Energías del Sistema')
-    ax3.set_xlabel('Paso')
-    ax3.set_ylabel('Energía (kcal/mol)')
-    
-    # Datos para gráficos
-    dist_history = [[] for _ in range(4)]
-    pe_history = []
-    ke_history = []
-    te_history = []
-    
-    # Bucle principal de simulación
-    for step in range(steps):
-        # Velocity Verlet
-        forces = compute_forces(positions, velocities)
-        positions += velocities * dt + 0.5 * forces/masses[:, None] * dt**2
-        new_forces = compute_forces(positions, velocities)
-        velocities += 0.5 * (forces + new_forces)/masses[:, None] * dt
-        
-        # Calcular propiedades
-        pe = 0.5 * k_bond * sum((np.linalg.norm(positions[i]-positions[0])-r_eq)**2 for i in range(1,5))
-        ke = 0.5 * sum(m * np.sum(v**2) for m, v in zip(masses, velocities))
-        
-        # Actualizar datos históricos
-        for i in range(4):
-            dist_history[i].append(np.linalg.norm(positions[i+1]-positions[0]))
-        pe_history.append(pe)
-        ke_history.append(ke)
-        te_history.append(pe + ke)
+    state, integrator = make_system()
+    if observables is None:
+        observables = make_observables()
+    
+    # Fases force/integrate automáticas; sin profiler no se mide nada
+    if profiler is None:
+        profiler = Profiler(enabled=False)
+    profiler.attach(integrator)
+    measure = profiler.phase('observables')
+    io = profiler.phase('io')
+    render = profiler.phase('render')
+    
+    # Datos para gráficos: un cuadro (d1..d4, PE, KE, TE) por muestra
+    history = TrajectoryRecorder.for_run(len(OBS_FIELDS), steps, stride=sample_every,
+                                         include_initial=False)
+    obs = np.empty(len(OBS_FIELDS))
+    
+    # Salida en disco opcional (streaming, legible con md.open_trajectory)
+    traj_writer = obs_writer = None
+    if output is not None:
+        traj_writer = TrajectoryWriter(f'{output}.mdtraj', state.positions.shape,
+                                       dt=dt * sample_every)
+        obs_writer = TrajectoryWriter(f'{output}-obs.mdtraj', len(OBS_FIELDS),
+                                      dt=dt * sample_every, fields=OBS_FIELDS)
+    
+    def observe(s):
+        positions = s.positions
         
-        # Actualizar gráficos cada 100 pasos
-        if step % 100 == 0:
-            # Limpiar gráficos
-            ax1.cla()
-            ax2.cla()
-            ax3.cla()
+        with measure:
+            # Propiedades y acumuladores (sin recalcular distancias ni energías)
+            observables.sample(s)
             
-            # Estructura 3D
-            ax1.scatter(*positions[0], c='black', s=200, label='C')
-            ax1.scatter(*positions[1:].T, c='red', s=100, label='H')
-            for i in range(1,5):
-                ax1.plot(*np.array([positions[0], positions[i]]).T, 'b-', alpha=0.5)
-            ax1.set_title(f'Estructura Molecular (Paso {step})')
-            ax1.set_xlim(-2, 2)
-            ax1.set_ylim(-2, 2)
-            ax1.set_zlim(-2, 2)
-            ax1.legend()
-            
-            # Distancias
-            for i in range(4):
-                ax2.plot(dist_history[i], label=f'C-H{i+1}')
-            ax2.axhline(r_eq, color='k', linestyle='--', label='Equilibrio')
-            ax2.set_title('Evolución de Distancias C-H')
-            ax2.legend()
-            ax2.grid(True)
-            
-            # Energías
-            ax3.plot(pe_history, 'r-', label='Potencial')
-            ax3.plot(ke_history, 'b-', label='Cinética')
-            ax3.plot(te_history, 'k--', label='Total')
-            ax3.set_title('Energías del Sistema')
-            ax3.legend()
-            ax3.grid(True)
-            
-            plt.tight_layout()
-            plt.draw()
-            plt.pause(0.001)
+            # Actualizar datos históricos
+            obs[:4] = observables.last('lengths')
+            pe, ke = observables.last('pe'), observables.last('ke')
+            obs[4:] = pe, ke, pe + ke
+            history.append(obs)
+        if output is not None:
+            with io:
+                traj_writer.append(positions)
+                obs_writer.append(obs)
+        
+        # Instantánea para el visor cada viewer.every pasos (se descarta si va atrasado)
+        if viewer is not None:
+            with render:
+                viewer.publish(s.step, positions, obs)
+    
+    # Bucle principal: velocity Verlet + fricción (BAOAB), una evaluación de fuerzas por paso
+    integrator.run(state, steps, callbacks=[observe], stride=sample_every)
     
-    plt.ioff()
-    return positions, dist_history, pe_history, ke_history, te_history
+    if output is not None:
+        traj_writer.close()
+        obs_writer.close()
+    data = history.frames()
+    return state.positions, data[:, :4].T, data[:, 4], data[:, 5], data[:, 6]
+
+# ==============================================
+# MINIMIZACIÓN DIRECTA (FIRE / L-BFGS)
+# ==============================================
+def minimize_structure(positions=None, method=method):
+    """Relaja la molécula con la misma energía y fuerzas de compute_forces."""
+    if positions is None:
+        positions = init_positions()
+    return minimize(compute_forces, positions, method=method, ftol=ftol)
+
+# ==============================================
+# SIMULACIÓN CON VISUALIZACIÓN EN TIEMPO REAL
+# ==============================================
+def run_simulation_with_visualization(output=None):
+    """Igual que run_simulation, con un visor en otro proceso cada 100 pasos."""
+    viewer = LiveViewer(zip(bonds.i, bonds.j), every=100, r_eq=r_eq)
+    with viewer:
+        return run_simulation(output, viewer)
 
 # ==============================================
 # ANÁLISIS FINAL
 # ==============================================
 def analyze_final_state(final_pos):
-    # Calcular distancias
-    distances = [np.linalg.norm(final_pos[i]-final_pos[0]) for i in range(1,5)]
-    
-    # Calcular ángulos
-    angles = []
-    for i in range(1,5):
-        for j in range(i+1,5):
-            vec1 = final_pos[i] - final_pos[0]
-            vec2 = final_pos[j] - final_pos[0]
-            cos_theta = np.dot(vec1, vec2)/(np.linalg.norm(vec1)*np.linalg.norm(vec2))
-            angles.append(np.degrees(np.arccos(np.clip(cos_theta, -1, 1))))
-    
+    # Distancias C-H y los seis ángulos H-C-H, vectorizados
+    distances = bonds.lengths(final_pos)
+    angles = bond_angles(final_pos, *star_angles(0, range(1, 5)))
     return distances, angles
 
 # ==============================================
@@ -174,8 +194,41 @@ def analyze_final_state(final_pos):
 if __name__ == "__main__":
     print("Iniciando simulación de minimización de energía...")
     
-    # Ejecutar simulación con visualización
-    final_pos, dist_hist, pe, ke, te = run_simulation_with_visualization()
+    # Argumentos: [--fire] [--dynamics [--headless] [--profile] [prefijo de salida]]
+    args = sys.argv[1:]
+    flags = ('--fire', '--dynamics', '--headless', '--profile')
+    if '--fire' in args:
+        method = 'fire'
+    dynamics = '--dynamics' in args
+    headless = '--headless' in args
+    profile = '--profile' in args
+    args = [a for a in args if a not in flags]
+    output = args[0] if args else None
+    
+    if not dynamics:
+        # Mínimo en decenas de evaluaciones de fuerza en lugar de miles de pasos
+        result = minimize_structure(method=method)
+        distances, angles = analyze_final_state(result.positions)
+        
+        print(f"\n=== RESULTADOS FINALES ({result.method}) ===")
+        print(f"Distancias C-H: {np.array(distances).round(4)} Å")
+        print(f"Ángulos H-C-H: {np.array(angles).round(2)}°")
+        print(f"Desviación media del tetraedro: {np.mean(np.abs(np.array(angles)-109.47)):.2f}°")
+        print(f"Energía final: {result.energy:.3e} kcal/mol, máx |F| = {result.fmax:.1e} kcal/mol/Å")
+        print(f"{result.n_evaluations} evaluaciones de fuerza en {result.n_iterations} iteraciones "
+              f"({'convergió' if result.converged else 'no convergió'}; "
+              f"la dinámica amortiguada usa {steps})")
+        sys.exit(0)
+    
+    # Con --profile: tabla por fase, traza de Chrome y cProfile de 100 pasos
+    profiler = None
+    if profile:
+        profiler = Profiler(trace=True, allocations=True, profile_steps=(1000, 1100))
+    
+    # Ejecutar simulación (con visor en otro proceso salvo en modo headless)
+    viewer = None if headless else LiveViewer(zip(bonds.i, bonds.j), every=100, r_eq=r_eq).start()
+    observables = make_observables()
+    final_pos, dist_hist, pe, ke, te = run_simulation(output, viewer, profiler, observables)
     
     # Análisis final
     distances, angles = analyze_final_state(final_pos)
@@ -186,5 +239,31 @@ if __name__ == "__main__":
     print(f"Desviación media del tetraedro: {np.mean(np.abs(np.array(angles)-109.47)):.2f}°")
     print(f"Energía total final: {te[-1]:.4f} kcal/mol")
     
-    # Mostrar gráficos finales
-    plt.show()
\ No newline at end of file
+    # Geometría de todos los cuadros guardados, leída del archivo por bloques
+    if output is not None:
+        geometry = trajectory_geometry(open_trajectory(f'{output}.mdtraj'), bonds,
+                                       star_angles(0, range(1, 5)))
+        print(f"\n=== TRAYECTORIA ({len(geometry['lengths'])} cuadros en {output}.mdtraj) ===")
+        print(f"Distancias C-H: {geometry['lengths'].mean():.4f} ± {geometry['lengths'].std():.4f} Å")
+        print(f"Ángulos H-C-H: {geometry['angles'].mean():.2f} ± {geometry['angles'].std():.2f}°")
+    
+    print("\n=== PROMEDIOS (± error por bloques) ===")
+    print(observables.summary())
+    
+    if profiler is not None:
+        profiler.close()
+        trace_path = f"{output or 'verlet-CH4.v2'}-trace.json"
+        profiler.write_chrome_trace(trace_path)
+        print("\n=== PERFIL POR FASES ===")
+        print(profiler.summary())
+        print(f"Traza de Chrome en {trace_path}")
+        stats = profiler.profile_stats(limit=10)
+        if stats is None:
+            start, stop = profiler.profile_steps
+            print(f"Sin cProfile: la corrida de {steps} pasos no llegó a los pasos {start}-{stop}")
+        else:
+            print(stats)
+    
+    # Mantener abierta la ventana del visor hasta que el usuario la cierre
+    if viewer is not None:
+        viewer.close()
\ No newline at end of file
@@ -1,6 +1,8 @@
 import numpy as np
 import matplotlib.pyplot as plt
 
+from md import FusedVerlet, HarmonicBonds, State, TrajectoryRecorder
+
 # Parámetros físicos (unidades arbitrarias)
 m_O = 16.0  # masa del oxígeno
 m_C = 12.0  # masa del carbono
@@ -21,52 +23,41 @@ positions[2] += 0.2  # desplaza O2
 dt = 0.001
 steps = 5000
 
-# Función de fuerzas corregida
-def compute_forces(pos):
-    f = np.zeros_like(pos)
-    
-    # Resorte O1-C
-    dx1 = pos[1] - pos[0]
-    f12 = k * (dx1 - r_eq)
-    f[0] += f12
-    f[1] -= f12
-    
-    # Resorte C-O2
-    dx2 = pos[2] - pos[1]
-    f23 = k * (dx2 - r_eq)
-    f[1] += f23
-    f[2] -= f23
-    
-    return f
+# Resortes O1-C y C-O2
+bonds = HarmonicBonds([0, 1], [1, 2], k, r_eq)
+
+
+def make_system(dt=dt):
+    """Estado inicial e integrador (usado también por benchmark-suite.py)."""
+    state = State(positions, velocities, masses)
+
+    # Algoritmo Velocity Verlet en un kernel fusionado (numba si está instalado):
+    #   Paso 1: v += F/(2m) dt ; x += v dt
+    #   Paso 2: F = F(x)         (se reutiliza al inicio del paso siguiente)
+    #   Paso 3: v += F/(2m) dt
+    return state, FusedVerlet(bonds, dt)
+
 
-# Algoritmo Velocity Verlet
-trajectory = [positions.copy()]
-forces_old = compute_forces(positions)
+def run_simulation(steps=steps, dt=dt):
+    """Integra la molécula y devuelve la trayectoria (pasos + 1, átomos)."""
+    state, integrator = make_system(dt)
+    trajectory = TrajectoryRecorder.for_run(positions.shape, steps)
+    trajectory.append(state.positions)
+    integrator.run(state, steps, callbacks=[lambda s: trajectory.append(s.positions)])
+    return trajectory.frames()
 
-for _ in range(steps):
-    # Paso 1: Actualizar posiciones
-    positions += velocities * dt + 0.5 * forces_old / masses * dt**2
-    
-    # Paso 2: Calcular nuevas fuerzas
-    forces_new = compute_forces(positions)
-    
-    # Paso 3: Actualizar velocidades
-    velocities += 0.5 * (forces_old + forces_new) / masses * dt
-    
-    # Guardar estado y preparar siguiente iteración
-    trajectory.append(positions.copy())
-    forces_old = forces_new.copy()
 
-trajectory = np.array(trajectory)
+if __name__ == "__main__":
+    trajectory = run_simulation()
 
-# Graficar resultados
-plt.figure(figsize=(10, 5))
-plt.plot(trajectory[:, 0], label='Oxígeno 1 (O1)', color='red')
-plt.plot(trajectory[:, 1], label='Carbono (C)', color='black')
-plt.plot(trajectory[:, 2], label='Oxígeno 2 (O2)', color='blue')
-plt.xlabel("Paso de tiempo")
-plt.ylabel("Posición (1D)")
-plt.title("Oscilaciones de CO₂ con Velocity Verlet")
-plt.legend()
-plt.grid(True)
-plt.show()
+    # Graficar resultados
+    plt.figure(figsize=(10, 5))
+    plt.plot(trajectory[:, 0], label='Oxígeno 1 (O1)', color='red')
+    plt.plot(trajectory[:, 1], label='Carbono (C)', color='black')
+    plt.plot(trajectory[:, 2], label='Oxígeno 2 (O2)', color='blue')
+    plt.xlabel("Paso de tiempo")
+    plt.ylabel("Posición (1D)")
+    plt.title("Oscilaciones de CO₂ con Velocity Verlet")
+    plt.legend()
+    plt.grid(True)
+    plt.show()
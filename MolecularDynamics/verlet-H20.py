@@ -1,12 +1,16 @@
 import numpy as np
 import matplotlib.pyplot as plt
 
+from md import BAOAB, BondConstraints, HarmonicBonds, State, TrajectoryRecorder
+from md.analysis import trajectory_geometry
+
 # Parámetros físicos
 k = 100.0          # Constante del resorte (kcal/mol/Å²)
 r_eq = 0.96        # Longitud de enlace O-H (Å)
 dt = 0.001         # Paso de tiempo
 steps = 10000
 gamma = 1.0        # Coeficiente de fricción (disipación)
+rigid_bonds = False  # enlaces O-H rígidos (SHAKE/RATTLE) en lugar de resortes
 
 # Posiciones iniciales (Oxígeno en el centro)
 positions = np.array([
@@ -19,65 +23,71 @@ positions = np.array([
 velocities = np.zeros_like(positions)
 
 # Masas (aproximadas)
-masses = np.array([16.0, 1.0, 1.0]).reshape(-1, 1)
-
-# Almacenar historia
-pos_history = [positions.copy()]
-vel_history = [velocities.copy()]
-
-# Función de fuerza por resorte
-def spring_force(r_vec, r0, k):
-    dist = np.linalg.norm(r_vec)
-    if dist == 0:
-        return np.zeros_like(r_vec)
-    direction = r_vec / dist
-    return -k * (dist - r0) * direction
-
-# Simulación con dinámica molecular y disipación (Langevin simplificado)
-for step in range(steps):
-    forces = np.zeros_like(positions)
-
-    # Fuerzas del oxígeno a cada hidrógeno
-    for i in [1, 2]:
-        r_vec = positions[i] - positions[0]
-        f = spring_force(r_vec, r_eq, k)
-        forces[i] += f
-        forces[0] -= f
-
-    # Agregar fricción (fuerza viscosa proporcional a velocidad)
-    forces -= gamma * velocities
-
-    # Actualización por integración tipo Verlet con velocidad (Velocity-Verlet)
-    accelerations = forces / masses
-    velocities += accelerations * dt
-    positions += velocities * dt
-
-    pos_history.append(positions.copy())
-    vel_history.append(velocities.copy())
-
-# Convertir a arrays para análisis
-pos_history = np.array(pos_history)  # shape: (steps, 3, 2)
-vel_history = np.array(vel_history)
-
-# Graficar evolución de posición x en el tiempo para cada átomo
-t = np.arange(steps + 1) * dt
-plt.figure(figsize=(10, 6))
-for i, label in enumerate(['Oxígeno', 'Hidrógeno 1', 'Hidrógeno 2']):
-    plt.plot(t, pos_history[:, i, 0], label=f'{label} - x')
-plt.xlabel('Tiempo (ps)')
-plt.ylabel('Posición x (Å)')
-plt.title('Relajación de posiciones - coordenada x')
-plt.legend()
-plt.grid()
-plt.show()
-
-# Graficar estado de fase (posición vs velocidad en x)
-plt.figure(figsize=(8, 6))
-for i, label in enumerate(['Oxígeno', 'Hidrógeno 1', 'Hidrógeno 2']):
-    plt.plot(pos_history[:, i, 0], vel_history[:, i, 0], label=label)
-plt.xlabel('Posición x (Å)')
-plt.ylabel('Velocidad x (Å/ps)')
-plt.title('Estado de fase - coordenada x')
-plt.legend()
-plt.grid()
-plt.show()
\ No newline at end of file
+masses = np.array([16.0, 1.0, 1.0])
+
+# Resortes O-H1 y O-H2 (enlaces de longitud cero no aportan fuerza)
+bonds = HarmonicBonds.star(0, [1, 2], k, r_eq)
+
+
+def make_system(dt=dt):
+    """Estado inicial e integrador (usado también por benchmark-suite.py)."""
+    state = State(positions, velocities, masses)
+
+    # Dinámica molecular con disipación: velocity Verlet para los resortes y
+    # fricción -γv integrada exactamente (BAOAB con kT = 0). El esquema
+    # anterior era un Euler semi-implícito, no un velocity Verlet.
+    # Con enlaces rígidos los resortes salen del campo de fuerzas.
+    if rigid_bonds:
+        integrator = BAOAB([], dt, friction=gamma, constraints=BondConstraints.from_bonds(bonds))
+    else:
+        integrator = BAOAB(bonds, dt, friction=gamma)
+    return state, integrator
+
+
+def run_simulation(steps=steps, dt=dt):
+    """Devuelve las historias de posiciones y velocidades (pasos + 1, 3, 2)."""
+    state, integrator = make_system(dt)
+
+    # Almacenar historia
+    pos_history = TrajectoryRecorder.for_run(positions.shape, steps)
+    vel_history = TrajectoryRecorder.for_run(velocities.shape, steps)
+
+    def record(s):
+        pos_history.append(s.positions)
+        vel_history.append(s.velocities)
+
+    record(state)
+    integrator.run(state, steps, callbacks=[record])
+    return pos_history.frames(), vel_history.frames()
+
+
+if __name__ == "__main__":
+    pos_history, vel_history = run_simulation()  # shape: (steps + 1, 3, 2)
+
+    # Longitudes O-H y ángulo H-O-H de todos los cuadros en una pasada
+    t = np.arange(steps + 1) * dt
+    geometry = trajectory_geometry(pos_history, bonds, ([1], [0], [2]))
+    fig, (ax_r, ax_theta) = plt.subplots(2, 1, figsize=(10, 8), sharex=True)
+    for b, label in enumerate(['O-H1', 'O-H2']):
+        ax_r.plot(t, geometry['lengths'][:, b], label=label)
+    ax_r.axhline(r_eq, ls='--', color='gray', label='r_eq')
+    ax_r.set_ylabel('Longitud de enlace (Å)')
+    ax_r.set_title('Relajación de la geometría')
+    ax_r.legend()
+    ax_r.grid()
+    ax_theta.plot(t, geometry['angles'][:, 0], color='black')
+    ax_theta.set_xlabel('Tiempo (ps)')
+    ax_theta.set_ylabel('Ángulo H-O-H (°)')
+    ax_theta.grid()
+    plt.show()
+
+    # Graficar estado de fase (posición vs velocidad en x)
+    plt.figure(figsize=(8, 6))
+    for i, label in enumerate(['Oxígeno', 'Hidrógeno 1', 'Hidrógeno 2']):
+        plt.plot(pos_history[:, i, 0], vel_history[:, i, 0], label=label)
+    plt.xlabel('Posición x (Å)')
+    plt.ylabel('Velocidad x (Å/ps)')
+    plt.title('Estado de fase - coordenada x')
+    plt.legend()
+    plt.grid()
+    plt.show()
@@ -0,0 +1,82 @@
+import sys
+import time
+
+import numpy as np
+
+from nbody import G_SI, BlockLeapfrog, Bodies, Gravity, Leapfrog, binary, plummer
+
+# ==============================================
+# PARÁMETROS
+# ==============================================
+eta = 0.01          # criterio de jerk: dt_i = η |a| / |ȧ|
+max_level = 12      # pasos desde dt hasta dt / 2^12
+n_cluster = 300     # cuerpos del cúmulo de Plummer
+max_halvings = 14   # dt fijos probados: dt, dt/2, ..., dt/2^max_halvings
+
+# Uso: python benchmark-adaptive.py [η [N]]
+if len(sys.argv) > 1:
+    eta = float(sys.argv[1])
+if len(sys.argv) > 2:
+    n_cluster = int(sys.argv[2])
+
+
+def binary_system():
+    """Órbita excéntrica de binary-system.py: 3 períodos con dt mayor = período / 64."""
+    pos, vel, masses = binary()
+    bodies = Bodies(pos, vel, masses)
+    energy = bodies.kinetic_energy() - G_SI * masses[0] * masses[1] / np.linalg.norm(pos[1] - pos[0])
+    a = -G_SI * masses[0] * masses[1] / (2 * energy)     # semieje mayor
+    period = 2 * np.pi * np.sqrt(a**3 / (G_SI * masses.sum()))
+    return (pos, vel, masses), Gravity(G_SI, method='direct'), period / 64, 3 * period
+
+
+def cluster():
+    """Cúmulo de Plummer con suavizado pequeño: encuentros cercanos en el núcleo."""
+    return plummer(n_cluster, rng=3), Gravity(softening=1e-3, method='direct'), 1 / 32, 1.0
+
+
+def measure(initial, integrator, big_dt, t_end):
+    """Energía muestreada cada paso mayor; devuelve (error, segundos, fuerzas por cuerpo)."""
+    bodies = Bodies(*initial)
+    integrator.evaluate(bodies)
+    e0 = bodies.total_energy()
+    error = [0.0]
+    stride = int(round(big_dt / integrator.dt))
+    n_steps = int(round(t_end / integrator.dt))
+    t0 = time.perf_counter()
+    integrator.run(bodies, n_steps, callbacks=[lambda b: error.append(abs(b.total_energy() / e0 - 1))],
+                   stride=stride)
+    elapsed = time.perf_counter() - t0
+    forces = getattr(integrator, 'n_body_forces', integrator.n_force_calls * len(bodies))
+    return max(error), elapsed, forces
+
+
+if __name__ == "__main__":
+    for name, make in [("binario de binary-system.py", binary_system),
+                       (f"cúmulo de Plummer N={n_cluster}", cluster)]:
+        initial, gravity, big_dt, t_end = make()
+        n = len(initial[2])
+        block = BlockLeapfrog(gravity, big_dt, eta=eta, max_level=max_level)
+        err_b, t_b, f_b = measure(initial, block, big_dt, t_end)
+
+        print(f"== {name}: dt mayor = {big_dt:.3g}, η = {eta}")
+        print("histograma de pasos (dt -> pasos de cuerpo):")
+        total = block.histogram.sum()
+        for dt, count in block.step_sizes().items():
+            print(f"  {dt:>10.3g}: {count:>8}  {'#' * max(1, int(40 * count / total))}")
+        print(f"pasos por bloques: |ΔE/E| = {err_b:.2e}, {f_b} fuerzas por cuerpo, {t_b:.3f} s")
+
+        # Paso fijo: se reduce a la mitad hasta igualar el error de los bloques
+        fixed = []
+        for k in range(max_halvings + 1):
+            dt = big_dt / 2**k
+            err, t, f = measure(initial, Leapfrog(gravity, dt), big_dt, t_end)
+            fixed.append((dt, err, t, f))
+            if err <= err_b:
+                break
+        # El error del leapfrog escala como dt²: se interpola al error de los bloques
+        dt, err, t, f = min(fixed, key=lambda x: abs(np.log(x[1] / err_b)))
+        scale = 1 / np.sqrt(err_b / err)
+        print(f"paso fijo a igual error: dt ≈ {dt * np.sqrt(err_b / err):.3g}, "
+              f"{f * scale:.0f} fuerzas por cuerpo, {t * scale:.3f} s")
+        print(f"aceleración: {f * scale / f_b:.1f}x en fuerzas, {t * scale / t_b:.1f}x en tiempo\n")
@@ -0,0 +1,58 @@
+import sys
+import time
+
+import numpy as np
+
+from nbody import HAVE_NUMBA, Gravity, direct_accelerations, plummer
+
+# ==============================================
+# PARÁMETROS (UNIDADES N-CUERPOS: G = M = a = 1)
+# ==============================================
+n_bodies = 20000
+thetas = [0.0, 0.2, 0.3, 0.5, 0.7, 1.0]
+softening = 0.01
+n_sample = 1000  # cuerpos con referencia exacta (la suma directa completa es O(N²))
+
+# Uso: python benchmark-barnes-hut.py [N [θ1 θ2 ...]]
+if len(sys.argv) > 1:
+    n_bodies = int(float(sys.argv[1]))
+if len(sys.argv) > 2:
+    thetas = [float(a) for a in sys.argv[2:]]
+
+
+def timed(fn):
+    t0 = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - t0
+
+
+if __name__ == "__main__":
+    rng = np.random.default_rng(0)
+    pos, vel, masses = plummer(n_bodies, rng=rng)
+    sample = rng.choice(n_bodies, size=min(n_sample, n_bodies), replace=False)
+
+    (ref, _), t_sample = timed(lambda: direct_accelerations(pos, masses, softening=softening,
+                                                            targets=sample))
+    ref_norm = np.linalg.norm(ref, axis=1)
+    t_direct = t_sample * n_bodies / len(sample)
+    if n_bodies <= 20000:
+        _, t_direct = timed(lambda: Gravity(softening=softening, method='direct').accelerations(pos, masses))
+
+    print(f"N = {n_bodies} cuerpos (Plummer), ε = {softening}, referencia sobre {len(sample)} cuerpos")
+    print(f"suma directa O(N²): {t_direct:.3f} s por evaluación"
+          + (" (estimado)" if n_bodies > 20000 else "") + "\n")
+
+    backends = ['numba', 'numpy'] if HAVE_NUMBA else ['numpy']
+    if HAVE_NUMBA:
+        Gravity(softening=softening, backend='numba').accelerations(pos[:100], masses[:100])  # JIT
+    print(f"{'backend':>8} {'θ':>5} {'nodos':>8} {'tiempo [s]':>11} {'aceleración':>12} "
+          f"{'err. mediano':>13} {'err. p99':>10}")
+    for backend in backends:
+        for theta in thetas:
+            if backend == 'numpy' and theta == 0.0 and n_bodies > 5000:
+                continue  # θ = 0 recorre el árbol hasta cada hoja: solo como control
+            gravity = Gravity(theta=theta, softening=softening, backend=backend)
+            (acc, _), t = timed(lambda: gravity.accelerations(pos, masses))
+            err = np.linalg.norm(acc[sample] - ref, axis=1) / ref_norm
+            print(f"{backend:>8} {theta:>5.2f} {len(gravity.tree):>8} {t:>11.3f} "
+                  f"{t_direct / t:>11.1f}x {np.median(err):>13.1e} {np.percentile(err, 99):>10.1e}")
@@ -1,34 +1,103 @@
-from vpython import *
+import argparse
+import time
 
-scene.caption = ""
-scene.forward = vector(0,-.3,-1)
+from nbody import G_SI, Bodies, Engine, Gravity, Leapfrog, TrajectoryBuffer, binary, replay
 
-G = 6.7e-11 # Constante Gravitacional
-
-#Primer Objeto
-giant = sphere(pos=vector(-1e11,0,0), radius=2e10, color=color.red, 
-                make_trail=True, trail_type='points', interval=10, retain=50)
-# Su masa
-giant.mass = 2e30
-giant.p = vector(0, 0, -1e4) * giant.mass
-
-#Segundo Objeto
-dwarf = sphere(pos=vector(1.5e11,0,0), radius=1e10, color=color.yellow,
-                make_trail=True, interval=10, retain=50)
-# Su masa
-dwarf.mass = 1e30
-dwarf.p = -giant.p
+G = G_SI # Constante Gravitacional
 
 # Paso de tiempo
 dt = 1e5
-while True:
-    rate(200)
-    r = dwarf.pos - giant.pos # Distancia entre ambos objetos
-    F = G * giant.mass * dwarf.mass * r.hat / mag2(r) # Fuerza gravitacional    
-    # ¿Que unidades fisicas tiene giant.p?     
-    giant.p = giant.p + F*dt
-    # ¿Que unidades fisicas tiene dwarf.p?    
-    dwarf.p = dwarf.p - F*dt
-    # ¿A que ecuacion de cinematica se les parece estas ecuaciones?     
-    giant.pos = giant.pos + (giant.p/giant.mass) * dt 
-    dwarf.pos = dwarf.pos + (dwarf.p/dwarf.mass) * dt
\ No newline at end of file
+# Cuadros por segundo y pasos de física por cuadro al visualizar
+# (50 × 4 = 200 pasos por segundo, como el rate(200) original)
+frame_rate = 50
+steps_per_frame = 4
+
+
+def make_system():
+    """Gigante y enana con leapfrog kick-drift-kick y suma directa (exacta)."""
+    # Posiciones, velocidades y masas de los dos cuerpos (en SI)
+    bodies = Bodies(*binary())
+    # Kick: p += F dt/2, drift: x += (p/m) dt, kick: p += F dt/2
+    # ¿Que unidades fisicas tiene bodies.momenta?
+    # ¿A que ecuacion de cinematica se les parece estas ecuaciones?
+    integrator = Leapfrog(Gravity(G, method='direct'), dt)
+    return bodies, integrator
+
+
+def make_scene(positions):
+    """Escena de VPython; solo se importa vpython si se va a dibujar."""
+    from vpython import color, rate, scene, sphere, vector
+
+    scene.caption = ""
+    scene.forward = vector(0,-.3,-1)
+
+    #Primer Objeto
+    giant = sphere(pos=vector(*positions[0]), radius=2e10, color=color.red,
+                    make_trail=True, trail_type='points', interval=10, retain=50)
+
+    #Segundo Objeto
+    dwarf = sphere(pos=vector(*positions[1]), radius=1e10, color=color.yellow,
+                    make_trail=True, interval=10, retain=50)
+
+    def draw(positions, t=None):
+        giant.pos = vector(*positions[0])
+        dwarf.pos = vector(*positions[1])
+
+    return draw, rate
+
+
+def run_headless(steps=None, t_end=None, record_every=10, output=None):
+    """Integra a toda velocidad sin VPython y devuelve el motor (con su trayectoria)."""
+    bodies, integrator = make_system()
+    engine = Engine(integrator, bodies, record_every=record_every)
+    integrator.evaluate(bodies)
+    e0 = bodies.total_energy()
+    t0 = time.perf_counter()
+    engine.run(steps=steps, t_end=t_end)
+    elapsed = time.perf_counter() - t0
+    print(f"{bodies.step} pasos (t = {bodies.time:.3e} s) en {elapsed:.2f} s: "
+          f"{bodies.step / elapsed:.0f} pasos/s, ΔE/E = {bodies.total_energy() / e0 - 1:.2e}")
+    if output is not None and engine.buffer is not None:
+        engine.buffer.save(output)
+        print(f"{len(engine.buffer)} cuadros guardados en {output}")
+    return engine
+
+
+def run_visual(steps=None, t_end=None):
+    """Visualización en vivo: ``steps_per_frame`` pasos por cuadro a ``frame_rate`` cuadros/s."""
+    bodies, integrator = make_system()
+    draw, rate = make_scene(bodies.positions)
+    Engine(integrator, bodies).animate(lambda b: draw(b.positions), steps=steps, t_end=t_end,
+                                       frame_rate=frame_rate, steps_per_frame=steps_per_frame,
+                                       rate=rate)
+
+
+def run_replay(path, every=1):
+    """Reproduce una trayectoria guardada con --headless --output, diezmada."""
+    buffer = TrajectoryBuffer.load(path)
+    draw, rate = make_scene(buffer.positions[0])
+    replay(buffer, draw, every=every, frame_rate=frame_rate, rate=rate)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Sistema binario gravitacional")
+    parser.add_argument('--headless', action='store_true',
+                        help="integrar sin VPython y sin límite de velocidad")
+    parser.add_argument('--steps', type=int, help="número de pasos")
+    parser.add_argument('--t-end', type=float, help="tiempo simulado final [s]")
+    parser.add_argument('--record-every', type=int, default=10,
+                        help="pasos entre cuadros grabados (modo headless)")
+    parser.add_argument('--output', help="archivo .npz para la trayectoria (modo headless)")
+    parser.add_argument('--replay', help="reproducir una trayectoria .npz guardada")
+    parser.add_argument('--every', type=int, default=1, help="diezmado de la reproducción")
+    args = parser.parse_args()
+
+    if args.replay:
+        run_replay(args.replay, args.every)
+    elif args.headless:
+        if args.steps is None and args.t_end is None:
+            parser.error("--headless requiere --steps o --t-end")
+        run_headless(args.steps, args.t_end, args.record_every, args.output)
+    else:
+        # Sin --steps ni --t-end la animación corre indefinidamente, como antes
+        run_visual(args.steps, args.t_end)
@@ -0,0 +1,28 @@
+"""
+Motor de N cuerpos gravitacionales para los ejemplos de VPython.
+
+Generaliza binary-system.py: gravedad por suma directa o árbol de
+Barnes-Hut e integración leapfrog kick-drift-kick, sin depender de VPython.
+"""
+from .adaptive import BlockLeapfrog
+from .engine import Engine, TrajectoryBuffer, replay
+from .gravity import HAVE_NUMBA, Gravity, Octree, direct_accelerations, select_backend
+from .integrators import Bodies, Leapfrog
+from .models import G_SI, binary, plummer
+
+__all__ = [
+    "BlockLeapfrog",
+    "Bodies",
+    "Engine",
+    "G_SI",
+    "Gravity",
+    "HAVE_NUMBA",
+    "Leapfrog",
+    "Octree",
+    "TrajectoryBuffer",
+    "binary",
+    "direct_accelerations",
+    "plummer",
+    "replay",
+    "select_backend",
+]
@@ -0,0 +1,139 @@
+"""
+Pasos de tiempo jerárquicos por bloques (block time steps).
+
+Cada cuerpo i avanza con su propio paso dt_i = dt / 2^k_i (nivel k_i),
+elegido con el criterio de Aarseth sobre la aceleración y su derivada
+(jerk): dt_i = η |a_i| / |ȧ_i|, acotado además por sqrt(2 η_a ε / |a_i|)
+si hay suavizado. Los pasos son potencias de dos del paso mayor ``dt``, de
+modo que todos los cuerpos se sincronizan al final de cada paso mayor.
+
+Dentro de un paso mayor el tiempo avanza por eventos: se derivan todos
+los cuerpos hasta el próximo fin de paso, y solo los cuerpos que terminan
+ahí (los *activos*) reciben fuerzas y sus dos medios kicks de leapfrog
+KDK. Un encuentro cercano solo encoge el paso de los cuerpos implicados.
+
+El jerk se estima por diferencias: (a_fin - a_inicio)/dt_i al cerrar el
+paso de cada cuerpo; el inicial, con una evaluación extra a x + v δ.
+"""
+import numpy as np
+
+
+class BlockLeapfrog:
+    """Leapfrog KDK con pasos individuales dt/2^k, k = 0..``max_level``.
+
+    Tiene la interfaz de ``nbody.Leapfrog`` (``step`` avanza un paso mayor
+    ``dt``), así que funciona con ``Engine``. ``histogram[k]`` cuenta los
+    pasos de cuerpo dados en el nivel k y ``n_body_forces`` las fuerzas
+    calculadas sobre cuerpos individuales (N por evaluación completa).
+    """
+
+    def __init__(self, gravity, dt, eta=0.02, eta_acc=None, max_level=12):
+        self.gravity = gravity
+        self.dt = float(dt)
+        self.eta = float(eta)
+        self.eta_acc = self.eta if eta_acc is None else float(eta_acc)
+        self.max_level = int(max_level)
+        self.histogram = np.zeros(self.max_level + 1, dtype=np.int64)
+        self.n_force_calls = 0
+        self.n_body_forces = 0
+        self.level = None
+
+    # Criterio de paso
+    def timestep_levels(self, acc, jerk):
+        """Nivel k de cada cuerpo según los criterios de aceleración y jerk."""
+        a = np.linalg.norm(acc, axis=1)
+        j = np.linalg.norm(jerk, axis=1)
+        tiny = np.finfo(float).tiny
+        dt_i = np.where(j > tiny, self.eta * a / np.maximum(j, tiny), self.dt)
+        if self.gravity.softening > 0:
+            dt_i = np.minimum(dt_i, np.sqrt(2 * self.eta_acc * self.gravity.softening
+                                            / np.maximum(a, tiny)))
+        ratio = self.dt / np.maximum(dt_i, tiny)
+        level = np.ceil(np.log2(np.maximum(ratio, 1.0))).astype(np.intp)
+        return np.minimum(level, self.max_level)
+
+    def _forces(self, bodies, targets):
+        acc, phi = self.gravity.partial_accelerations(bodies.positions, bodies.masses, targets)
+        self.n_force_calls += 1
+        self.n_body_forces += len(acc)
+        return acc, phi
+
+    def evaluate(self, bodies):
+        """Aceleraciones de todos los cuerpos, jerk inicial y niveles."""
+        acc, phi = self._forces(bodies, None)
+        bodies.acc[...] = acc
+        bodies.pe = 0.5 * float(np.dot(bodies.masses, phi))
+        # Jerk ≈ (a(x + v δ) - a(x)) / δ con δ el paso más fino
+        delta = self.dt / 2 ** self.max_level
+        saved = bodies.positions.copy()
+        bodies.positions += delta * bodies.velocities
+        probe, _ = self._forces(bodies, None)
+        bodies.positions[...] = saved
+        self.level = self.timestep_levels(acc, (probe - acc) / delta)
+        bodies.has_acc = True
+        return bodies.acc
+
+    def step(self, bodies):
+        """Avanza un paso mayor ``dt``; al final todos los cuerpos quedan sincronizados."""
+        if not bodies.has_acc or self.level is None:
+            self.evaluate(bodies)
+        ticks = 1 << self.max_level         # paso más fino = dt / ticks
+        h = self.dt / ticks
+        level = self.level
+        length = ticks >> level             # duración de cada paso en ticks
+        end = length.copy()
+        acc_start = bodies.acc.copy()
+        bodies.velocities += (0.5 * h * length)[:, None] * bodies.acc   # kicks de apertura
+
+        now = 0
+        while now < ticks:
+            nxt = int(end.min())
+            bodies.positions += ((nxt - now) * h) * bodies.velocities   # drift de todos
+            now = nxt
+            active = np.flatnonzero(end == now)
+            acc, phi = self._forces(bodies, active)
+            dt_active = (h * length[active])[:, None]
+            bodies.velocities[active] += 0.5 * dt_active * acc         # kicks de cierre
+            jerk = (acc - acc_start[active]) / dt_active
+            bodies.acc[active] = acc
+            np.add.at(self.histogram, level[active], 1)
+
+            new = np.maximum(self.timestep_levels(acc, jerk), level[active] - 1)
+            if now < ticks:
+                # Solo se puede alargar el paso si el nuevo bloque empieza alineado
+                aligned = self.max_level - ((now & -now).bit_length() - 1)
+                new = np.maximum(new, aligned)
+                level[active] = new
+                length[active] = ticks >> new
+                end[active] = now + length[active]
+                acc_start[active] = acc
+                bodies.velocities[active] += (0.5 * h * length[active])[:, None] * acc
+            else:
+                # Fin del paso mayor: todos activos, el potencial sale completo
+                level[active] = new
+                bodies.pe = 0.5 * float(np.dot(bodies.masses[active], phi))
+
+    def advance(self, bodies, n_steps):
+        """Avanza ``n_steps`` pasos mayores sin callbacks."""
+        for _ in range(n_steps):
+            self.step(bodies)
+        bodies.step += n_steps
+        bodies.time += n_steps * self.dt
+
+    def run(self, bodies, n_steps, callbacks=(), stride=1):
+        """Avanza ``n_steps`` pasos mayores y llama ``cb(bodies)`` cada ``stride``."""
+        if not bodies.has_acc or self.level is None:
+            self.evaluate(bodies)
+        done = 0
+        while done < n_steps:
+            chunk = min(stride - bodies.step % stride, n_steps - done)
+            self.advance(bodies, chunk)
+            done += chunk
+            if bodies.step % stride == 0:
+                for callback in callbacks:
+                    callback(bodies)
+        return bodies
+
+    def step_sizes(self):
+        """Histograma {dt_k: pasos de cuerpo} de los niveles usados."""
+        return {self.dt / 2 ** k: int(n) for k, n in enumerate(self.histogram) if n}
@@ -0,0 +1,138 @@
+"""
+Motor de ejecución sin límite de velocidad, con o sin visualización.
+
+``Engine.run`` integra a toda velocidad durante un número de pasos o hasta
+un tiempo simulado, sin dibujar nada, y va guardando estados en un
+``TrajectoryBuffer``. ``Engine.animate`` alimenta una escena (VPython u
+otra) a una tasa fija de cuadros: entre dos cuadros se integran
+``steps_per_frame`` pasos, de modo que la física no queda atada a la tasa
+de dibujo. Una trayectoria guardada se puede reproducir diezmada después.
+"""
+import math
+
+import numpy as np
+
+
+# ==============================================
+# BÚFER DE TRAYECTORIA
+# ==============================================
+class TrajectoryBuffer:
+    """Posiciones (cuadros, N, 3) y tiempos preasignados; crece al doble si se llena."""
+
+    def __init__(self, n_bodies, capacity=1024, masses=None):
+        self.positions = np.empty((max(capacity, 1), n_bodies, 3))
+        self.times = np.empty(max(capacity, 1))
+        self.masses = None if masses is None else np.asarray(masses, dtype=float)
+        self.n_frames = 0
+
+    def record(self, bodies):
+        if self.n_frames == len(self.times):
+            self._grow()
+        self.positions[self.n_frames] = bodies.positions
+        self.times[self.n_frames] = bodies.time
+        self.n_frames += 1
+
+    def _grow(self):
+        capacity = 2 * len(self.times)
+        positions = np.empty((capacity,) + self.positions.shape[1:])
+        positions[:self.n_frames] = self.positions[:self.n_frames]
+        times = np.empty(capacity)
+        times[:self.n_frames] = self.times[:self.n_frames]
+        self.positions, self.times = positions, times
+
+    def frames(self, every=1):
+        """Vistas (positions, times) de los cuadros grabados, cada ``every``."""
+        return self.positions[:self.n_frames:every], self.times[:self.n_frames:every]
+
+    def __len__(self):
+        return self.n_frames
+
+    def save(self, path):
+        """Guarda los cuadros grabados en un .npz."""
+        positions, times = self.frames()
+        extra = {} if self.masses is None else {'masses': self.masses}
+        np.savez(path, positions=positions, times=times, **extra)
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as data:
+            positions = data['positions']
+            buffer = cls(positions.shape[1], len(positions),
+                         data['masses'] if 'masses' in data else None)
+            buffer.positions[:len(positions)] = positions
+            buffer.times[:len(positions)] = data['times']
+            buffer.n_frames = len(positions)
+        return buffer
+
+
+# ==============================================
+# MOTOR
+# ==============================================
+class Engine:
+    """Ejecuta un integrador de ``nbody`` sobre ``bodies``.
+
+    Con ``record_every > 0`` se graba un cuadro cada ``record_every`` pasos
+    (más el estado inicial) en ``self.buffer``.
+    """
+
+    def __init__(self, integrator, bodies, record_every=0):
+        self.integrator = integrator
+        self.bodies = bodies
+        self.record_every = int(record_every)
+        self.buffer = None
+
+    def n_steps(self, steps=None, t_end=None):
+        """Pasos a ejecutar: ``steps`` o los necesarios para llegar a ``t_end``."""
+        if steps is not None:
+            return int(steps)
+        if t_end is not None:
+            return max(0, math.ceil((t_end - self.bodies.time) / self.integrator.dt - 1e-9))
+        return None
+
+    def _callbacks(self, n_steps, callbacks):
+        if not self.record_every:
+            return list(callbacks)
+        if self.buffer is None:
+            capacity = 1024 if n_steps is None else n_steps // self.record_every + 1
+            self.buffer = TrajectoryBuffer(len(self.bodies), capacity, self.bodies.masses)
+            self.buffer.record(self.bodies)
+        return [self.buffer.record] + list(callbacks)
+
+    def run(self, steps=None, t_end=None, callbacks=()):
+        """Integra sin dibujar durante ``steps`` pasos o hasta ``t_end``."""
+        n_steps = self.n_steps(steps, t_end)
+        if n_steps is None:
+            raise ValueError("indique steps o t_end")
+        stride = self.record_every or max(n_steps, 1)
+        self.integrator.run(self.bodies, n_steps, callbacks=self._callbacks(n_steps, callbacks),
+                            stride=stride)
+        return self.bodies
+
+    def animate(self, draw, steps=None, t_end=None, frame_rate=30, steps_per_frame=1, rate=None):
+        """Llama ``draw(bodies)`` ``frame_rate`` veces por segundo.
+
+        Entre dos cuadros se integran ``steps_per_frame`` pasos. ``rate`` es
+        la función que limita la tasa de cuadros (``vpython.rate``). Sin
+        ``steps`` ni ``t_end`` corre indefinidamente.
+        """
+        n_steps = self.n_steps(steps, t_end)
+        callbacks = self._callbacks(n_steps, ())
+        stride = self.record_every or steps_per_frame
+        done = 0
+        while n_steps is None or done < n_steps:
+            chunk = steps_per_frame if n_steps is None else min(steps_per_frame, n_steps - done)
+            self.integrator.run(self.bodies, chunk, callbacks=callbacks, stride=stride)
+            done += chunk
+            draw(self.bodies)
+            if rate is not None:
+                rate(frame_rate)
+        return self.bodies
+
+
+def replay(buffer, draw, every=1, frame_rate=30, rate=None):
+    """Dibuja cada ``every`` cuadros de un ``TrajectoryBuffer`` (reproducción diezmada)."""
+    positions, times = buffer.frames(every)
+    for frame, t in zip(positions, times):
+        draw(frame, t)
+        if rate is not None:
+            rate(frame_rate)
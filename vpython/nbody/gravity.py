@@ -0,0 +1,440 @@
+"""
+Gravedad de N cuerpos: suma directa O(N²) y árbol de Barnes-Hut O(N log N).
+
+El octree se construye en cada paso ordenando los cuerpos por su código de
+Morton (curva Z): cada celda del árbol es entonces un rango contiguo del
+arreglo ordenado y toda la construcción son operaciones vectorizadas por
+nivel. Cada nodo guarda masa, centro de masa y lado de la celda.
+
+En el recorrido una celda de lado s a distancia d del cuerpo se aproxima
+por su centro de masa si s/d < θ (``theta``); si no, se abre y se
+visitan sus hijos, o sus cuerpos uno a uno si es una hoja. Con θ = 0 el
+resultado coincide con la suma directa.
+
+Ambos modos aceptan un suavizado de Plummer ``softening`` (ε): la
+interacción usa r² + ε² en lugar de r².
+"""
+import os
+
+import numpy as np
+
+try:
+    from numba import njit, prange
+except ImportError:  # numba es opcional
+    njit = None
+
+HAVE_NUMBA = njit is not None
+BACKENDS = ('numba', 'numpy')
+MAX_DEPTH = 21  # 3 × 21 bits caben en un código de Morton de 64 bits
+
+
+def select_backend(name=None):
+    """Devuelve el backend pedido, el de ``NBODY_BACKEND`` o el mejor disponible."""
+    name = name or os.environ.get('NBODY_BACKEND') or ('numba' if HAVE_NUMBA else 'numpy')
+    if name not in BACKENDS:
+        raise ValueError(f"backend desconocido: {name!r} (opciones: {BACKENDS})")
+    if name == 'numba' and not HAVE_NUMBA:
+        raise ImportError("el backend 'numba' requiere tener numba instalado")
+    return name
+
+
+def _expand_ranges(starts, ends):
+    """Concatenación de arange(s, e) para cada par; también devuelve a qué par pertenece."""
+    lengths = ends - starts
+    owner = np.repeat(np.arange(len(starts)), lengths)
+    offsets = np.cumsum(lengths) - lengths
+    return starts[owner] + np.arange(len(owner)) - offsets[owner], owner
+
+
+# ==============================================
+# SUMA DIRECTA
+# ==============================================
+def direct_accelerations(pos, masses, G=1.0, softening=0.0, targets=None, chunk=1 << 16):
+    """Aceleraciones y potenciales exactos por suma directa vectorizada.
+
+    ``targets`` (índices) limita el cálculo a un subconjunto de cuerpos,
+    útil como referencia en sistemas grandes. Los pares se procesan en
+    bloques de a lo sumo ``chunk`` interacciones. Devuelve (acc, phi) para
+    los cuerpos pedidos.
+    """
+    pos = np.asarray(pos, dtype=float)
+    masses = np.asarray(masses, dtype=float)
+    targets = np.arange(len(pos)) if targets is None else np.asarray(targets, dtype=np.intp)
+    acc = np.empty((len(targets), pos.shape[1]))
+    phi = np.empty(len(targets))
+    eps2 = softening * softening
+    coords = np.ascontiguousarray(pos.T)  # una fila contigua por componente
+    block = max(1, chunk // max(len(pos), 1))
+    for s in range(0, len(targets), block):
+        t = targets[s:s + block]
+        # Diferencias por componente: evita los arreglos (bloque, N, 3) con paso 3
+        d = [c[None, :] - c[t, None] for c in coords]
+        w = d[0] * d[0]
+        for dk in d[1:]:
+            w += dk * dk
+        w += eps2
+        w[np.arange(len(t)), t] = np.inf  # sin autointeracción
+        np.sqrt(w, out=w)
+        np.divide(1.0, w, out=w)                  # 1/r
+        phi[s:s + block] = -G * (w @ masses)
+        w *= w * w                                # 1/r³
+        w *= masses
+        for k, dk in enumerate(d):
+            acc[s:s + block, k] = G * np.einsum('tn,tn->t', w, dk)
+    return acc, phi
+
+
+# ==============================================
+# CONSTRUCCIÓN DEL OCTREE
+# ==============================================
+def _spread_bits(x):
+    """Intercala dos ceros entre los 21 bits bajos de x (uint64)."""
+    x = x & np.uint64(0x1fffff)
+    x = (x | x << np.uint64(32)) & np.uint64(0x1f00000000ffff)
+    x = (x | x << np.uint64(16)) & np.uint64(0x1f0000ff0000ff)
+    x = (x | x << np.uint64(8)) & np.uint64(0x100f00f00f00f00f)
+    x = (x | x << np.uint64(4)) & np.uint64(0x10c30c30c30c30c3)
+    x = (x | x << np.uint64(2)) & np.uint64(0x1249249249249249)
+    return x
+
+
+def morton_codes(pos, lo, side):
+    """Códigos de Morton de 63 bits de las posiciones dentro del cubo [lo, lo + side)."""
+    cells = 1 << MAX_DEPTH
+    ijk = np.clip(((pos - lo) * (cells / side)).astype(np.int64), 0, cells - 1).astype(np.uint64)
+    return (_spread_bits(ijk[:, 0]) << np.uint64(2)) | (_spread_bits(ijk[:, 1]) << np.uint64(1)) \
+        | _spread_bits(ijk[:, 2])
+
+
+class Octree:
+    """Octree plano sobre los cuerpos ordenados por código de Morton.
+
+    Los nodos se guardan en arreglos: ``start``/``end`` (rango de cuerpos
+    en el orden ``order``), ``mass``, ``com`` (centro de masa), ``size``
+    (lado de la celda), ``first_child``/``n_children`` (los hijos de un
+    nodo son contiguos) y ``leaf``. El nodo 0 es la raíz.
+    """
+
+    def __init__(self, pos, masses, leaf_size=8):
+        pos = np.asarray(pos, dtype=float)
+        masses = np.asarray(masses, dtype=float)
+        if pos.ndim != 2 or pos.shape[1] != 3:
+            raise ValueError("el octree necesita posiciones (N, 3)")
+        n = len(pos)
+        lo = pos.min(axis=0)
+        side = float(np.max(pos.max(axis=0) - lo))
+        side = side * (1 + 1e-12) if side > 0 else 1.0
+        codes = morton_codes(pos, lo, side)
+        self.order = np.argsort(codes, kind='stable')
+        self.codes = codes[self.order]
+        self.pos = pos[self.order]
+        self.masses = masses[self.order]
+        self.side = side
+        self.leaf_size = leaf_size
+
+        # Raíz; luego cada nivel agrega los hijos de los nodos con más de leaf_size cuerpos
+        mp = self.pos * self.masses[:, None]
+        total = self.masses.sum()
+        start, end = [np.array([0])], [np.array([n])]
+        depth, parent = [np.array([0])], [np.array([-1])]
+        mass = [np.array([total])]
+        com = [mp.sum(axis=0, keepdims=True) / (total if total > 0 else 1.0)]
+
+        level_ids = np.array([0])
+        level_start, level_end = start[0], end[0]
+        n_nodes = 1
+        for level in range(MAX_DEPTH):
+            split = (level_end - level_start) > leaf_size
+            if not split.any():
+                break
+            idx, _ = _expand_ranges(level_start[split], level_end[split])
+            shift = np.uint64(3 * (MAX_DEPTH - level - 1))
+            key = self.codes[idx] >> shift
+            first = np.concatenate(([0], np.flatnonzero(np.diff(key)) + 1))
+            c_start = idx[first]
+            c_end = np.concatenate((idx[first[1:] - 1] + 1, [idx[-1] + 1]))
+            # Nodo padre de cada hijo: el último nodo dividido que empieza antes
+            split_ids, split_start = level_ids[split], level_start[split]
+            c_parent = split_ids[np.searchsorted(split_start, c_start, side='right') - 1]
+
+            c_mass = np.add.reduceat(self.masses[idx], first)
+            c_com = np.add.reduceat(mp[idx], first, axis=0) / np.where(c_mass > 0, c_mass, 1.0)[:, None]
+
+            level_ids = n_nodes + np.arange(len(c_start))
+            n_nodes += len(c_start)
+            start.append(c_start)
+            end.append(c_end)
+            depth.append(np.full(len(c_start), level + 1))
+            parent.append(c_parent)
+            mass.append(c_mass)
+            com.append(c_com)
+            level_start, level_end = c_start, c_end
+
+        self.start = np.concatenate(start)
+        self.end = np.concatenate(end)
+        self.depth = np.concatenate(depth)
+        self.parent = np.concatenate(parent)
+        self.mass = np.concatenate(mass)
+        self.com = np.concatenate(com)
+        self.size = side / 2.0 ** self.depth
+
+        # Hijos contiguos: primer hijo y cantidad por nodo
+        self.n_children = np.bincount(self.parent[1:], minlength=n_nodes)
+        self.first_child = np.full(n_nodes, -1, dtype=np.intp)
+        has_children = self.n_children > 0
+        self.first_child[has_children] = np.searchsorted(self.parent[1:], np.flatnonzero(has_children)) + 1
+        self.leaf = ~has_children
+
+    def __len__(self):
+        return len(self.start)
+
+
+# ==============================================
+# RECORRIDO DEL ÁRBOL
+# ==============================================
+def _walk_numpy(tree, theta, eps2, chunk, bodies):
+    """Recorrido por frentes: todos los pares (cuerpo, nodo) de un nivel a la vez.
+
+    ``bodies`` son índices en el orden de Morton; el resultado sigue su orden.
+    """
+    n = len(bodies)
+    acc = np.zeros((n, 3))
+    phi = np.zeros(n)
+    theta2 = theta * theta
+    size2 = tree.size * tree.size
+    for a in range(0, n, chunk):
+        slot = np.arange(a, min(a + chunk, n))  # fila de cada par en acc/phi
+        body = bodies[slot]
+        node = np.zeros(len(body), dtype=np.intp)
+        local_acc = acc[a:a + chunk]
+        local_phi = phi[a:a + chunk]
+        while len(body):
+            d = tree.com[node] - tree.pos[body]
+            r2 = np.einsum('bd,bd->b', d, d) + eps2
+            inside = (tree.start[node] <= body) & (body < tree.end[node])
+            far = (size2[node] < theta2 * r2) & ~inside
+            _accumulate(local_acc, local_phi, slot[far] - a, d[far], r2[far], tree.mass[node[far]])
+
+            near = ~far
+            leaf = near & tree.leaf[node]
+            if leaf.any():
+                others, owner = _expand_ranges(tree.start[node[leaf]], tree.end[node[leaf]])
+                targets, rows = body[leaf][owner], slot[leaf][owner]
+                keep = others != targets
+                others, targets, rows = others[keep], targets[keep], rows[keep]
+                dd = tree.pos[others] - tree.pos[targets]
+                rr2 = np.einsum('bd,bd->b', dd, dd) + eps2
+                _accumulate(local_acc, local_phi, rows - a, dd, rr2, tree.masses[others])
+
+            opened = near & ~tree.leaf[node]
+            first = tree.first_child[node[opened]]
+            node, owner = _expand_ranges(first, first + tree.n_children[node[opened]])
+            body, slot = body[opened][owner], slot[opened][owner]
+    return acc, phi
+
+
+def _accumulate(acc, phi, idx, d, r2, m):
+    """Suma m d/r³ y -m/r sobre los cuerpos ``idx`` (scatter-add)."""
+    if len(idx) == 0:
+        return
+    inv_r = 1.0 / np.sqrt(r2)
+    m_inv_r = m * inv_r
+    w = m_inv_r * inv_r * inv_r
+    n = len(phi)
+    for k in range(3):
+        acc[:, k] += np.bincount(idx, weights=w * d[:, k], minlength=n)
+    phi -= np.bincount(idx, weights=m_inv_r, minlength=n)
+
+
+if HAVE_NUMBA:
+    @njit(cache=True, parallel=True)
+    def _walk_nb(pos, masses, com, mass, size2, start, end, first_child, n_children,
+                 theta2, eps2, bodies, acc, phi):
+        for t in prange(bodies.shape[0]):
+            b = bodies[t]
+            stack = np.empty(8 * (MAX_DEPTH + 2), dtype=np.int64)
+            stack[0] = 0
+            top = 1
+            ax = 0.0
+            ay = 0.0
+            az = 0.0
+            p = 0.0
+            x, y, z = pos[b, 0], pos[b, 1], pos[b, 2]
+            while top > 0:
+                top -= 1
+                nd = stack[top]
+                dx = com[nd, 0] - x
+                dy = com[nd, 1] - y
+                dz = com[nd, 2] - z
+                r2 = dx * dx + dy * dy + dz * dz + eps2
+                inside = start[nd] <= b and b < end[nd]
+                if size2[nd] < theta2 * r2 and not inside:
+                    inv_r = 1.0 / np.sqrt(r2)
+                    w = mass[nd] * inv_r * inv_r * inv_r
+                    ax += w * dx
+                    ay += w * dy
+                    az += w * dz
+                    p -= mass[nd] * inv_r
+                elif n_children[nd] == 0:
+                    for k in range(start[nd], end[nd]):
+                        if k == b:
+                            continue
+                        dx = pos[k, 0] - x
+                        dy = pos[k, 1] - y
+                        dz = pos[k, 2] - z
+                        r2 = dx * dx + dy * dy + dz * dz + eps2
+                        inv_r = 1.0 / np.sqrt(r2)
+                        w = masses[k] * inv_r * inv_r * inv_r
+                        ax += w * dx
+                        ay += w * dy
+                        az += w * dz
+                        p -= masses[k] * inv_r
+                else:
+                    for c in range(first_child[nd], first_child[nd] + n_children[nd]):
+                        stack[top] = c
+                        top += 1
+            acc[t, 0] = ax
+            acc[t, 1] = ay
+            acc[t, 2] = az
+            phi[t] = p
+
+    @njit(cache=True, parallel=True)
+    def _direct_nb(pos, masses, eps2, targets, acc, phi):
+        n = pos.shape[0]
+        for t in prange(targets.shape[0]):
+            i = targets[t]
+            ax = 0.0
+            ay = 0.0
+            az = 0.0
+            p = 0.0
+            for j in range(n):
+                if j == i:
+                    continue
+                dx = pos[j, 0] - pos[i, 0]
+                dy = pos[j, 1] - pos[i, 1]
+                dz = pos[j, 2] - pos[i, 2]
+                inv_r = 1.0 / np.sqrt(dx * dx + dy * dy + dz * dz + eps2)
+                w = masses[j] * inv_r * inv_r * inv_r
+                ax += w * dx
+                ay += w * dy
+                az += w * dz
+                p -= masses[j] * inv_r
+            acc[t, 0] = ax
+            acc[t, 1] = ay
+            acc[t, 2] = az
+            phi[t] = p
+
+    @njit(cache=True)
+    def _pair_accelerations_nb(pos, masses, G, eps2, acc):
+        """Suma directa simétrica (cada par una vez); devuelve la energía potencial."""
+        n = pos.shape[0]
+        acc[:, :] = 0.0
+        pe = 0.0
+        for i in range(n):
+            for j in range(i + 1, n):
+                dx = pos[j, 0] - pos[i, 0]
+                dy = pos[j, 1] - pos[i, 1]
+                dz = pos[j, 2] - pos[i, 2]
+                inv_r = 1.0 / np.sqrt(dx * dx + dy * dy + dz * dz + eps2)
+                g = G * inv_r * inv_r * inv_r
+                acc[i, 0] += g * masses[j] * dx
+                acc[i, 1] += g * masses[j] * dy
+                acc[i, 2] += g * masses[j] * dz
+                acc[j, 0] -= g * masses[i] * dx
+                acc[j, 1] -= g * masses[i] * dy
+                acc[j, 2] -= g * masses[i] * dz
+                pe -= G * masses[i] * masses[j] * inv_r
+        return pe
+
+    @njit(cache=True)
+    def kdk_direct_nb(pos, vel, acc, masses, G, eps2, dt, n_steps):
+        """``n_steps`` pasos kick-drift-kick con suma directa en un solo kernel."""
+        n = pos.shape[0]
+        pe = 0.0
+        for _ in range(n_steps):
+            for a in range(n):
+                for d in range(3):
+                    vel[a, d] += 0.5 * dt * acc[a, d]
+                    pos[a, d] += dt * vel[a, d]
+            pe = _pair_accelerations_nb(pos, masses, G, eps2, acc)
+            for a in range(n):
+                for d in range(3):
+                    vel[a, d] += 0.5 * dt * acc[a, d]
+        return pe
+
+
+# ==============================================
+# MOTOR DE GRAVEDAD
+# ==============================================
+class Gravity:
+    """Gravedad newtoniana con ``method='tree'`` (Barnes-Hut) o ``'direct'``.
+
+    ``theta`` es el ángulo de apertura del árbol (0 equivale a la suma
+    directa; 0.5 es el valor habitual), ``softening`` el suavizado de
+    Plummer y ``leaf_size`` el máximo de cuerpos por hoja. ``chunk`` acota
+    la memoria: cuerpos por frente en el recorrido NumPy e interacciones
+    por bloque en la suma directa.
+    """
+
+    def __init__(self, G=1.0, theta=0.5, softening=0.0, method='tree', leaf_size=8,
+                 backend=None, chunk=None):
+        if method not in ('tree', 'direct'):
+            raise ValueError(f"método desconocido: {method!r} (opciones: 'tree', 'direct')")
+        self.G = float(G)
+        self.theta = float(theta)
+        self.softening = float(softening)
+        self.method = method
+        self.leaf_size = int(leaf_size)
+        self.backend = select_backend(backend)
+        self.chunk = chunk
+        self.tree = None
+
+    def accelerations(self, pos, masses, out=None):
+        """Devuelve (acc, pe): aceleraciones (N, 3) y energía potencial total."""
+        masses = np.asarray(masses, dtype=float)
+        acc, phi = self.partial_accelerations(pos, masses)
+        pe = 0.5 * float(np.dot(masses, phi))
+        if out is None:
+            return acc, pe
+        out[...] = acc
+        return out, pe
+
+    def partial_accelerations(self, pos, masses, targets=None):
+        """Aceleraciones y potenciales (acc, phi) sobre los cuerpos ``targets``.
+
+        Todos los cuerpos actúan como fuentes. Sin ``targets`` se calculan
+        para todos; con pasos de tiempo por bloques solo se piden los
+        cuerpos activos.
+        """
+        pos = np.asarray(pos, dtype=float)
+        masses = np.asarray(masses, dtype=float)
+        all_bodies = targets is None
+        targets = np.arange(len(pos)) if all_bodies else np.asarray(targets, dtype=np.intp)
+        eps2 = self.softening * self.softening
+        if self.method == 'direct' or len(pos) < 2:
+            if self.backend == 'numpy':
+                return direct_accelerations(pos, masses, self.G, self.softening, targets,
+                                            chunk=self.chunk or 1 << 16)
+            acc, phi = np.empty((len(targets), 3)), np.empty(len(targets))
+            _direct_nb(pos, masses, eps2, targets, acc, phi)
+        else:
+            tree = self.tree = Octree(pos, masses, self.leaf_size)
+            if all_bodies:
+                bodies = np.arange(len(pos))
+            else:
+                rank = np.empty(len(pos), dtype=np.intp)
+                rank[tree.order] = np.arange(len(pos))
+                bodies = rank[targets]
+            if self.backend == 'numba':
+                acc, phi = np.empty((len(bodies), 3)), np.empty(len(bodies))
+                _walk_nb(tree.pos, tree.masses, tree.com, tree.mass, tree.size * tree.size,
+                         tree.start, tree.end, tree.first_child, tree.n_children,
+                         self.theta * self.theta, eps2, bodies, acc, phi)
+            else:
+                acc, phi = _walk_numpy(tree, self.theta, eps2, self.chunk or 4096, bodies)
+            if all_bodies:
+                # Deshace el orden de Morton
+                acc[tree.order], phi[tree.order] = acc.copy(), phi.copy()
+        acc *= self.G
+        phi *= self.G
+        return acc, phi
@@ -0,0 +1,53 @@
+"""
+Condiciones iniciales: el sistema binario de binary-system.py y cúmulos de Plummer.
+"""
+import numpy as np
+
+G_SI = 6.7e-11  # constante gravitacional de binary-system.py [N m²/kg²]
+
+
+def binary():
+    """Gigante y enana de binary-system.py: (positions, velocities, masses) en SI."""
+    positions = np.array([[-1e11, 0.0, 0.0],
+                          [1.5e11, 0.0, 0.0]])
+    masses = np.array([2e30, 1e30])
+    p_giant = np.array([0.0, 0.0, -1e4]) * masses[0]
+    momenta = np.array([p_giant, -p_giant])  # momento total nulo
+    return positions, momenta / masses[:, None], masses
+
+
+def plummer(n, total_mass=1.0, scale=1.0, G=1.0, rng=None):
+    """Esfera de Plummer en equilibrio virial (Aarseth, Hénon y Wielen 1974).
+
+    Devuelve (positions, velocities, masses) en el sistema del centro de
+    masa. Con las unidades por defecto (G = M = a = 1) el tiempo de cruce
+    es del orden de 1.
+    """
+    rng = np.random.default_rng(rng)
+    masses = np.full(n, total_mass / n)
+
+    # Radios por inversión de la masa acumulada M(r) = r³ / (1 + r²)^(3/2)
+    x = rng.uniform(1e-10, 1.0, n) ** (2.0 / 3.0)
+    r = scale / np.sqrt(1.0 / x - 1.0)
+    positions = r[:, None] * _random_directions(n, rng)
+
+    # Velocidades por rechazo sobre g(q) = q² (1 - q²)^(7/2)
+    q = np.empty(n)
+    todo = np.arange(n)
+    while len(todo):
+        trial = rng.uniform(0.0, 1.0, len(todo))
+        y = rng.uniform(0.0, 0.1, len(todo))
+        ok = y < trial**2 * (1.0 - trial**2) ** 3.5
+        q[todo[ok]] = trial[ok]
+        todo = todo[~ok]
+    v_escape = np.sqrt(2.0 * G * total_mass / np.sqrt(r * r + scale * scale))
+    velocities = (q * v_escape)[:, None] * _random_directions(n, rng)
+
+    positions -= masses @ positions / total_mass
+    velocities -= masses @ velocities / total_mass
+    return positions, velocities, masses
+
+
+def _random_directions(n, rng):
+    v = rng.normal(size=(n, 3))
+    return v / np.linalg.norm(v, axis=1, keepdims=True)
@@ -0,0 +1,49 @@
+import sys
+import time
+
+import numpy as np
+
+from nbody import Bodies, Gravity, Leapfrog, plummer
+
+# ==============================================
+# PARÁMETROS (UNIDADES N-CUERPOS: G = M = a = 1)
+# ==============================================
+n_bodies = 10000
+theta = 0.5        # ángulo de apertura de Barnes-Hut
+softening = 0.01   # suavizado de Plummer
+dt = 1e-3
+steps = 200
+report_every = 20
+
+# Uso: python plummer-cluster.py [N [θ [pasos]]]
+if len(sys.argv) > 1:
+    n_bodies = int(float(sys.argv[1]))
+if len(sys.argv) > 2:
+    theta = float(sys.argv[2])
+if len(sys.argv) > 3:
+    steps = int(sys.argv[3])
+
+
+def run_simulation(n_bodies=n_bodies, theta=theta, steps=steps, seed=0):
+    """Integra un cúmulo de Plummer y devuelve (bodies, energías muestreadas)."""
+    bodies = Bodies(*plummer(n_bodies, rng=seed))
+    integrator = Leapfrog(Gravity(theta=theta, softening=softening), dt)
+    integrator.evaluate(bodies)
+    e0 = bodies.total_energy()
+    energies = [e0]
+    t0 = time.perf_counter()
+
+    def report(b):
+        energies.append(b.total_energy())
+        elapsed = time.perf_counter() - t0
+        print(f"paso {b.step:>6}  t = {b.time:.3f}  ΔE/E = {(energies[-1] - e0) / abs(e0):+.2e}  "
+              f"{b.step / elapsed:.1f} pasos/s")
+
+    integrator.run(bodies, steps, callbacks=[report], stride=report_every)
+    return bodies, np.array(energies)
+
+
+if __name__ == "__main__":
+    print(f"Cúmulo de Plummer: N = {n_bodies}, θ = {theta}, ε = {softening}, dt = {dt}")
+    bodies, energies = run_simulation()
+    print(f"Error relativo máximo de energía: {np.max(np.abs(energies / energies[0] - 1)):.2e}")